@@ -0,0 +1,392 @@
+# -*- coding: utf-8 -*-
+# **************************************************************************
+# *                                                                        *
+# *  Copyright (c) 2018 Joel Graff <monograff76@gmail.com>                 *
+# *                                                                        *
+# *  This program is free software; you can redistribute it and/or modify  *
+# *  it under the terms of the GNU Lesser General Public License (LGPL)    *
+# *  as published by the Free Software Foundation; either version 2 of     *
+# *  the License, or (at your option) any later version.                   *
+# *  for detail see the LICENCE text file.                                 *
+# *                                                                        *
+# *  This program is distributed in the hope that it will be useful,       *
+# *  but WITHOUT ANY WARRANTY; without even the implied warranty of        *
+# *  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the         *
+# *  GNU Library General Public License for more details.                  *
+# *                                                                        *
+# *  You should have received a copy of the GNU Library General Public     *
+# *  License along with this program; if not, write to the Free Software   *
+# *  Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  *
+# *  USA                                                                   *
+# *                                                                        *
+# **************************************************************************
+
+'''
+Alignment geometry benchmark and parity suite.
+
+Times the alignment code paths on synthetic alignments of configurable size
+and checks the results against each other, headlessly if FreeCAD is not
+available:
+
+    python Benchmarks/AlignmentBenchmark.py --elements 2000 --equations 20
+
+Timings are the best and median of the repeated runs.  Any failed parity
+check sets a non-zero exit status, and --output saves the results as JSON
+for comparison between revisions.
+'''
+
+import argparse
+import contextlib
+import copy
+import io
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+import Headless
+
+def get_args(argv=None):
+    '''
+    Parse the command line
+    '''
+
+    parser = argparse.ArgumentParser(description='Alignment geometry benchmarks')
+
+    parser.add_argument('--elements', type=int, default=1000,
+                        help='number of elements in the synthetic alignment')
+    parser.add_argument('--equations', type=int, default=10,
+                        help='number of station equations')
+    parser.add_argument('--arcs', type=int, default=5000,
+                        help='number of arcs solved by the arc benchmarks')
+    parser.add_argument('--stations', type=int, default=100000,
+                        help='number of stations / points in the stationing benchmarks')
+    parser.add_argument('--repeat', type=int, default=5, help='runs of each benchmark')
+    parser.add_argument('--seed', type=int, default=0, help='random seed')
+    parser.add_argument('--units', choices=['feet', 'meters'], default='feet',
+                        help='document units of the headless stand-in')
+    parser.add_argument('--no-spirals', action='store_true', help='omit spiral transitions')
+    parser.add_argument('--output', default='', help='JSON file for the results')
+
+    return parser.parse_args(argv)
+
+class Suite(object):
+    '''
+    Benchmark timings and parity results
+    '''
+
+    def __init__(self, repeat):
+
+        self.repeat = repeat
+        self.timings = []
+        self.checks = []
+
+    def time(self, name, function, setup=None, count=1):
+        '''
+        Time the function, returning the result of the last run
+
+        setup - function returning the arguments of each run, excluded from the timing
+        count - number of items processed by each run, for the per-item time
+        '''
+
+        _times = []
+        result = None
+
+        for _i in range(self.repeat):
+
+            _args = setup() if setup else ()
+
+            _start = time.perf_counter()
+            result = function(*_args)
+            _times.append(time.perf_counter() - _start)
+
+        _best, _median = min(_times), statistics.median(_times)
+
+        self.timings.append({'name': name, 'count': count, 'best': _best, 'median': _median})
+
+        print('{:<40}{:>9}{:>12.2f} ms{:>12.2f} ms{:>12.3f} us'.format(
+            name, count, _best * 1000.0, _median * 1000.0, _best * 1.0e6 / count
+        ))
+
+        return result
+
+    def check(self, name, error, tolerance):
+        '''
+        Record a parity check passing if the error is within the tolerance
+        '''
+
+        _passed = bool(error <= tolerance)
+
+        self.checks.append(
+            {'name': name, 'error': float(error), 'tolerance': tolerance, 'passed': _passed}
+        )
+
+        return _passed
+
+    def print_checks(self):
+        '''
+        Print the parity results
+        '''
+
+        print('\n{:<40}{:>15}{:>15}'.format('parity', 'error', 'tolerance'))
+
+        for _c in self.checks:
+            print('{:<40}{:>15.3e}{:>15.3e}   {}'.format(
+                _c['name'], _c['error'], _c['tolerance'], 'ok' if _c['passed'] else 'FAILED'
+            ))
+
+def run_arcs(suite, count, seed):
+    '''
+    Time the arc solvers and check them against the source arcs
+    '''
+
+    from Geometry import Arc
+    import Synthetic
+
+    arcs = Synthetic.get_arcs(count, seed)
+
+    _copy = lambda: ([dict(_a) for _n, _a, _s in arcs],)
+
+    single = suite.time(
+        'Arc.get_parameters', lambda _arcs: [Arc.get_parameters(_a) for _a in _arcs],
+        _copy, count
+    )
+
+    batch = suite.time('Arc.get_parameters_batch', Arc.get_parameters_batch, _copy, count)
+
+    _keys = ['Radius', 'Delta', 'Length', 'Tangent', 'BearingOut']
+    _errors = {}
+
+    for (_name, _arc, _source), _single, _batch in zip(arcs, single, batch):
+
+        _error = max(
+            [abs(_single[_k] - _source[_k]) for _k in _keys]
+            + [(_single[_k] - _source[_k]).Length for _k in ['End', 'Center', 'PI']]
+        )
+
+        _batch_error = max(
+            [abs(_single[_k] - _batch[_k]) for _k in _keys]
+            + [(_single[_k] - _batch[_k]).Length for _k in ['End', 'Center', 'PI']]
+        )
+
+        _errors[_name] = max(_errors.get(_name, 0.0), _error)
+        _errors['batch'] = max(_errors.get('batch', 0.0), _batch_error)
+
+    for _name in sorted(_errors):
+
+        if _name != 'batch':
+            suite.check('arc from ' + _name.lower(), _errors[_name], 1.0e-6)
+
+    suite.check('arc batch / single', _errors['batch'], 1.0e-6)
+
+def run_alignment(suite, args):
+    '''
+    Time solving, discretizing and stationing the synthetic alignment
+    '''
+
+    import numpy
+
+    from Project.Support import Units
+    from Project.Support.LruCache import LruCache
+    from Geometry.ProjectionIndex import ProjectionIndex
+    from Corridor.Alignment import AlignmentModel
+    import Synthetic
+
+    data = Synthetic.get_alignment(
+        args.elements, seed=args.seed, spirals=not args.no_spirals,
+        equation_count=args.equations
+    )
+
+    _count = len(data['geometry'])
+
+    def _solve(_geometry):
+
+        result = AlignmentModel.AlignmentModel()
+        result.set_geometry(_geometry)
+
+        return result
+
+    model = suite.time(
+        'AlignmentModel.set_geometry', _solve, lambda: (copy.deepcopy(data),), _count
+    )
+
+    if model.errors:
+        print('Alignment errors: ', model.errors)
+
+    def _discretize(_method, _interval):
+
+        #discard the cached curve points, so each run discretizes every curve
+        model.point_cache = LruCache(AlignmentModel.POINT_CACHE_SIZE)
+
+        return model.discretize(_interval, _method)
+
+    _points = {}
+
+    for _method, _interval in [('Tolerance', 0.01), ('Interval', 10.0), ('Segment', 10.0),
+                               ('Adaptive', 0.01)]:
+
+        _points[_method] = suite.time(
+            'discretize (%s %s)' % (_method, _interval), _discretize,
+            lambda: (_method, _interval), _count
+        )
+
+    _index = model.get_station_index()
+    _table = model.get_station_table()
+
+    rng = numpy.random.default_rng(args.seed)
+    _distances = rng.uniform(0.0, _index.total_length, args.stations)
+    _stations = _table.to_station(_distances)
+
+    suite.time('StationTable.to_distance', _table.to_distance, lambda: (_stations,),
+               args.stations)
+
+    coords, bearings = suite.time(
+        'get_station_coordinates', model.get_station_coordinates, lambda: (_stations,),
+        args.stations
+    )
+
+    _sf = Units.scale_factor()
+    _max_offset = 50.0 * _sf
+    _offsets = rng.uniform(-_max_offset, _max_offset, args.stations)
+
+    _points_xy = coords[:, 0:2] \
+        + numpy.column_stack([numpy.cos(bearings), -numpy.sin(bearings)]) * _offsets[:, None]
+
+    def _project(_xy):
+
+        #rebuild the projection index as the model does, so it is included in the timing
+        model.projection_index = ProjectionIndex(_index)
+
+        return model.get_station_offsets(_xy)
+
+    stations, offsets = suite.time(
+        'get_station_offsets', _project, lambda: (_points_xy,), args.stations
+    )
+
+    #parity of the stationing round trip, in document units
+    suite.check('station round trip', numpy.abs(
+        _table.to_distance(_table.to_station(_distances)) - _distances).max() / _sf, 1.0e-6)
+
+    #points near tight curves may project to a nearer element, so compare the
+    #offset magnitudes, which are never larger than the true offset
+    suite.check('projected offsets', (numpy.abs(offsets) - numpy.abs(_offsets / _sf)).max(),
+                1.0e-6)
+
+    #the nearest projections of a sample of the points, testing every element
+    _sample = numpy.arange(min(len(_points_xy), 2000))
+    _count = len(_index)
+
+    _brute = [numpy.full(len(_points_xy), numpy.nan) for _i in range(2)] \
+        + [numpy.full(len(_points_xy), numpy.inf)]
+
+    model.projection_index._nearest(
+        _points_xy, numpy.repeat(_sample, _count), numpy.tile(numpy.arange(_count), len(_sample)),
+        *_brute
+    )
+
+    suite.check('projected distances (brute force)', numpy.abs(
+        numpy.abs(offsets[_sample]) - _brute[2][_sample] / _sf).max(), 1.0e-6)
+
+    #stations differ only where the point is nearer another element
+    _unmatched = numpy.abs(stations - _stations) >= 1.0e-6
+
+    suite.check('unmatched stations (not nearer)', numpy.sum(
+        _unmatched[_sample] & (_brute[2][_sample] >= numpy.abs(_offsets[_sample]) - 1.0e-6)
+    ), 0)
+
+    #discretized vertices lie on the alignment
+    for _method in ['Tolerance', 'Adaptive']:
+
+        _offsets = model.get_station_offsets(_points[_method][:, 0:2])[1]
+        suite.check('%s vertices on alignment' % _method.lower(),
+                    numpy.abs(_offsets).max(), 1.0e-6)
+
+    return data, model
+
+def run_landxml(suite, data, model, units):
+    '''
+    Time exporting the solved alignment to LandXML and importing it again
+    '''
+
+    from Project.XML.AlignmentExporter import AlignmentExporter
+    from Project.XML.AlignmentImporter import AlignmentImporter
+
+    _template = os.path.join(
+        Headless.ROOT, 'Resources', 'data',
+        'landXML-foot.xml' if units == 'feet' else 'landXML-meter.xml'
+    )
+
+    _alignment = dict(model.geometry, meta=data['meta'], station=data['station'])
+
+    with tempfile.TemporaryDirectory() as _dir:
+
+        _target = os.path.join(_dir, 'alignment.xml')
+
+        _count = len(model.geometry['geometry'])
+
+        suite.time(
+            'AlignmentExporter.write',
+            lambda: AlignmentExporter().write([_alignment], _template, _target), count=_count
+        )
+
+        def _import():
+
+            #the importer reports its progress on stdout
+            with contextlib.redirect_stdout(io.StringIO()):
+
+                _importer = AlignmentImporter()
+                result = _importer.import_file(_target)
+
+            return result, _importer.errors
+
+        result, errors = suite.time('AlignmentImporter.import_file', _import, count=_count)
+
+    if errors:
+        print('Import errors: ', errors)
+
+    #the exporter writes curves only, which are compared by radius and delta
+    _arcs = [_g for _g in model.geometry['geometry'] if _g['Type'] == 'arc']
+    _imported = [_g for _g in list(result['Alignments'].values())[0]['geometry']
+                 if _g['Type'] == 'Curve']
+
+    suite.check('LandXML curve count', abs(len(_arcs) - len(_imported)), 0)
+
+    if len(_arcs) == len(_imported):
+
+        suite.check('LandXML curve radius', max(
+            [abs(_a['Radius'] - _b['Radius']) for _a, _b in zip(_arcs, _imported)] + [0.0]
+        ), 1.0e-3)
+
+def main(argv=None):
+
+    args = get_args(argv)
+
+    _headless = Headless.install(Headless.IMPERIAL_SCHEMA if args.units == 'feet' else 0)
+
+    print('FreeCAD stand-in' if _headless else 'FreeCAD', '|', args.elements, 'elements,',
+          args.equations, 'equations,', args.units)
+
+    suite = Suite(args.repeat)
+
+    print('\n{:<40}{:>9}{:>15}{:>15}{:>15}'.format('benchmark', 'items', 'best', 'median',
+                                                 'per item'))
+
+    run_arcs(suite, args.arcs, args.seed)
+    data, model = run_alignment(suite, args)
+
+    run_landxml(suite, data, model, args.units)
+
+    suite.print_checks()
+
+    if args.output:
+
+        with open(args.output, 'w') as _file:
+            json.dump({'args': vars(args), 'timings': suite.timings, 'checks': suite.checks},
+                      _file, indent=2)
+
+    return 0 if all(_c['passed'] for _c in suite.checks) else 1
+
+if __name__ == '__main__':
+    sys.exit(main())
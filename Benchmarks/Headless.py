@@ -0,0 +1,220 @@
+# -*- coding: utf-8 -*-
+# **************************************************************************
+# *                                                                        *
+# *  Copyright (c) 2018 Joel Graff <monograff76@gmail.com>                 *
+# *                                                                        *
+# *  This program is free software; you can redistribute it and/or modify  *
+# *  it under the terms of the GNU Lesser General Public License (LGPL)    *
+# *  as published by the Free Software Foundation; either version 2 of     *
+# *  the License, or (at your option) any later version.                   *
+# *  for detail see the LICENCE text file.                                 *
+# *                                                                        *
+# *  This program is distributed in the hope that it will be useful,       *
+# *  but WITHOUT ANY WARRANTY; without even the implied warranty of        *
+# *  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the         *
+# *  GNU Library General Public License for more details.                  *
+# *                                                                        *
+# *  You should have received a copy of the GNU Library General Public     *
+# *  License along with this program; if not, write to the Free Software   *
+# *  Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  *
+# *  USA                                                                   *
+# *                                                                        *
+# **************************************************************************
+
+'''
+FreeCAD-free stand-ins for running the alignment code headlessly.
+
+install() registers a minimal FreeCAD module (App.Vector, App.ParamGet and
+App.Version) when FreeCAD itself cannot be imported, so the geometry,
+alignment model and LandXML code paths can be benchmarked from a plain
+Python interpreter.  Inside FreeCAD the real modules are used.
+'''
+
+import math
+import os
+import sys
+import types
+
+#FreeCAD unit schema for US customary (feet) documents
+IMPERIAL_SCHEMA = 7
+
+#repository root, holding the Geometry, Project and Corridor packages
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+class Vector(object):
+    '''
+    Minimal App.Vector, implementing the operations used by the alignment code
+    '''
+
+    __slots__ = ('x', 'y', 'z')
+
+    def __init__(self, x=0.0, y=0.0, z=0.0):
+
+        #copy constructor, or a list / tuple of coordinates
+        if not isinstance(x, (int, float)):
+            _coords = list(x) + [0.0, 0.0, 0.0]
+            x, y, z = _coords[0:3]
+
+        self.x = float(x)
+        self.y = float(y)
+        self.z = float(z)
+
+    def __iter__(self):
+        return iter((self.x, self.y, self.z))
+
+    def __getitem__(self, index):
+        return (self.x, self.y, self.z)[index]
+
+    def __len__(self):
+        return 3
+
+    def __eq__(self, other):
+        return isinstance(other, Vector) and tuple(self) == tuple(other)
+
+    def __repr__(self):
+        return 'Vector (%s, %s, %s)' % (self.x, self.y, self.z)
+
+    def __add__(self, other):
+        return Vector(self.x + other.x, self.y + other.y, self.z + other.z)
+
+    def __sub__(self, other):
+        return Vector(self.x - other.x, self.y - other.y, self.z - other.z)
+
+    def __neg__(self):
+        return Vector(-self.x, -self.y, -self.z)
+
+    def __mul__(self, other):
+
+        #vector product is the dot product, as in FreeCAD
+        if isinstance(other, Vector):
+            return self.dot(other)
+
+        return Vector(self.x * other, self.y * other, self.z * other)
+
+    __rmul__ = __mul__
+
+    @property
+    def Length(self):
+        return math.sqrt(self.x * self.x + self.y * self.y + self.z * self.z)
+
+    def add(self, other):
+        return self + other
+
+    def sub(self, other):
+        return self - other
+
+    def negative(self):
+        return -self
+
+    def multiply(self, factor):
+        '''
+        Scale the vector in place, returning it
+        '''
+
+        self.x *= factor
+        self.y *= factor
+        self.z *= factor
+
+        return self
+
+    def normalize(self):
+        '''
+        Scale the vector to unit length in place, returning it
+        '''
+
+        return self.multiply(1.0 / self.Length)
+
+    def dot(self, other):
+        return self.x * other.x + self.y * other.y + self.z * other.z
+
+    def cross(self, other):
+        return Vector(self.y * other.z - self.z * other.y,
+                      self.z * other.x - self.x * other.z,
+                      self.x * other.y - self.y * other.x)
+
+    def getAngle(self, other):
+
+        _cos = self.dot(other) / (self.Length * other.Length)
+
+        return math.acos(max(-1.0, min(1.0, _cos)))
+
+    def distanceToPoint(self, other):
+        return (self - other).Length
+
+class _ParameterGroup(object):
+    '''
+    Parameter group returning the unit schema and defaults otherwise.
+    Attached observers are notified when the schema is set, as in FreeCAD.
+    '''
+
+    def __init__(self, schema):
+        self.schema = schema
+        self.observers = []
+
+    def Attach(self, observer):
+        self.observers.append(observer)
+
+    def Detach(self, observer):
+        self.observers.remove(observer)
+
+    def SetInt(self, name, value):
+
+        if name != 'UserSchema':
+            return
+
+        self.schema = value
+
+        for _observer in list(self.observers):
+            _observer.OnChange(self, name)
+
+    def GetInt(self, name, default=0):
+        return self.schema if name == 'UserSchema' else default
+
+    def GetFloat(self, name, default=0.0):
+        return default
+
+    def GetString(self, name, default=''):
+        return default
+
+    def GetBool(self, name, default=False):
+        return default
+
+def install(schema=IMPERIAL_SCHEMA):
+    '''
+    Prepare the interpreter to import the alignment code.
+    Returns True if the FreeCAD stand-in is used.
+
+    schema - FreeCAD unit schema used by the stand-in (7 = feet, otherwise meters)
+    '''
+
+    if ROOT not in sys.path:
+        sys.path.insert(0, ROOT)
+
+    #the alignment package directory is lower case on disk, which only
+    #resolves as Corridor.Alignment on case-insensitive file systems
+    try:
+        import Corridor.Alignment
+
+    except ImportError:
+
+        import Corridor.alignment
+        sys.modules['Corridor.Alignment'] = Corridor.alignment
+
+    try:
+        import FreeCAD
+        return False
+
+    except ImportError:
+        pass
+
+    _group = _ParameterGroup(schema)
+
+    _app = types.ModuleType('FreeCAD')
+    _app.Vector = Vector
+    _app.ParamGet = lambda _path: _group
+    _app.Version = lambda: ['0', '18', '0', 'headless']
+    _app.ActiveDocument = None
+
+    sys.modules['FreeCAD'] = _app
+
+    return True
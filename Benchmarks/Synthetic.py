@@ -0,0 +1,195 @@
+# -*- coding: utf-8 -*-
+# **************************************************************************
+# *                                                                        *
+# *  Copyright (c) 2018 Joel Graff <monograff76@gmail.com>                 *
+# *                                                                        *
+# *  This program is free software; you can redistribute it and/or modify  *
+# *  it under the terms of the GNU Lesser General Public License (LGPL)    *
+# *  as published by the Free Software Foundation; either version 2 of     *
+# *  the License, or (at your option) any later version.                   *
+# *  for detail see the LICENCE text file.                                 *
+# *                                                                        *
+# *  This program is distributed in the hope that it will be useful,       *
+# *  but WITHOUT ANY WARRANTY; without even the implied warranty of        *
+# *  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the         *
+# *  GNU Library General Public License for more details.                  *
+# *                                                                        *
+# *  You should have received a copy of the GNU Library General Public     *
+# *  License along with this program; if not, write to the Free Software   *
+# *  Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  *
+# *  USA                                                                   *
+# *                                                                        *
+# **************************************************************************
+
+'''
+Synthetic alignment generation for benchmarks.
+
+Alignments are built in the importer dictionary format
+({'meta': {}, 'station': [], 'geometry': []}) from a seeded random sequence
+of tangents, spirals and curves, so runs of the same size are repeatable.
+Lengths are in system units (mm), stations in document units.
+'''
+
+import math
+import random
+
+import FreeCAD as App
+
+from Project.Support import Units
+from Geometry import Arc, Line, Spiral
+
+#arc keys supplied for each definition used by the arc benchmarks
+ARC_DEFINITIONS = {
+    'Coordinates': ['Start', 'End', 'Center', 'PI'],
+    'Radius': ['Start', 'BearingIn', 'Radius', 'Delta', 'Direction'],
+    'Tangent': ['Start', 'BearingIn', 'Tangent', 'Delta', 'Direction'],
+    'Chord': ['Start', 'BearingIn', 'Chord', 'Delta', 'Direction'],
+    'Length': ['Start', 'BearingIn', 'Length', 'Delta', 'Direction'],
+}
+
+def _get_curve(rng, spirals):
+    '''
+    Return the element definitions of a curve, with optional spiral transitions
+    '''
+
+    _direction = rng.choice([-1.0, 1.0])
+    _radius = rng.uniform(200000.0, 2000000.0)
+
+    _arc = {'Type': 'Curve', 'Radius': _radius, 'Delta': rng.uniform(0.1, 0.8),
+            'Direction': _direction}
+
+    if not spirals:
+        return [_arc]
+
+    _length = rng.uniform(30000.0, 120000.0)
+
+    return [
+        {'Type': 'Spiral', 'StartRadius': math.inf, 'EndRadius': _radius,
+         'Length': _length, 'Direction': _direction},
+        _arc,
+        {'Type': 'Spiral', 'StartRadius': _radius, 'EndRadius': math.inf,
+         'Length': _length, 'Direction': _direction}
+    ]
+
+def get_alignment(element_count, name='Synthetic', seed=0, spirals=True, equation_count=0,
+                  start_station=1000.0):
+    '''
+    Return a synthetic alignment of approximately element_count elements,
+    alternating tangents with curves and their spiral transitions
+
+    name - alignment ID
+    seed - random seed, for repeatable geometry
+    spirals - if True, curves are transitioned by spirals
+    equation_count - number of station equations, evenly spaced along the alignment
+    start_station - starting station in document units
+    '''
+
+    rng = random.Random(seed)
+
+    _start = App.Vector(rng.uniform(0.0, 1.0e6), rng.uniform(0.0, 1.0e6), 0.0)
+    _position, _bearing, _length = App.Vector(_start), rng.uniform(0.0, 2.0 * math.pi), 0.0
+
+    geometry = []
+    _distances = []
+
+    while len(geometry) < element_count:
+
+        for _geo in [{'Type': 'Line', 'Length': rng.uniform(50000.0, 300000.0)}] \
+            + _get_curve(rng, spirals):
+
+            _geo['Start'] = App.Vector(_position)
+            _geo['BearingIn'] = _bearing
+
+            if _geo['Type'] == 'Line':
+                _solved = Line.get_parameters(dict(_geo))
+
+            elif _geo['Type'] == 'Curve':
+                _solved = Arc.get_parameters(dict(_geo))
+
+            else:
+                _solved = Spiral.get_parameters(dict(_geo))
+
+            geometry.append(_geo)
+            _distances.append(_length)
+
+            _position, _bearing = _solved['End'], _solved['BearingOut']
+            _length += _solved['Length']
+
+    meta = {'ID': name, 'StartStation': start_station, 'Start': _start, 'Length': _length}
+    equations = get_equations(_length, equation_count, start_station)
+
+    #element stations account for the equations, as in imported LandXML
+    _sf = Units.scale_factor()
+    _ranges = [(0.0, start_station)] + [(_e['Position'], _e['Ahead']) for _e in equations]
+
+    for _geo, _distance in zip(geometry, _distances):
+
+        _position, _ahead = [_r for _r in _ranges if _r[0] <= _distance][-1]
+        _geo['StartStation'] = _ahead + (_distance - _position) / _sf
+
+    return {'meta': meta, 'station': equations, 'geometry': geometry}
+
+def get_equations(length, count, start_station=0.0, gap=100.0):
+    '''
+    Return station equation dictionaries evenly spaced along an alignment.
+    Each equation also holds its internal station (Position, system units).
+
+    length - alignment length in system units
+    count - number of equations
+    start_station - starting station in document units
+    gap - station increase at each equation, in document units
+    '''
+
+    _sf = Units.scale_factor()
+
+    result = []
+    _ahead, _prev = start_station, 0.0
+
+    for _i in range(1, count + 1):
+
+        _position = length * _i / (count + 1)
+        _back = _ahead + (_position - _prev) / _sf
+
+        _ahead, _prev = _back + gap, _position
+
+        result.append({'Back': _back, 'Ahead': _ahead, 'Direction': 1.0, 'Position': _position})
+
+    return result
+
+def get_arcs(count, seed=0):
+    '''
+    Return a list of (definition, arc, solved arc) tuples, cycling through
+    the definitions in ARC_DEFINITIONS.  Each arc holds only the keys of its
+    definition, taken from the solved arc.
+    '''
+
+    rng = random.Random(seed)
+
+    _names = sorted(ARC_DEFINITIONS)
+    result = []
+
+    for _i in range(count):
+
+        _solved = Arc.get_parameters({
+            'Type': 'Curve',
+            'Start': App.Vector(rng.uniform(0.0, 1.0e6), rng.uniform(0.0, 1.0e6), 0.0),
+            'BearingIn': rng.uniform(0.0, 2.0 * math.pi),
+            'Radius': rng.uniform(50000.0, 2000000.0),
+            'Delta': rng.uniform(0.05, 2.5),
+            'Direction': rng.choice([-1.0, 1.0])
+        })
+
+        _name = _names[_i % len(_names)]
+
+        _arc = {'Type': 'Curve'}
+
+        for _k in ARC_DEFINITIONS[_name]:
+
+            _arc[_k] = _solved[_k]
+
+            if isinstance(_arc[_k], App.Vector):
+                _arc[_k] = App.Vector(_arc[_k])
+
+        result.append((_name, _arc, _solved))
+
+    return result
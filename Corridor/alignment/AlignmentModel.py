@@ -0,0 +1,1078 @@
+# -*- coding: utf-8 -*-
+# **************************************************************************
+# *                                                                        *
+# *  Copyright (c) 20XX AUTHOR_NAME <AUTHOR_EMAIL>                         *
+# *                                                                        *
+# *  This program is free software; you can redistribute it and/or modify  *
+# *  it under the terms of the GNU Lesser General Public License (LGPL)    *
+# *  as published by the Free Software Foundation; either version 2 of     *
+# *  the License, or (at your option) any later version.                   *
+# *  for detail see the LICENCE text file.                                 *
+# *                                                                        *
+# *  This program is distributed in the hope that it will be useful,       *
+# *  but WITHOUT ANY WARRANTY; without even the implied warranty of        *
+# *  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the         *
+# *  GNU Library General Public License for more details.                  *
+# *                                                                        *
+# *  You should have received a copy of the GNU Library General Public     *
+# *  License along with this program; if not, write to the Free Software   *
+# *  Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  *
+# *  USA                                                                   *
+# *                                                                        *
+# **************************************************************************
+
+'''
+Headless alignment model, solving and discretizing alignment geometry
+on plain dictionaries and arrays without a document object
+'''
+import math
+import multiprocessing
+import os
+import sys
+
+from concurrent.futures import ProcessPoolExecutor
+
+import FreeCAD as App
+import numpy
+
+from Project.Support import Units, Utils
+from Project.Support.Utils import Constants as C
+from Project.Support.LruCache import LruCache
+from Project.Support.StationTable import StationTable
+from Geometry import Arc, Line, Spiral, Support
+from Geometry.StationIndex import StationIndex
+from Geometry.ElementStore import ElementStore
+from Geometry.ProjectionIndex import ProjectionIndex
+
+__title__ = 'AlignmentModel.py'
+__author__ = 'Joel Graff'
+__url__ = "https://www.freecadweb.org"
+
+#maximum number of discretized curves retained by each alignment
+POINT_CACHE_SIZE = 4096
+
+#geometry dictionary keys holding coordinate vectors
+VECTOR_KEYS = ('Start', 'End', 'Center', 'PI')
+
+def _convert_vectors(geometry, convert):
+    '''
+    Return a copy of the geometry dictionary with the coordinate vectors converted
+    '''
+
+    def _convert_dict(data):
+
+        if not data:
+            return data
+
+        return {_k: convert(_v) if _k in VECTOR_KEYS and _v is not None else _v
+                for _k, _v in data.items()}
+
+    result = dict(geometry)
+
+    result['meta'] = _convert_dict(geometry.get('meta'))
+    result['station'] = [dict(_eq) for _eq in geometry.get('station', [])]
+    result['geometry'] = [_convert_dict(_g) for _g in geometry.get('geometry', [])]
+
+    return result
+
+def to_tuples(geometry):
+    '''
+    Return a picklable copy of the geometry dictionary, with vectors as tuples
+    '''
+
+    return _convert_vectors(geometry, tuple)
+
+def to_vectors(geometry):
+    '''
+    Return a copy of the geometry dictionary, with tuples restored to vectors
+    '''
+
+    return _convert_vectors(geometry, lambda _v: App.Vector(*_v))
+
+def build(geometry, interval=1.0, interval_type='Tolerance'):
+    '''
+    Solve, validate and discretize alignment geometry without a document.
+    Returns a tuple of (AlignmentModel, points) where points is an (n, 3) numpy array,
+    or None if the geometry could not be solved.
+    '''
+
+    result = AlignmentModel()
+
+    if not result.set_geometry(geometry):
+        return result, None
+
+    return result, result.discretize(interval, interval_type)
+
+def _solve(geometry, interval, interval_type):
+    '''
+    Process pool worker.  Solve and discretize the geometry passed as tuples,
+    returning the model, which pickles its geometry as tuples as well.
+    '''
+
+    result = AlignmentModel()
+
+    if result.set_geometry(to_vectors(geometry)):
+
+        #discretizing fills the point cache returned with the model
+        result.discretize(interval, interval_type)
+
+    return result
+
+def _get_pool_context():
+    '''
+    Return a spawn multiprocessing context with a python interpreter as its executable,
+    or None if no interpreter can be found.  Embedded in FreeCAD, sys.executable is
+    the FreeCAD binary, so the interpreter bundled beside it is used instead.
+    '''
+
+    context = multiprocessing.get_context('spawn')
+    executable = sys.executable or ''
+
+    if 'python' in os.path.basename(executable).lower():
+        return context
+
+    for _name in ['python', 'python3', 'python.exe']:
+
+        _path = os.path.join(os.path.dirname(executable), _name)
+
+        if os.path.isfile(_path):
+            context.set_executable(_path)
+            return context
+
+    return None
+
+def build_all(alignments, interval=1.0, interval_type='Tolerance', workers=None):
+    '''
+    Solve and discretize a dictionary of alignment geometry, keyed by name.
+    Alignments are solved in parallel across a process pool, falling back
+    to solving serially if the pool cannot be used.
+
+    workers - number of worker processes. Defaults to the number of cores.
+              One or fewer solves serially in the calling process.
+
+    Returns a dictionary of the solved AlignmentModel objects, keyed by name.
+    '''
+
+    if workers is None:
+        workers = os.cpu_count() or 1
+
+    workers = min(workers, len(alignments))
+    context = _get_pool_context() if workers > 1 else None
+
+    if context:
+
+        try:
+            with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+
+                futures = {
+                    _k: pool.submit(_solve, to_tuples(_v), interval, interval_type)
+                    for _k, _v in alignments.items()
+                }
+
+                return {_k: _f.result() for _k, _f in futures.items()}
+
+        except Exception as _ex:
+            print('Parallel alignment solve failed (%s), solving serially' % _ex)
+
+    result = {}
+
+    for _k, _v in alignments.items():
+
+        result[_k] = AlignmentModel()
+
+        if result[_k].set_geometry(_v):
+            result[_k].discretize(interval, interval_type)
+
+    return result
+
+class AlignmentModel(object):
+    '''
+    Alignment geometry and stationing, independent of any document object.
+
+    Geometry is the importer dictionary format: {'meta': {}, 'station': [], 'geometry': []}.
+    Station equations are kept as (back, ahead, direction) tuples,
+    with the starting station as the ahead value of the first equation.
+    '''
+
+    def __init__(self, geometry=None):
+
+        self.errors = []
+        self.geometry = None
+        self.dirty = set()
+
+        self.station_equations = []
+        self.station_table = None
+        self.station_index = None
+        self.projection_index = None
+        self.point_cache = LruCache(POINT_CACHE_SIZE)
+
+        if geometry:
+            self.set_geometry(geometry)
+
+    def __getstate__(self):
+
+        result = self.get_state()
+        result['point_cache'] = self.point_cache
+
+        return result
+
+    def __setstate__(self, state):
+
+        self.__init__()
+        self.set_state(state)
+
+        self.point_cache = state['point_cache']
+
+    def get_state(self):
+        '''
+        Return the model state as a JSON-serializable dictionary,
+        with the solved elements packed by the element store
+        '''
+
+        _geometry = self.geometry
+
+        if _geometry:
+
+            _elements = _geometry['geometry']
+
+            if not isinstance(_elements, ElementStore):
+                _elements = ElementStore(_elements)
+
+            _geometry = to_tuples(dict(_geometry, geometry=[]))
+            _geometry['geometry'] = _elements.to_state()
+
+        return {'geometry': _geometry, 'errors': self.errors,
+                'station_equations': [tuple(_eq) for _eq in self.station_equations]}
+
+    def set_state(self, state):
+        '''
+        Restore the model from the state returned by get_state()
+        '''
+
+        self.errors = list(state['errors'])
+        self.station_equations = [tuple(_eq) for _eq in state['station_equations']]
+
+        if not state['geometry']:
+            return
+
+        _geometry = dict(state['geometry'])
+        _elements = _geometry.pop('geometry')
+
+        self.geometry = to_vectors(dict(_geometry, geometry=[]))
+
+        #states pickled before the element store hold a list of element dictionaries
+        if isinstance(_elements, dict):
+            self.geometry['geometry'] = ElementStore.from_state(_elements)
+
+        else:
+            self.geometry['geometry'] = ElementStore(
+                to_vectors({'geometry': _elements})['geometry']
+            )
+
+    def set_geometry(self, geometry):
+        '''
+        Solve and validate the geometry, calculating the element stationing
+        '''
+
+        self.geometry = geometry
+        self.dirty = set()
+        self.station_index = None
+
+        self.set_station_equations(self.build_station_equations())
+
+        _geo_list = self.geometry['geometry']
+
+        #solve all curves in a single batch
+        _curves = [_i for _i, _geo in enumerate(_geo_list) if _geo['Type'] == 'Curve']
+
+        for _i, _geo in zip(_curves, Arc.get_parameters_batch([_geo_list[_j] for _j in _curves])):
+            _geo_list[_i] = _geo
+
+        _solved = set(_curves)
+
+        for _i, _geo in enumerate(_geo_list):
+
+            if _i in _solved:
+                continue
+
+            if _geo['Type'] == 'Line':
+                _geo = Line.get_parameters(_geo)
+
+            elif _geo['Type'] == 'Spiral':
+                _geo = Spiral.get_parameters(_geo)
+
+                if not _geo:
+                    self.errors.append('Invalid spiral at index %d' % _i)
+                    return False
+
+            else:
+                self.errors.append('Undefined geometry: ' + str(_geo))
+                continue
+
+            self.geometry['geometry'][_i] = _geo
+
+        self.validate_datum()
+
+        self.validate_stationing()
+
+        if not self.validate_bearings():
+            return False
+
+        self.validate_coordinates()
+
+        self.validate_alignment()
+
+        #call once more to catch any added geometry from validate_alignment()
+        self.validate_stationing()
+
+        #hold the solved elements as columns, viewed as element dictionaries
+        self.geometry['geometry'] = ElementStore(self.geometry['geometry'])
+
+        return True
+
+    def update_geometry(self, index, values):
+        '''
+        Update the element at index with the passed values and re-solve it.
+
+        Values not supplied hold the current element definition
+        (direction and central angle for curves, length for lines).
+        The element start and bearing remain tangent to the previous element.
+        '''
+
+        _geo = self.geometry['geometry'][index]
+
+        _basis = {'Type': 'Line', 'Length': _geo.get('Length')}
+
+        if _geo['Type'] in ['arc', 'Curve']:
+
+            _basis = {'Type': 'Curve', 'Direction': _geo.get('Direction'),
+                      'Delta': _geo.get('Delta'), 'Radius': _geo.get('Radius')}
+
+            #a new curve length supersedes the current radius
+            if any(_k in values for _k in
+                   ['Length', 'Tangent', 'Chord', 'External', 'MiddleOrdinate']):
+                _basis.pop('Radius')
+
+            if 'BearingOut' in values:
+                _basis.pop('Delta')
+
+        elif _geo['Type'] in ['spiral', 'Spiral']:
+
+            _basis = {'Type': 'Spiral', 'Direction': _geo.get('Direction'),
+                      'Length': _geo.get('Length'), 'StartRadius': _geo.get('StartRadius'),
+                      'EndRadius': _geo.get('EndRadius')}
+
+        _basis['StartStation'] = _geo.get('StartStation')
+        _basis['InternalStation'] = _geo.get('InternalStation')
+
+        #the first element has no previous element to anchor it
+        if index == 0:
+            _basis['Start'] = _geo.get('Start')
+            _basis['BearingIn'] = _geo.get('BearingIn')
+
+        self.geometry['geometry'][index] = {**_basis, **values}
+        self.dirty.add(index)
+
+        return self.resolve()
+
+    def resolve(self):
+        '''
+        Re-solve the elements marked dirty, in order,
+        propagating coordinate and station changes downstream
+        '''
+
+        for _i in sorted(self.dirty):
+
+            self.station_index = None
+
+            if not self._resolve_element(_i):
+                return False
+
+        self.dirty = set()
+
+        return True
+
+    def _resolve_element(self, index):
+        '''
+        Solve a single element and shift the downstream elements to match it
+        '''
+
+        _geo_list = self.geometry['geometry']
+        _geo = _geo_list[index]
+        _meta = self.geometry['meta']
+        _sf = Units.scale_factor()
+
+        _start_int = 0.0
+        _old_int = _geo.get('InternalStation')
+
+        #anchor the element to the end of the previous element
+        if index > 0:
+
+            _prev = _geo_list[index - 1]
+
+            _geo['Start'] = App.Vector(_prev['End'])
+            _geo['BearingIn'] = _prev['BearingOut']
+            _geo['StartStation'] = _prev['StartStation'] + _prev['Length'] / _sf
+
+            _start_int = _prev['InternalStation'][1]
+
+        elif _old_int is not None:
+            _start_int = _old_int[0]
+
+        if _geo.get('Start') is None:
+            _geo['Start'] = App.Vector(_meta['Start'])
+
+        for _k in ['End', 'Center', 'PI']:
+            _geo.pop(_k, None)
+
+        if _geo['Type'] in ['arc', 'Curve']:
+            _solved = Arc.get_parameters(_geo)
+
+        elif _geo['Type'] in ['spiral', 'Spiral']:
+            _solved = Spiral.get_parameters(_geo)
+
+        else:
+            _solved = Line.get_parameters(_geo)
+
+        if not _solved:
+            self.errors.append('Unable to resolve geometry at index %d' % index)
+            return False
+
+        _solved['InternalStation'] = (_start_int, _start_int + _solved['Length'])
+        _geo_list[index] = _solved
+
+        #the previous end of the solved element, held by the next element if any
+        _end = _solved['InternalStation'][1]
+
+        if index < len(_geo_list) - 1:
+            _end = _geo_list[index + 1]['InternalStation'][0]
+
+        elif _old_int is not None:
+            _end = _old_int[1]
+
+        _shift = _solved['InternalStation'][1] - _end
+
+        if _meta.get('Length') is not None:
+            _meta['Length'] += _shift
+
+        if index == len(_geo_list) - 1:
+            return True
+
+        #the next element still begins at the previous end of the solved element
+        _next = _geo_list[index + 1]
+
+        _pivot = _next['Start']
+        _rotation = _solved['BearingOut'] - _next['BearingIn']
+
+        #rotate and translate the downstream elements as a rigid body
+        for _g in _geo_list[index + 1:]:
+
+            for _k in ['Start', 'End', 'Center', 'PI']:
+
+                if _g.get(_k) is None:
+                    continue
+
+                _g[_k] = _solved['End'].add(Support.rotate_bearing(_g[_k].sub(_pivot), _rotation))
+
+            for _k in ['BearingIn', 'BearingOut']:
+                _g[_k] = (_g[_k] + _rotation) % C.TWO_PI
+
+            _g['InternalStation'] = (
+                _g['InternalStation'][0] + _shift, _g['InternalStation'][1] + _shift
+            )
+
+            _g['StartStation'] += _shift / _sf
+
+        return True
+
+    def validate_alignment(self):
+        '''
+        Ensure the alignment geometry is continuous.
+        Any discontinuities (gaps between end / start coordinates)
+        must be filled by a completely defined line
+        '''
+
+        _prev_coord = self.geometry['meta']['Start']
+        _geo_list = []
+
+        for _geo in self.geometry['geometry']:
+
+            if not _geo:
+                continue
+
+            _coord = _geo['Start']
+
+            if not Support.within_tolerance(_coord.Length, _prev_coord.Length):
+
+                #build the line using the provided parameters and add it
+                _geo_list.append(
+                    Line.get_parameters({'Start': App.Vector(_prev_coord),
+                                         'End': App.Vector(_coord),
+                                         'BearingIn': _geo['BearingIn'],
+                                         'BearingOut': _geo['BearingOut'],
+                                         })
+                )
+
+            _geo_list.append(_geo)
+            _prev_coord = _geo['End']
+
+        self.geometry['geometry'] = _geo_list
+
+    def validate_datum(self):
+        '''
+        Ensure the datum is valid, assuming 0+00 / (0,0,0) for station and coordinate
+        where none is suplpied and it cannot be inferred fromt the starting geometry
+        '''
+        _datum = self.geometry['meta']
+        _geo = self.geometry['geometry'][0]
+
+        if not _geo or not _datum:
+            print('Unable to validate alignment datum')
+            return
+
+        _datum_truth = [not _datum.get('StartStation') is None,
+                        not _datum.get('Start') is None]
+
+        _geo_truth = [not _geo.get('StartStation') is None,
+                      not _geo.get('Start') is None]
+
+        #----------------------------
+        #CASE 0
+        #----------------------------
+        #both defined?  nothing to do
+        if all(_datum_truth):
+            return
+
+        _geo_station = 0
+        _geo_start = App.Vector()
+
+        if _geo_truth[0]:
+            _geo_station = _geo['StartStation']
+
+        if _geo_truth[1]:
+            _geo_start = _geo['Start']
+
+        #---------------------
+        #CASE 1
+        #---------------------
+        #no datum defined?  use initial geometry or zero defaults
+        if not any(_datum_truth):
+
+            _datum['StartStation'] = _geo_station
+            _datum['Start'] = _geo_start
+            return
+
+        #--------------------
+        #CASE 2
+        #--------------------
+        #station defined?
+        #if the geometry has a station and coordinate, project the start coordinate
+        if _datum['StartStation']:
+
+            _datum['Start'] = _geo_start
+
+            #assume geometry start if no geometry station
+            if not _geo_truth[0]:
+                return
+
+            #scale the distance to the system units
+            delta = _geo_station - _datum['StartStation']
+
+            #cutoff if error is below tolerance
+            if not Support.within_tolerance(delta):
+                delta *= Units.scale_factor()
+            else:
+                delta = 0.0
+
+            #assume geometry start if station delta is zero
+            if delta:
+
+                #calcualte the start based on station delta
+                _datum['Start'] = _datum['Start'].sub(
+                    Support.vector_from_angle(_geo['BearingIn']).multiply(delta)
+                )
+
+            return
+
+        #---------------------
+        #CASE 3
+        #---------------------
+        #datum start coordinate is defined
+        #if the geometry has station and coordinate, project the start station
+        _datum['StartStation'] = _geo_station
+
+        #assume geometry station if no geometry start
+        if _geo_truth[1]:
+
+            #scale the length to the document units
+            delta = _geo_start.sub(_datum['Start']).Length / Units.scale_factor()
+
+            _datum['StartStation'] -= delta
+
+    def validate_coordinates(self):
+        '''
+        Iterate the geometry, testing for incomplete / incorrect station / coordinate values
+        Fix them where possible, error if values cannot be resolved
+        '''
+
+        #calculate distance bewteen curve start and end using
+        #internal station and coordinate vectors
+
+        _datum = self.geometry['meta']
+        _geo_data = self.geometry['geometry']
+
+        _prev_geo = {'End': _datum['Start'], 'InternalStation': (0.0, 0.0),
+                     'StartStation': _datum['StartStation'], 'Length': 0.0
+                    }
+
+        _sf = Units.scale_factor()
+
+        for _geo in _geo_data:
+
+            if not _geo:
+                continue
+            #get the vector between the two gemetries and the station distance
+            _vector = _geo['Start'].sub(_prev_geo['End'])
+            _sta_len = abs(_geo['InternalStation'][0] - _prev_geo['InternalStation'][1])
+
+            #calculate the difference between the vector length and station distance
+            #in document units
+            _delta = (_vector.Length - _sta_len) / _sf
+
+            #if the stationing / coordinates are out of tolerance,
+            #determine if the error is with the coordinate vector or station
+            if not Support.within_tolerance(_delta):
+                bearing_angle = Support.get_bearing(_vector)
+
+                #if the coordinate vector bearing matches, fix the station
+                if Support.within_tolerance(bearing_angle, _geo['BearingIn']):
+                    _geo['InternalStation'] = (
+                        _prev_geo['InternalStation'][1] + _vector.Length, _geo['InternalStation'][0]
+                        )
+
+                    _geo['StartStation'] = _prev_geo['StartStation'] + \
+                                           _prev_geo['Length'] / _sf + _vector.Length / _sf
+
+                #otherwise, fix the coordinate
+                else:
+                    _bearing_vector = Support.vector_from_angle(_geo['BearingIn'])
+                    _bearing_vector.multiply(_sta_len)
+
+                    _geo['Start'] = _prev_geo['End'].add(_bearing_vector)
+
+            _prev_geo = _geo
+
+    def validate_bearings(self):
+        '''
+        Validate the bearings between geometry, ensuring they are equal
+        '''
+
+        geo_data = self.geometry['geometry']
+
+        if len(geo_data) < 2:
+            return True
+
+        if geo_data[0] is None:
+            return False
+
+        prev_bearing = geo_data[0]['BearingOut']
+
+        for _geo in geo_data[1:]:
+
+            if not _geo:
+                continue
+
+            _b = _geo.get('BearingIn')
+
+            if _b is None:
+                self.errors.append('Invalid bearings ({0:.4f}, {1:.4f}) at curve {2}'
+                                   .format(prev_bearing, _b, _geo)
+                                  )
+                return False
+
+            if not Support.within_tolerance(_b, prev_bearing):
+                self.errors.append('Bearing mismatch ({0:.4f}, {1:.4f}) at curve {2}'
+                                   .format(prev_bearing, _b, _geo)
+                                  )
+                return False
+
+            prev_bearing = _geo.get('BearingOut')
+
+        return True
+
+    def validate_stationing(self):
+        '''
+        Iterate the geometry, calculating the internal start station based on the actual station
+        and storing it in an 'InternalStation' parameter tuple for the start and end of the curve
+        '''
+
+        prev_station = self.geometry['meta'].get('StartStation')
+        prev_coord = self.geometry['meta'].get('Start')
+
+        if not prev_coord or not prev_station:
+            print('Unable to validate alignment stationing')
+            return
+
+        _sf = Units.scale_factor()
+
+        for _geo in self.geometry['geometry']:
+
+            if not _geo:
+                continue
+
+            _geo['InternalStation'] = None
+            geo_station = _geo.get('StartStation')
+            geo_coord = _geo['Start']
+
+            #if no station is provided, try to infer it from the start coordinate
+            #and the previous station
+            if geo_station is None:
+                geo_station = prev_station
+
+                if not geo_coord:
+                    geo_coord = prev_coord
+
+                delta = geo_coord.sub(prev_coord).Length
+
+                if not Support.within_tolerance(delta):
+                    geo_station += delta / _sf
+
+                _geo['StartStation'] = geo_station
+
+            prev_coord = _geo['End']
+            prev_station = _geo['StartStation'] + _geo['Length'] / _sf
+
+            int_sta = self._get_internal_station(geo_station)
+
+            _geo['InternalStation'] = (int_sta, int_sta + _geo['Length'])
+
+    def build_station_equations(self):
+        '''
+        Return the station equations of the geometry as (back, ahead, direction) tuples
+        '''
+
+        _eqs = self.geometry['station']
+        _meta = self.geometry['meta']
+
+        result = []
+        _start_sta = Utils.to_float(_meta.get('StartStation'))
+
+        if _start_sta:
+            result.append((0.0, _start_sta, 0.0))
+        else:
+            self.errors.append('Unable to convert starting station %s'
+                               % _meta.get('StartStation')
+                              )
+
+        for _eqn in _eqs:
+
+            #default to increasing station if unspecified
+            if not _eqn['Direction']:
+                _eqn['Direction'] = 1.0
+
+            try:
+                result.append(
+                    (float(_eqn['Back']), float(_eqn['Ahead']), float(_eqn['Direction']))
+                )
+
+            except:
+                self.errors.append('Unable to convert station equation (%s)'
+                                   % (_eqn)
+                                  )
+
+        return result
+
+    def set_station_equations(self, equations):
+        '''
+        Assign the station equations, invalidating the compiled table
+        '''
+
+        self.station_equations = [tuple(_eq) for _eq in equations]
+        self.station_table = None
+
+    def get_station_table(self):
+        '''
+        Return the compiled station equation table, building it if necessary
+        '''
+
+        if self.station_table is None:
+            self.station_table = StationTable(
+                self.station_equations, scale=Units.scale_factor()
+            )
+
+        return self.station_table
+
+    def _get_internal_station(self, station):
+        '''
+        Using the station equations, determine the internal station
+        (position) along the alingment, scaled to the document units
+        '''
+
+        return self.get_station_table().to_distance(station)
+
+    def _get_station(self, position):
+        '''
+        Using the station equations, determine the station at the
+        internal station (position) along the alignment
+        '''
+
+        return self.get_station_table().to_station(position)
+
+    def get_station_index(self):
+        '''
+        Return the station index of the solved geometry, building it if necessary
+        '''
+
+        if self.station_index is None:
+            self.station_index = StationIndex(
+                self.geometry['geometry'], self.geometry['meta'].get('Length')
+            )
+
+        return self.station_index
+
+    def get_projection_index(self):
+        '''
+        Return the projection index of the solved geometry, building it if necessary.
+        The index is rebuilt whenever the station index is invalidated.
+        '''
+
+        _index = self.get_station_index()
+        _projection = self.projection_index
+
+        if _projection is None or _projection.station_index is not _index:
+            self.projection_index = ProjectionIndex(_index)
+
+        return self.projection_index
+
+    def get_station_offsets(self, points, exhaustive=True):
+        '''
+        Return the stations and offsets of points projected onto the alignment.
+
+        points - array of (x, y) or (x, y, z) coordinates in system units
+        exhaustive - if False, points far from the alignment return nan
+
+        Returns a tuple of numpy arrays (stations, offsets) in document units.
+        Offsets are positive to the right of the alignment.
+        '''
+
+        _distances, _offsets = self.get_projection_index().project(points, exhaustive)
+
+        return self._get_station(_distances), _offsets / Units.scale_factor()
+
+    def get_station_coordinates(self, stations):
+        '''
+        Return the coordinates and tangent bearings at the passed stations.
+
+        stations - a station or list / array of stations in document units
+
+        Returns (App.Vector, bearing) for a single station, or a tuple of
+        numpy arrays (coordinates (n, 3), bearings (n,)) for multiple stations.
+        Stations which fall outside the alignment return None / nan.
+        '''
+
+        _distances = self._get_internal_station(numpy.atleast_1d(stations))
+
+        coords, bearings = self.get_station_index().get_positions(_distances)
+
+        if numpy.ndim(stations) > 0:
+            return coords, bearings
+
+        if numpy.isnan(bearings[0]):
+            return None, None
+
+        return App.Vector(*coords[0]), float(bearings[0])
+
+    @staticmethod
+    def _get_point_key(curve, interval, interval_type):
+        '''
+        Return the point cache key for a solved curve and subdivision method.
+        Points are cached in the curve's local frame, so the key excludes
+        the start coordinate and bearing.
+        '''
+
+        return (curve['Type'], curve['Radius'], curve['Delta'], curve['Direction'],
+                interval, interval_type, Units.scale_factor())
+
+    def _get_arc_points(self, arcs, interval, interval_type):
+        '''
+        Return the discretized points of the arcs as a list of numpy arrays,
+        reusing cached point runs and discretizing only the arcs that changed
+        '''
+
+        #intervals may be given per arc
+        _intervals = numpy.broadcast_to(numpy.asarray(interval, dtype=float), (len(arcs),))
+
+        keys = [self._get_point_key(_arc, float(_v), interval_type)
+                for _arc, _v in zip(arcs, _intervals)]
+
+        local = [self.point_cache.get(_k) for _k in keys]
+
+        _misses = [_i for _i, _v in enumerate(local) if _v is None]
+
+        #discretize the missing arcs in their local frame (origin start, north bearing)
+        _points = Arc.get_points_batch(
+            [{**arcs[_i], 'Start': App.Vector(), 'BearingIn': 0.0} for _i in _misses],
+            _intervals[_misses], interval_type
+        )
+
+        for _i, _arc_points in zip(_misses, _points):
+
+            _arc_points.flags.writeable = False
+
+            self.point_cache.set(keys[_i], _arc_points)
+            local[_i] = _arc_points
+
+        result = []
+
+        #rotate the local points to the arc bearing and translate them to the arc start
+        for _arc, _local in zip(arcs, local):
+
+            _cos = math.cos(_arc['BearingIn'])
+            _sin = math.sin(_arc['BearingIn'])
+
+            _arc_points = numpy.empty_like(_local)
+            _arc_points[:, 0] = _local[:, 0] * _cos + _local[:, 1] * _sin
+            _arc_points[:, 1] = _local[:, 1] * _cos - _local[:, 0] * _sin
+            _arc_points[:, 2] = _local[:, 2]
+            _arc_points += tuple(_arc['Start'])
+
+            result.append(_arc_points)
+
+        return result
+
+    @staticmethod
+    def _get_arc_counts(arcs, tolerance):
+        '''
+        Return the fewest segments for each arc which hold its chord height
+        to the tolerance (system units)
+        '''
+
+        _delta = numpy.array([_a['Delta'] for _a in arcs], dtype=float)
+        _radius = numpy.array([_a['Radius'] for _a in arcs], dtype=float)
+
+        _ratio = numpy.minimum(tolerance / _radius, 1.0)
+
+        return numpy.maximum(numpy.ceil(_delta / (2.0 * numpy.arccos(1.0 - _ratio))), 1.0)
+
+    def _get_adaptive_tolerance(self, arcs, spirals, tolerance, max_vertices):
+        '''
+        Return the chord tolerance (system units) for adaptive discretization.
+        If the tolerance needs more vertices than the budget allows, the
+        smallest tolerance which fits the budget is returned instead.
+        '''
+
+        if not max_vertices:
+            return tolerance
+
+        def _count(value):
+
+            return self._get_arc_counts(arcs, value).sum() + sum(
+                max(math.ceil(Spiral.get_tolerance_count(_s, value)[0]), 1) for _s in spirals
+            )
+
+        #the alignment start and end and the start of each curve are always placed
+        _curves = len(arcs) + len(spirals)
+        _budget = max(max_vertices - 2 - _curves, _curves)
+
+        #curves turning more than half a circle need several segments at any tolerance,
+        #so the budget can never be less than the count at an unlimited tolerance
+        _budget = max(_budget, _count(math.inf))
+
+        if _count(tolerance) <= _budget:
+            return tolerance
+
+        #bracket, then bisect the smallest tolerance within the budget
+        _low, _high = tolerance, 2.0 * tolerance
+
+        while _count(_high) > _budget:
+            _low, _high = _high, 2.0 * _high
+
+        for _i in range(50):
+
+            _mid = 0.5 * (_low + _high)
+
+            if _count(_mid) > _budget:
+                _low = _mid
+            else:
+                _high = _mid
+
+        print('Vertex budget of %d exceeded, chord tolerance increased to %f'
+              % (max_vertices, _high / Units.scale_factor()))
+
+        return _high
+
+    def discretize(self, interval, interval_type, max_vertices=0):
+        '''
+        Discretize the alignment geometry, returning an (n, 3) numpy array of points
+
+        interval_type - 'Segment', 'Interval' or 'Tolerance' apply the interval to each curve.
+                        'Adaptive' places the fewest vertices holding the chord error of every
+                        curve to the interval (document units), relaxing the tolerance only
+                        if more than max_vertices would be required.
+        max_vertices - vertex budget for adaptive discretization.  Zero is unlimited.
+        '''
+
+        geometry = [_g for _g in self.geometry['geometry'] if _g]
+
+        if not geometry:
+            return None
+
+        arcs = [_g for _g in geometry if _g['Type'] == 'arc']
+
+        spiral_interval, spiral_type = interval, interval_type
+
+        if interval_type == 'Adaptive':
+
+            _sf = Units.scale_factor()
+
+            _tolerance = self._get_adaptive_tolerance(
+                arcs, [_g for _g in geometry if _g['Type'] == 'spiral'], interval * _sf,
+                max_vertices
+            )
+
+            arc_points = iter(self._get_arc_points(
+                arcs, self._get_arc_counts(arcs, _tolerance), 'Count'
+            ))
+
+            spiral_interval, spiral_type = _tolerance / _sf, 'Tolerance'
+
+        else:
+            arc_points = iter(self._get_arc_points(arcs, interval, interval_type))
+
+        #tangents contribute only their end points, so the alignment start
+        #and the discretized curves define the polyline
+        points = [numpy.array([tuple(self.geometry['meta']['Start'])], dtype=float)]
+
+        for _g in geometry:
+
+            if _g['Type'] == 'arc':
+                points.append(next(arc_points))
+
+            elif _g['Type'] == 'spiral':
+                points.append(Spiral.get_points(_g, spiral_interval, spiral_type))
+
+        #drop the first point of each run which duplicates the end of the previous run
+        result = [points[0]]
+
+        for _run in points[1:]:
+
+            if numpy.linalg.norm(result[-1][-1] - _run[0]) < 0.0001:
+                _run = _run[1:]
+
+            result.append(_run)
+
+        last_curve = geometry[-1]
+        _end = numpy.array([tuple(last_curve['End'])], dtype=float)
+
+        #close a final tangent element
+        if numpy.linalg.norm(result[-1][-1] - _end[0]) >= 0.0001:
+            result.append(_end)
+
+        _length = self.geometry['meta'].get('Length') or last_curve['InternalStation'][1]
+        last_tangent = abs(_length - last_curve['InternalStation'][1])
+
+        if not Support.within_tolerance(last_tangent):
+            _vec = Support.vector_from_angle(last_curve['BearingOut']).multiply(last_tangent)
+            result.append(_end + tuple(_vec))
+
+        return numpy.concatenate(result)
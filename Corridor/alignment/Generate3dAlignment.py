@@ -30,14 +30,14 @@
 import os
 import math
 
-import numpy as np
-from scipy import interpolate
-
 import FreeCAD as App
 import FreeCADGui as Gui
 import Draft
 import Part
 
+from Geometry.Alignment3d import Alignment3d
+from Corridor.Alignment.GenerateVerticalAlignment import GenerateVerticalAlignment
+
 class Generate3dAlignment():
     '''
     Horizontal alignment generation class.
@@ -63,6 +63,46 @@ class Generate3dAlignment():
                 'ToolTip' : "Generate the 3D Alignment from an Alignment group",
                 'CmdType' : "ForEdit"}
 
+    def get_composite(self, alignments):
+        '''
+        Return the exact 3D alignment composed from the horizontal alignment
+        geometry and the vertical curves of the alignment group
+        '''
+
+        _proxy = getattr(alignments[0], 'Proxy', None)
+
+        if not hasattr(_proxy, 'get_station_index'):
+            print('Horizontal alignment geometry not found')
+            return None
+
+        profile = GenerateVerticalAlignment().get_profile(alignments[1])
+
+        if profile is None:
+            return None
+
+        return Alignment3d(_proxy.get_station_index(), profile)
+
+    def get_window(self, alignment, start_station, end_station):
+        '''
+        Return the internal stations bounding the station window,
+        defaulting to the ends of the alignment
+        '''
+
+        start = 0.0
+        end = alignment.Proxy.get_station_index().total_length
+
+        if start_station is not None:
+            start = max(start, alignment.Proxy.get_internal_stations(start_station))
+
+        if end_station is not None:
+            end = min(end, alignment.Proxy.get_internal_stations(end_station))
+
+        if end <= start:
+            print('Invalid station window: ', start_station, end_station)
+            return None, None
+
+        return start, end
+
     def validate_selection(self):
         '''
         Validate the selected object as either a horizontal and vertical alignment or
@@ -91,92 +131,60 @@ class Generate3dAlignment():
 
         return None
 
-    def build_alignment(self, alignments):
+    def build_alignment(self, alignments, interval=304.80, tolerance=0.0,
+                        start_station=None, end_station=None, piecewise=True):
         '''
         Build a 3D alignment from the supplied alignments
+
+        interval - maximum spacing of the interpolated points (default 1 foot)
+        tolerance - if non-zero, space points adaptively, keeping the chord
+                    error within the tolerance (mm), up to the interval
+        start_station, end_station - optional station window (document units)
+                                     limiting the range of the 3D alignment
+        piecewise - build a B-spline for each piece of geometry between
+                    horizontal and vertical breaks, rather than one spline
         '''
 
         parent = alignments[0].InList[0]
 
-        #get list of geometry edges
-        edges = [alignments[0].Shape.Edges[0], alignments[1].Shape.Edges[0]]
-
-        #get the horizontal curve's first and last parameters
-        params = [edges[0].FirstParameter, edges[0].LastParameter]
-
-        #get the length of the curve and set the step interval
-        hz_len = edges[0].Length
-
-        #default 1-foot resolution
-        step = 304.80
-
-        points = []
-
-        #divide the length by the number of steps, truncating the integer
-        #then add one for the concluding point for the steps,
-        #plus a point for the end of the edge, if the step point falls short
-        point_count = int(hz_len / float(step)) + 1
+        composite = self.get_composite(alignments)
 
-        if ((point_count - 1) * step) < hz_len:
-            point_count += 1
+        if composite is None:
+            return None
 
-        #vertial curve as equidistant points at the step interval...
-        vt_pts = edges[1].discretize(Number=point_count, First=0.00, Last=hz_len)
+        start, end = self.get_window(alignments[0], start_station, end_station)
 
-        end_point = vt_pts[point_count - 1]
+        if start is None:
+            return None
 
-        #this pairs coordinates of like axes in three tuples (x_coords,y_coords,z)
-        vt_pt_axes = np.array(vt_pts).swapaxes(0, 1)
-
-        #save the x_coords/y_coords coordinate pairs in separate variables
-        x_coords = []
-        _i = 0.0
-
-        while _i <= hz_len:
-            x_coords.append(_i)
-            _i += step
-
-        #if we added two to the point count, then the step interval
-        #won't quite make it to the end... add the length as the last point
-        if len(x_coords) < point_count:
-            x_coords.append(hz_len)
-
-        y_coords = vt_pt_axes[1]
-
-        #append the final elevation - see above
-        if (len(y_coords) < point_count):
-            y_coords = np.append(y_coords, end_point.y)
-
-        #interpolation...
-        ff = interpolate.interp1d(x_coords, y_coords, kind='cubic', bounds_error=False, fill_value=0)
+        res = App.activeDocument().addObject('Part::Feature','Composite_' + parent.Label)
 
-        ll = int(edges[0].Length) + 1
+        if piecewise:
 
-        #create a set of x_coords-values evenly spaced between 0 and ll at the specified step interval
-        xnew = np.arange(0, ll, step)
+            edges = []
 
-        if xnew[-1] != edges[0].Length:
-            xnew = np.append(xnew, edges[0].Length)
+            for _points, _tangents in composite.iter_pieces(interval, start, end, tolerance):
 
-        #interpolates y_coords values for the specified x_coords values
-        ynew = ff(xnew)
+                _s = Part.BSplineCurve()
+                _s.interpolate(
+                    [App.Vector(*_p) for _p in _points], Tangents=[App.Vector(*_t) for _t in _tangents]
+                )
 
-        for i in range(xnew.shape[0]):
+                edges.append(_s.toShape())
 
-            position = params[0] + step * (params[1] - params[0]) / hz_len * i
+            res.Shape = Part.Wire(edges)
 
-            #x,y coordinate on horizontal
-            point = edges[0].Curve.value(position)
+        else:
 
-            #generate z-coordinate for 3D spline
-            points.append(App.Vector(point.x, point.y, ynew[i]))
+            points = []
 
-        res = App.activeDocument().addObject('Part::Feature','Composite_' + parent.Label)
+            for _d, _points in composite.iter_samples(interval, start, end, tolerance):
+                points.extend([App.Vector(*_p) for _p in _points])
 
-        _s = Part.BSplineCurve()
-        _s.interpolate(points)
+            _s = Part.BSplineCurve()
+            _s.interpolate(points)
 
-        res.Shape = _s.toShape()
+            res.Shape = _s.toShape()
 
         parent.addObject(res)
 
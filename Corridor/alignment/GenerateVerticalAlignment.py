@@ -27,10 +27,15 @@ Vertical alignment generation tool for creating parabolic vertical curves
 import os
 import math
 
+import numpy
+
 import FreeCAD as App
 import FreeCADGui as Gui
 import Draft
 
+from Project.Support import StationTable
+from Geometry import VerticalProfile
+
 class GenerateVerticalAlignment():
     '''
     Vertical alignment generation class.
@@ -42,6 +47,9 @@ class GenerateVerticalAlignment():
     def __init__(self):
         self._scale_factor = 10.0
 
+        #station equation tables, compiled once per metadata object for each build
+        self._station_tables = {}
+
     def GetResources(self):
         """
         Icon resources.
@@ -170,37 +178,41 @@ class GenerateVerticalAlignment():
         from the start station provided by the metadata objecet
         '''
 
+        table = self._get_station_table(meta)
+
+        if not table.contains(local_sta):
+            return -1.0
+
+        return table.to_distance(local_sta)
+
+    def _get_station_table(self, meta):
+        '''
+        Return the compiled station equation table for the metadata object.
+        Equations are stored in feet, while the metadata stations are in mm.
+        '''
+
+        if meta.Name in self._station_tables:
+            return self._station_tables[meta.Name]
+
         eq_name = 'Equation_1'
         eq_no = 1
         eq_list = []
 
         while eq_name in meta.PropertiesList:
 
-            eq_list.append(meta.getPropertyByName(eq_name))
+            _eq = meta.getPropertyByName(eq_name)
+            eq_list.append((_eq[0] * 304.8, _eq[1] * 304.8))
             eq_no += 1
 
             eq_name = 'Equation_' + str(eq_no)
 
-        fwd_sta = meta.Start_Station.Value
-        end_sta = meta.End_Station.Value
-        offset = 0
-
-        for st_eq in eq_list:
-
-            bck_sta = st_eq[0] * 304.8
-
-            if fwd_sta <= local_sta <= bck_sta:
-                return  (local_sta - fwd_sta) + offset
-
-            offset += (bck_sta - fwd_sta)
-            fwd_sta = st_eq[1] * 304.8
+        table = StationTable.get_table(
+            eq_list, meta.Start_Station.Value, meta.End_Station.Value
+        )
 
-        #if we're still here, the value hasn't been located.
-        #final test between the last forward station and the end
-        if fwd_sta <= local_sta <= end_sta:
-            return (local_sta - fwd_sta) + offset
+        self._station_tables[meta.Name] = table
 
-        return -1.0
+        return table
 
     def _get_reference_coordinates(self, alignment, station):
         '''
@@ -228,9 +240,10 @@ class GenerateVerticalAlignment():
 
         return result
 
-    def build_alignment(self, alignment):
+    def _get_alignment_data(self, alignment):
         '''
-        Generate the Vertical alignment
+        Return the metadata and vertical curve group objects
+        which share a parent with the passed object
         '''
 
         meta = None
@@ -246,10 +259,94 @@ class GenerateVerticalAlignment():
 
         if meta is None:
             print('Alignment metadata not found')
-            return
 
-        if curves is None:
+        elif curves is None:
             print('Vertical curve data not found')
+
+        return meta, curves
+
+    def get_profile(self, alignment):
+        '''
+        Return the analytic vertical profile of the Vertical curve group,
+        stationed by distance along the alignment
+        '''
+
+        self._station_tables = {}
+
+        meta, curves = self._get_alignment_data(alignment)
+
+        if meta is None or curves is None:
+            return None
+
+        return VerticalProfile.from_vertical_curves(
+            curves.OutList, lambda _sta: self._get_global_sta(_sta, meta)
+        )
+
+    def get_ground_profile(self, alignment, terrain, interval=3048.0):
+        '''
+        Return the existing ground profile of a terrain surface along a horizontal
+        alignment, sampled at a fixed interval of distance along the alignment.
+        The profile is returned as lists of points, split where the alignment
+        leaves the surface.
+
+        alignment - HorizontalAlignment object
+        terrain - Terrain surface
+        interval - sampling interval (mm)
+        '''
+
+        _index = alignment.Proxy.get_station_index()
+
+        if _index is None or not _index.total_length:
+            print('Alignment geometry not found')
+            return []
+
+        _distances = numpy.append(
+            numpy.arange(0.0, _index.total_length, interval), _index.total_length
+        )
+
+        _coords = _index.get_positions(_distances)[0]
+        _elevations = terrain.elevation_at(_coords)
+
+        #runs of consecutive samples on the surface
+        _valid = numpy.concatenate([[False], numpy.isfinite(_elevations), [False]])
+        _edges = numpy.flatnonzero(numpy.diff(_valid.astype(int))).reshape(-1, 2)
+
+        return [
+            [App.Vector(_d, _z * self._scale_factor, 0.0)
+             for _d, _z in zip(_distances[_lo:_hi], _elevations[_lo:_hi])]
+            for _lo, _hi in _edges
+        ]
+
+    def build_ground_line(self, alignment, terrain, interval=3048.0):
+        '''
+        Generate the existing ground line wires of a terrain surface along
+        a horizontal alignment, at the scale of the vertical alignment
+        '''
+
+        result = []
+
+        for _points in self.get_ground_profile(alignment, terrain, interval):
+
+            _wire = self._generate_wire(_points, 'EG_' + alignment.Label)
+
+            if _wire is not None:
+                result.append(_wire)
+
+        App.ActiveDocument.recompute()
+
+        return result
+
+    def build_alignment(self, alignment):
+        '''
+        Generate the Vertical alignment
+        '''
+
+        #metadata may have changed since the last build
+        self._station_tables = {}
+
+        meta, curves = self._get_alignment_data(alignment)
+
+        if meta is None or curves is None:
             return
 
         cur_pt = self._get_global_sta(meta.Start_Station.Value, meta)
@@ -31,7 +31,9 @@ import FreeCADGui as Gui
 import Draft
 import numpy
 
-from Project.Support import Properties, Units, Utils, DocumentProperties
+from Project.Support import Properties, Units, Utils, DocumentProperties, StationTable
+from Project.Support.Utils import Constants as C
+from Geometry import Spiral
 
 _CLASS_NAME = 'VerticalAlignment'
 _TYPE = 'Part::Part2DObjectPython'
@@ -44,6 +46,235 @@ meta_fields = ['ID', 'Northing', 'Easting']
 data_fields = ['Northing', 'Easting', 'Bearing', 'Distance', 'Radius', 'Degree', 'Spiral']
 station_fields = ['Parent_ID', 'Back', 'Forward']
 
+def parse_geometry(geometry):
+    '''
+    Parse the comma-delimited geometry strings into an (n, 4) array of
+    (distance, bearing (degrees), radius, spiral length) rows
+    '''
+
+    if not geometry:
+        return numpy.zeros((0, 4))
+
+    return numpy.array([_g.split(',') for _g in geometry], dtype=float).reshape(-1, 4)
+
+def get_directed_angle(bearing_in, bearing_out):
+    '''
+    Return the direction (1.0 = clockwise, -1.0 = counter-clockwise) and the
+    unsigned central angle between two bearings (radians) as numpy arrays
+    '''
+
+    _delta = numpy.pi - (numpy.pi - (numpy.asarray(bearing_out) - numpy.asarray(bearing_in))) % C.TWO_PI
+
+    return numpy.where(_delta < 0.0, -1.0, 1.0), numpy.abs(_delta)
+
+def get_segments(angle, radius, interval, interval_type):
+    '''
+    Return the angle increment, the number of full increments and whether a
+    partial segment concludes each curve, as numpy arrays.
+    Mirrors calc_angle_increment() and discretize_arc() for arrays of curves.
+    '''
+
+    angle = numpy.asarray(angle, dtype=float)
+    radius = numpy.asarray(radius, dtype=float)
+
+    if interval <= 0.0 and angle.any():
+        print('Invalid interval value', interval, 'for interval type ', interval_type)
+
+    with numpy.errstate(divide='ignore', invalid='ignore'):
+
+        if interval_type == 'Segment':
+            seg_rad = angle / interval
+
+        elif interval_type == 'Interval':
+            seg_rad = interval / radius
+
+        elif interval_type == 'Tolerance':
+            seg_rad = 2 * numpy.arccos(1 - (interval / radius))
+
+        else:
+            seg_rad = numpy.zeros(angle.shape)
+
+        seg_rad = numpy.where((angle == 0.0) | (interval <= 0.0), 0.0, seg_rad)
+
+        #tangents (zero angle) place a single point, one radius ahead
+        segments = numpy.where(angle != 0.0, numpy.trunc(angle / seg_rad), 1.0)
+
+    segments[~numpy.isfinite(segments)] = 0.0
+
+    partial = numpy.abs(seg_rad * segments - angle) * radius > 0.0001
+
+    return seg_rad, segments.astype(int), partial
+
+def discretize_geometry(data, interval, interval_type):
+    '''
+    Discretize the parsed geometry array (see parse_geometry()) to an (n, 3)
+    array of points in a single batched pass, starting at the origin.
+    Produces the same points as discretize_geometry_reference().
+    '''
+
+    if not len(data):
+        print('No geometry defined.  Unnable to discretize')
+        return None
+
+    #each element is constructed looking back at the previous one,
+    #with the last element repeated to construct it
+    _prev = data
+    _next = data[numpy.minimum(numpy.arange(len(data)) + 1, len(data) - 1)]
+
+    _distance, _radius, _spiral = _prev[:, 0], _prev[:, 2], _prev[:, 3]
+
+    bearing_in = numpy.radians(_prev[:, 1])
+    curve_dir, central_angle = get_directed_angle(bearing_in, numpy.radians(_next[:, 1]))
+
+    with numpy.errstate(divide='ignore', invalid='ignore'):
+
+        curve_tangent = numpy.where(
+            _spiral > 0.0,
+            (_spiral / 2.0) + (_radius + ((_spiral**2) / (24 * _radius))) * numpy.tan(central_angle / 2.0),
+            _radius * numpy.tan(central_angle / 2.0)
+        )
+
+    prev_curve_tangent = numpy.concatenate([[0.0], curve_tangent[:-1]])
+
+    tangent_length = _distance - curve_tangent - prev_curve_tangent
+
+    #pieces are ordered by element, tangents ahead of curves
+    _is_tangent = tangent_length >= 1
+    _is_arc = (_radius > 0.0) & ~(_spiral > 0.0)
+    _is_spiral = (_radius > 0.0) & (_spiral > 0.0)
+
+    _tan_idx = numpy.flatnonzero(_is_tangent)
+    _arc_idx = numpy.flatnonzero(_is_arc)
+
+    #tangents and arcs share the circular arc construction
+    _idx = numpy.concatenate([_tan_idx, _arc_idx])
+
+    _angle = numpy.concatenate([numpy.zeros(len(_tan_idx)), central_angle[_arc_idx]])
+    _rad = numpy.concatenate([tangent_length[_tan_idx], _radius[_arc_idx]])
+    _dir = numpy.concatenate([numpy.ones(len(_tan_idx)), curve_dir[_arc_idx]])
+
+    _keys = [2 * _tan_idx, 2 * _arc_idx + 1]
+
+    seg_rad, segments, partial = get_segments(_angle, _rad, interval, interval_type)
+
+    _counts = [segments + partial]
+
+    _total = _counts[0].sum()
+    _piece = numpy.repeat(numpy.arange(len(_idx)), _counts[0])
+    _local = numpy.arange(_total) - numpy.repeat(numpy.cumsum(_counts[0]) - _counts[0], _counts[0])
+
+    _delta = (_local + 1) * seg_rad[_piece]
+
+    #the partial segment concludes at the central angle
+    _last = numpy.cumsum(_counts[0]) - 1
+    _delta[_last[partial]] = _angle[partial]
+
+    _bearing = bearing_in[_idx][_piece]
+    _sin, _cos = numpy.sin(_bearing), numpy.cos(_bearing)
+
+    _dfw = numpy.where(_delta != 0.0, numpy.sin(_delta), 1.0) * _rad[_piece] * 304.80
+    _drt = _dir[_piece] * (1 - numpy.cos(_delta)) * _rad[_piece] * 304.80
+
+    _offsets = [numpy.column_stack([_sin * _dfw + _cos * _drt, _cos * _dfw - _sin * _drt, numpy.zeros(_total)])]
+
+    #spiral curves are constructed relative to the origin
+    _sp_idx = numpy.flatnonzero(_is_spiral)
+
+    if len(_sp_idx):
+
+        _spirals = Spiral.discretize_spirals(
+            bearing_in[_sp_idx], _radius[_sp_idx], central_angle[_sp_idx] * curve_dir[_sp_idx],
+            _spiral[_sp_idx], interval, interval_type
+        )
+
+        if _spirals is None:
+            print('Invalid spiral curve geometry.  Unable to discretize')
+            return None
+
+        _keys.append(2 * _sp_idx + 1)
+        _counts.append(_spirals[1])
+        _offsets.append(_spirals[0])
+
+    _keys = numpy.concatenate(_keys)
+    _counts = numpy.concatenate(_counts).astype(int)
+    _offsets = numpy.concatenate(_offsets)
+
+    #reorder the pieces and chain each from the last point of the one before
+    _order = numpy.argsort(_keys, kind='stable')
+    _starts = (numpy.cumsum(_counts) - _counts)[_order]
+    _counts = _counts[_order]
+
+    _gather = numpy.repeat(_starts, _counts) \
+        + numpy.arange(_counts.sum()) - numpy.repeat(numpy.cumsum(_counts) - _counts, _counts)
+
+    _ends = _offsets[_starts + _counts - 1]
+    _origins = numpy.cumsum(_ends, axis=0) - _ends
+
+    points = _offsets[_gather] + numpy.repeat(_origins, _counts, axis=0)
+
+    return numpy.concatenate([numpy.zeros((1, 3)), points])
+
+def discretize_geometry_reference(geometry, interval, interval_type):
+    '''
+    Per-element reference implementation of discretize_geometry(),
+    operating on the geometry strings.
+    Retained for parity testing against the batched implementation.
+    '''
+
+    #alignment construction requires a 'look ahead' at the next element
+    #This implementation does a 'look back' at the previous.
+    #Thus, iteration starts at the second element and
+    #the last element is duplicated to ensure it is constructed.
+    if not geometry:
+        print('No geometry defined.  Unnable to discretize')
+        return None
+
+    prev_geo = [float(_i) for _i in geometry[0].split(',')]
+
+    #test in case we only have one geometric element
+    if len(geometry) > 1:
+        geometry = geometry[1:]
+        geometry.append(geometry[-1])
+
+    prev_curve_tangent = 0.0
+
+    coords = [App.Vector(0.0, 0.0, 0.0)]
+
+    for geo_string in geometry:
+
+        #convert the commo-delimited string of floats into a list of strings, then to floats
+        _geo = [float(_i) for _i in geo_string.split(',')]
+
+        bearing_in = math.radians(prev_geo[1])
+        bearing_out = math.radians(_geo[1])
+
+        curve_dir, central_angle = [float(_v) for _v in get_directed_angle(bearing_in, bearing_out)]
+
+        curve_tangent = prev_geo[2] * math.tan(central_angle / 2.0)
+
+        #alternate calculation for spiral curves
+        if prev_geo[3] > 0.0:
+            curve_tangent = (prev_geo[3] / 2.0) + (prev_geo[2] + ((prev_geo[3]**2)/(24 * prev_geo[2]))) * math.tan(central_angle / 2.0)
+
+        #previous tangent length = distance between PI's minus the two curve tangents
+        prev_tan_len = prev_geo[0] - curve_tangent - prev_curve_tangent
+
+        #skip if our tangent length is too short leadng up to a curve (likely a compound curve)
+        if prev_tan_len >= 1:
+            coords.extend(_VerticalAlignment.discretize_arc(coords[-1], bearing_in, prev_tan_len, 0.0, 0.0, 'Segment'))
+
+        #zero radius means no curve.  We're done
+        if prev_geo[2] > 0.0:
+            if prev_geo[3] > 0.0:
+                coords.extend(_VerticalAlignment.discretize_spiral(coords[-1], bearing_in, prev_geo[2], central_angle * curve_dir, prev_geo[3], interval, interval_type))
+            else:
+                coords.extend(_VerticalAlignment.discretize_arc(coords[-1], bearing_in, prev_geo[2], central_angle * curve_dir, interval, interval_type))
+
+        prev_geo = _geo
+        prev_curve_tangent = curve_tangent
+
+    return coords
+
 def create(data, object_name='', units='English', parent=None):
     '''
     Class construction method
@@ -93,6 +324,7 @@ class _VerticalAlignment(Draft._Wire):
         self.Type = _CLASS_NAME
         self.Object = obj
         self.errors = []
+        self.geometry_data = None
 
         obj.Label = label
         obj.Closed = False
@@ -129,6 +361,7 @@ class _VerticalAlignment(Draft._Wire):
         '''
 
         self.Object = fp
+        self.geometry_data = None
 
     def set_units(self, units):
         '''
@@ -303,6 +536,8 @@ class _VerticalAlignment(Draft._Wire):
         self.Object.PIs = _points
         self.Object.Geometry = _geometry
 
+        self.geometry_data = parse_geometry(_geometry)
+
     def set_data(self, data):
         '''
         Assign curve data to object, parsing and converting to coordinate form
@@ -330,32 +565,15 @@ class _VerticalAlignment(Draft._Wire):
 
         #default starting station unles otherwise specified
         start_sta = 0.0
-        start_index = 0
 
         #if the first equation's back value is zero, it's forward value is the starting station
-        if equations:
-            if equations[0][0] == 0.0:
-                start_sta = equations[0][1]
-                start_index = 1
-
-        distance = 0
-
-        if len(equations) > 1:
-
-            #iterate the equation list, locating the passed station
-            for _eqn in equations[start_index:]:
+        if equations and equations[0][0] == 0.0:
+            start_sta = None
 
-                #does station fall between previous forward and current back?
-                if start_sta <= station <= _eqn[0]:
-                    break
+        table = StationTable.get_table(equations, start_sta)
 
-                #otherwise, accumulate the total distance between the previous forward and current back
-                distance += _eqn[0] - start_sta
-
-                #set the starting station to the current forward
-                start_sta = _eqn[1]
-
-        distance += station - start_sta
+        distance = table.to_distance(station)
+        start_sta = table.ahead[0]
 
         #station bound checks
         if distance > parent.Shape.Length or distance < 0.0:
@@ -424,7 +642,7 @@ class _VerticalAlignment(Draft._Wire):
             curve_dir = -1.0
             angle = abs(angle)
 
-        seg_rad = _HorizontalAlignment.calc_angle_increment(angle, radius, interval, interval_type)
+        seg_rad = _VerticalAlignment.calc_angle_increment(angle, radius, interval, interval_type)
 
         segments = 1
 
@@ -465,153 +683,44 @@ class _VerticalAlignment(Draft._Wire):
     @staticmethod
     def discretize_spiral(start_coord, bearing, radius, angle, length, interval, interval_type):
         '''
-        Discretizes a spiral curve using the length parameter.  
+        Discretizes a spiral curve using the length parameter.
         '''
 
-        #generate inbound spiral
-        #generate circular arc
-        #generate outbound spiral
-
-        points = []
-
-        length_mm = length * 304.80
-        radius_mm = radius * 304.80
-
-        bearing_in = App.Vector(math.sin(bearing), math.cos(bearing))
-
-        curve_dir = 1.0
-
-        if angle < 0.0:
-            curve_dir = -1.0
-            angle = abs(angle)
-
-        _Xc = ((length_mm**2) / (6.0 * radius_mm))
-        _Yc = (length_mm - ((length_mm**3) / (40 * radius_mm**2)))
-
-        _dY = App.Vector(bearing_in).multiply(_Yc)
-        _dX = App.Vector(bearing_in.y, -bearing_in.x, 0.0).multiply(curve_dir).multiply(_Xc)
-
-        theta_spiral = length_mm/(2 * radius_mm)
-        arc_start = start_coord.add(_dX.add(_dY))
-        arc_coords = [arc_start]
-        arc_coords.extend(_HorizontalAlignment.discretize_arc(arc_start, bearing + (theta_spiral * curve_dir), radius, curve_dir * (angle - (2 * theta_spiral)), interval, interval_type))
-
-        if len(arc_coords) < 2:
-            print('Invalid central arc defined for spiral')
-            return None
-
-        segment_length = arc_coords[0].distanceToPoint(arc_coords[1])
-        segments = int(length_mm / segment_length) + 1
-
-        for _i in range(0, segments):
-
-            _len = float(_i) * segment_length
-
-            _x = (_len ** 3) / (6.0 * radius_mm * length_mm)
-            _y = _len - ((_len**5) / (40 * (radius_mm ** 2) * (length_mm**2)))
-
-            _dY = App.Vector(bearing_in).multiply(_y)
-            _dX = App.Vector(bearing_in.y, -bearing_in.x, 0.0).multiply(curve_dir).multiply(_x)
-
-            points.append(start_coord.add(_dY.add(_dX)))
-
-        points.extend(arc_coords)
-
-        exit_bearing = bearing + (angle * curve_dir)
-        bearing_out = App.Vector(math.sin(exit_bearing), math.cos(exit_bearing), 0.0)
-
-        _dY = App.Vector(bearing_out).multiply(_Yc)
-        _dX = App.Vector(-bearing_out.y, bearing_out.x, 0.0).multiply(curve_dir).multiply(_Xc)
+        return Spiral.discretize_spiral(
+            start_coord, bearing, radius, angle, length, interval, interval_type
+        )
 
-        end_coord = points[-1].add(_dY.add(_dX))
-
-        temp = [end_coord]
-
-        for _i in range(1, segments):
-
-            _len = float(_i) * segment_length
-
-            if _len > length_mm:
-                _len = length_mm
-
-            _x = (_len ** 3) / (6.0 * radius_mm * length_mm)
-            _y = _len - ((_len ** 5) / (40 * (radius_mm ** 2) * (length_mm**2)))
-
-            _dY = App.Vector(-bearing_out).multiply(_y)
-            _dX = App.Vector(bearing_out.y, -bearing_out.x, 0.0).multiply(curve_dir).multiply(_x)
-
-            temp.append(end_coord.add(_dY.add(_dX)))
+    def get_geometry_data(self):
+        '''
+        Return the geometry as an (n, 4) array, parsing the
+        geometry strings if they have not been parsed
+        '''
 
-        points.extend(temp[::-1])
+        if getattr(self, 'geometry_data', None) is None:
+            self.geometry_data = parse_geometry(self.Object.Geometry)
 
-        return points
+        return self.geometry_data
 
     def _discretize_geometry(self):
         '''
         Discretizes the alignment geometry to a series of vector points
         '''
 
-        interval = self.Object.Seg_Value
-        interval_type = self.Object.Method
+        points = discretize_geometry(
+            self.get_geometry_data(), self.Object.Seg_Value, self.Object.Method
+        )
 
-        #alignment construction requires a 'look ahead' at the next element
-        #This implementation does a 'look back' at the previous.
-        #Thus, iteration starts at the second element and
-        #the last element is duplicated to ensure it is constructed.
-        geometry = self.Object.Geometry
-
-        if not geometry:
-            print('No geometry defined.  Unnable to discretize')
+        if points is None:
             return None
 
-        prev_geo = [float(_i) for _i in geometry[0].split(',')]
-
-        #test in case we only have one geometric element
-        if len(geometry) > 1:
-            geometry = geometry[1:]
-            geometry.append(geometry[-1])
-
-        prev_curve_tangent = 0.0
-
-        coords = [App.Vector(0.0, 0.0, 0.0)]
-
-        for geo_string in geometry:
-
-            #convert the commo-delimited string of floats into a list of strings, then to floats
-            _geo = [float(_i) for _i in geo_string.split(',')]
-
-            bearing_in = math.radians(prev_geo[1])
-            bearing_out = math.radians(_geo[1])
-
-            curve_dir, central_angle = Utils.directed_angle(Utils.vector_from_angle(bearing_in), Utils.vector_from_angle(bearing_out))
-
-            curve_tangent = prev_geo[2] * math.tan(central_angle / 2.0)
-
-            #alternate calculation for spiral curves
-            if prev_geo[3] > 0.0:
-                curve_tangent = (prev_geo[3] / 2.0) + (prev_geo[2] + ((prev_geo[3]**2)/(24 * prev_geo[2]))) * math.tan(central_angle / 2.0)
-
-            #previous tangent length = distance between PI's minus the two curve tangents
-            prev_tan_len = prev_geo[0] - curve_tangent - prev_curve_tangent
-
-            #skip if our tangent length is too short leadng up to a curve (likely a compound curve)
-            if prev_tan_len >= 1:
-                coords.extend(self.discretize_arc(coords[-1], bearing_in, prev_tan_len, 0.0, 0.0, 'Segment'))
-
-            #zero radius means no curve.  We're done
-            if prev_geo[2] > 0.0:
-                if prev_geo[3] > 0.0:
-                    coords.extend(self.discretize_spiral(coords[-1], bearing_in, prev_geo[2], central_angle * curve_dir, prev_geo[3], interval, interval_type))
-                else:
-                    coords.extend(self.discretize_arc(coords[-1], bearing_in, prev_geo[2], central_angle * curve_dir, interval, interval_type))
-
-            prev_geo = _geo
-            prev_curve_tangent = curve_tangent
-
-        return coords
+        return [App.Vector(*_p) for _p in points]
 
     def onChanged(self, obj, prop):
 
+        #geometry is re-parsed on the next discretization
+        if prop == 'Geometry':
+            self.geometry_data = None
+
         #dodge onChanged calls during initialization
         if hasattr(self, 'no_execute'):
             return
@@ -27,8 +27,10 @@ DESCRIPTION
 import FreeCAD as App
 import FreeCADGui as Gui
 import Part
+import numpy
 
 from Project.Support import Properties
+from Geometry import Superelevation
 
 _CLASS_NAME = 'ElementLoft'
 _TYPE = 'Part::FeaturePython'
@@ -77,6 +79,9 @@ class _ElementLoft(object):
         Properties.add(obj, 'Link', 'Template', 'Linked template', sketch)
         Properties.add(obj, 'Float', 'Interval', 'Section spacing interval', 100.0)
         Properties.add(obj, 'FloatList', 'Interval_Schedule', 'Schedule for loft section intervals', [], is_read_only=True, is_hidden=False)
+        Properties.add(obj, 'Link', 'Superelevation.Horizontal_Alignment', 'Horizontal alignment for the superelevation schedule, if not the linked alignment', None)
+        Properties.add(obj, 'Float', 'Superelevation.Design_Speed', 'Design speed (km/h) for superelevation.  Zero for none.', 0.0)
+        Properties.add(obj, 'Float', 'Superelevation.Max_Superelevation', 'Maximum superelevation rate (percent)', 8.0)
 
         self.Object = obj
 
@@ -109,8 +114,16 @@ class _ElementLoft(object):
         sketch = self.Object.Template
         interval = self.Object.Interval
 
+        superelevation = self.get_superelevation()
+        start = 0.0
+
+        if superelevation is not None:
+            start = self.get_start_station(spline)
+
         #create loft sections
-        section_list = self.build_sections(spline, sketch) #, interval)
+        section_list = self.build_sections(
+            spline, sketch, superelevation=superelevation, start=start
+        ) #, interval)
 
         #Part.show(Part.Compound(section_list))
         #create a compound of the components (polygons)
@@ -132,6 +145,68 @@ class _ElementLoft(object):
 
         self.regenerate()
 
+    def get_superelevation(self):
+        '''
+        Return the superelevation schedule of the horizontal alignment,
+        or None if no design speed is set
+        '''
+
+        obj = self.Object
+
+        if not getattr(obj, 'Design_Speed', 0.0):
+            return None
+
+        proxy = self._get_horizontal()
+
+        if proxy is None:
+            print('No horizontal alignment geometry for superelevation')
+            return None
+
+        return Superelevation.get_schedule(
+            proxy.get_station_index(), obj.Design_Speed, obj.Max_Superelevation / 100.0
+        )
+
+    def _get_horizontal(self):
+        '''
+        Return the horizontal alignment proxy for superelevation,
+        or None if the alignment has no solved geometry
+        '''
+
+        alignment = self.Object.Horizontal_Alignment
+
+        if alignment is None:
+            alignment = self.Object.Alignment
+
+        proxy = getattr(alignment, 'Proxy', None)
+
+        if not hasattr(proxy, 'get_station_index'):
+            return None
+
+        return proxy
+
+    def get_start_station(self, path):
+        '''
+        Return the internal station of the first vertex of the loft path,
+        projected onto the horizontal alignment, so paths which begin
+        part way along the alignment (e.g. station windows) are banked
+        at their own stations
+        '''
+
+        proxy = self._get_horizontal()
+        edges = path.Shape.Edges
+
+        if proxy is None or not edges:
+            return 0.0
+
+        _point = edges[0].Vertexes[0].Point
+        _station = proxy.get_projection_index().project([(_point.x, _point.y)])[0][0]
+
+        if numpy.isnan(_station):
+            print('Loft path start not on the horizontal alignment')
+            return 0.0
+
+        return float(_station)
+
     def show_interval_schedule(self):
         '''
         Create a temporary spreadsheet for viewing and
@@ -140,16 +215,23 @@ class _ElementLoft(object):
         pass
 
     @staticmethod
-    def build_sections(fpo, sketch, average=True):
+    def build_sections(fpo, sketch, average=True, superelevation=None, start=0.0):
         '''
         Generate / regenerate the loft along a wire path
+
+        superelevation - optional SuperelevationSchedule banking the sections
+        start - internal station of the start of the wire
         '''
-        comps = []
-        z_up = App.Vector(0, 0, 1)
 
+        edges = fpo.Shape.Edges
+
+        if not edges:
+            return []
+
+        tangents = []
         prev_tangent = None
 
-        for edge in fpo.Shape.Edges:
+        for edge in edges:
 
             tangent = edge.Curve.Direction
 
@@ -157,36 +239,47 @@ class _ElementLoft(object):
             if average and prev_tangent:
                 tangent = ((tangent + prev_tangent) / 2.0).normalize()
 
-            x_normal = tangent.cross(z_up).normalize()
-            z_normal = tangent.cross(x_normal).normalize()
+            tangents.append(tuple(tangent))
 
-            if z_normal.z < 0.0:
-                z_normal = z_normal.negative()
+            if average:
+                prev_tangent = tangent
 
-            for _i in range(0, 1):
+        tangents = numpy.array(tangents)
+        origins = numpy.array([tuple(_e.Vertexes[0].Point) for _e in edges])
 
-                origin = edge.Vertexes[_i].Point
-                poly_points = []
+        #horizontal normal (tangent x z-up) and the upward normal (tangent x horizontal)
+        x_normal = numpy.column_stack([tangents[:, 1], -tangents[:, 0], numpy.zeros(len(tangents))])
+        x_normal /= numpy.linalg.norm(x_normal, axis=1)[:, None]
 
-                #iterate sketch vertices, scaling them along the normal and adding the origin to locate them
-                for sk_vtx in sketch.Shape.Vertexes:
-                    point = sk_vtx.Point
-                    poly_points.append(origin + (point.x * x_normal) + (point.y * z_normal))
+        z_normal = numpy.cross(tangents, x_normal)
+        z_normal /= numpy.linalg.norm(z_normal, axis=1)[:, None]
 
-                poly_points.append(origin)
+        #z-coordinate should always be positive
+        z_normal[z_normal[:, 2] < 0.0] *= -1.0
 
-                #generate a polygon of the points and save it
-                comps += [Part.makePolygon(poly_points)]
+        #bank the sections about the tangent, left side up for positive rotations
+        if superelevation is not None:
 
-                #averaging tangents on the first tangent
-                #requries skipping the end vertex
-                if average and not prev_tangent:
-                    continue
+            _plan = numpy.linalg.norm(numpy.diff(origins[:, :2], axis=0), axis=1)
+            _stations = start + numpy.concatenate([[0.0], numpy.cumsum(_plan)])
 
-            if average:
-                prev_tangent = tangent
+            _angle = superelevation.get_rotations(_stations)[:, None]
+            _cos, _sin = numpy.cos(_angle), numpy.sin(_angle)
 
-        return comps
+            x_normal, z_normal = x_normal * _cos - z_normal * _sin, x_normal * _sin + z_normal * _cos
+
+        #iterate sketch vertices, scaling them along the normals and adding the origin to locate them
+        sketch_points = numpy.array([(_v.Point.x, _v.Point.y) for _v in sketch.Shape.Vertexes])
+
+        points = origins[:, None, :] \
+            + sketch_points[None, :, 0, None] * x_normal[:, None, :] \
+            + sketch_points[None, :, 1, None] * z_normal[:, None, :]
+
+        #generate a polygon of the points for each section, closing at the origin
+        return [
+            Part.makePolygon([App.Vector(*_p) for _p in _points] + [App.Vector(*_o)])
+            for _points, _o in zip(points, origins)
+        ]
 
     @staticmethod
     def _build_spline_sections(spline, sketch, interval):
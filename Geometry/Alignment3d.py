@@ -0,0 +1,268 @@
+# -*- coding: utf-8 -*-
+# **************************************************************************
+# *                                                                        *
+# *  Copyright (c) 2018 Joel Graff <monograff76@gmail.com>                 *
+# *                                                                        *
+# *  This program is free software; you can redistribute it and/or modify  *
+# *  it under the terms of the GNU Lesser General Public License (LGPL)    *
+# *  as published by the Free Software Foundation; either version 2 of     *
+# *  the License, or (at your option) any later version.                   *
+# *  for detail see the LICENCE text file.                                 *
+# *                                                                        *
+# *  This program is distributed in the hope that it will be useful,       *
+# *  but WITHOUT ANY WARRANTY; without even the implied warranty of        *
+# *  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the         *
+# *  GNU Library General Public License for more details.                  *
+# *                                                                        *
+# *  You should have received a copy of the GNU Library General Public     *
+# *  License along with this program; if not, write to the Free Software   *
+# *  Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  *
+# *  USA                                                                   *
+# *                                                                        *
+# **************************************************************************
+
+'''
+Composite 3D alignment pairing a horizontal station index with a vertical profile
+'''
+
+import numpy
+
+#approximate number of points evaluated in each streamed batch
+CHUNK_SIZE = 100000
+
+class Alignment3d(object):
+    '''
+    Exact 3D alignment composed of horizontal and vertical geometry.
+
+    Coordinates are evaluated analytically from the horizontal station index
+    and the vertical profile, without resampling either.  The profile is
+    stationed by internal station (distance along the horizontal alignment).
+    '''
+
+    def __init__(self, station_index, profile):
+        '''
+        station_index - StationIndex of the solved horizontal alignment
+        profile - VerticalProfile stationed by internal station
+        '''
+
+        self.station_index = station_index
+        self.profile = profile
+        self.length = station_index.total_length or 0.0
+
+    def get_breaks(self, start=0.0, end=None):
+        '''
+        Return the sorted internal stations between start and end at which
+        either the horizontal or vertical geometry changes, including the ends
+        '''
+
+        if end is None:
+            end = self.length
+
+        _breaks = numpy.concatenate([
+            [start, end],
+            self.station_index.start,
+            self.profile.pc,
+            self.profile.pt
+        ])
+
+        _breaks = numpy.unique(_breaks[(_breaks >= start) & (_breaks <= end)])
+
+        return _breaks
+
+    def get_points(self, distances):
+        '''
+        Return the coordinates and unit tangents at the internal stations.
+
+        distances - array of internal stations (mm)
+
+        Returns a tuple of numpy arrays (coordinates (n, 3), tangents (n, 3)).
+        Stations outside the horizontal alignment return nan.
+        '''
+
+        distances = numpy.atleast_1d(numpy.asarray(distances, dtype=float))
+
+        coords, bearings = self.station_index.get_positions(distances)
+        elevations, grades = self.profile.evaluate(distances)[:2]
+
+        coords[:, 2] = elevations
+
+        return coords, self._get_tangents(bearings, grades)
+
+    def get_counts(self, breaks, interval, tolerance=0.0):
+        '''
+        Return the number of points sampling each piece between the breaks,
+        including both ends, at no more than the interval.
+
+        tolerance - if non-zero, widen the spacing on each piece to the largest
+                    which keeps the chord error within the tolerance, up to the interval
+        '''
+
+        _lengths = numpy.diff(breaks)
+        _spacing = numpy.full(len(_lengths), float(interval))
+
+        if tolerance and len(_lengths):
+
+            _index = self.station_index
+            _h_idx = _index.find_elements((breaks[:-1] + breaks[1:]) / 2.0)
+
+            #curvature varies linearly along spirals, so the largest is at an end
+            _local = numpy.clip(
+                numpy.column_stack([breaks[:-1], breaks[1:]]) - _index.start[_h_idx, None],
+                0.0, _index.length[_h_idx, None]
+            )
+
+            _k_h = numpy.abs(_index.curvature[_h_idx, None] + _index.rate[_h_idx, None] * _local)
+
+            #profile curvature is the rate of change of grade, 0.01 / K
+            _k_v = numpy.nan_to_num(0.01 / self.profile.evaluate((breaks[:-1] + breaks[1:]) / 2.0)[2])
+
+            _k = numpy.sqrt(_k_h.max(axis=1) ** 2 + _k_v ** 2)
+
+            with numpy.errstate(divide='ignore'):
+                _spacing = numpy.minimum(_spacing, numpy.sqrt(8.0 * tolerance / _k))
+
+        return numpy.maximum(numpy.ceil(_lengths / _spacing), 1).astype(int) + 1
+
+    def _iter_batches(self, interval, start, end, tolerance, chunk_size):
+        '''
+        Yield the breaks and point counts of consecutive groups of pieces,
+        each group holding roughly chunk_size points
+        '''
+
+        _breaks = self.get_breaks(start, end)
+
+        if len(_breaks) < 2:
+            return
+
+        _counts = self.get_counts(_breaks, interval, tolerance)
+        _totals = numpy.cumsum(_counts)
+
+        _first = 0
+
+        while _first < len(_counts):
+
+            _last = numpy.searchsorted(
+                _totals, _totals[_first] - _counts[_first] + chunk_size, side='right'
+            )
+
+            _last = max(_last, _first + 1)
+
+            yield _breaks[_first:_last + 1], _counts[_first:_last]
+
+            _first = _last
+
+    @staticmethod
+    def _get_piece_distances(breaks, counts):
+        '''
+        Return evenly spaced stations across each piece, including both ends,
+        and the index of the piece of each station
+        '''
+
+        _lengths = numpy.diff(breaks)
+
+        _piece = numpy.repeat(numpy.arange(len(counts)), counts)
+        _step = numpy.arange(len(_piece)) - (numpy.cumsum(counts) - counts)[_piece]
+
+        return breaks[_piece] + _lengths[_piece] * _step / (counts[_piece] - 1), _piece
+
+    def iter_samples(self, interval, start=0.0, end=None, tolerance=0.0, chunk_size=CHUNK_SIZE):
+        '''
+        Yield the internal stations and coordinates sampled between start and end
+        as consecutive chunks of numpy arrays, so memory is bounded by the chunk size.
+
+        Each piece between geometry breaks is sampled evenly at no more than
+        the interval, or adaptively to the tolerance (see get_counts()).
+        '''
+
+        _first = True
+
+        for _breaks, _counts in self._iter_batches(interval, start, end, tolerance, chunk_size):
+
+            _distances, _piece = self._get_piece_distances(_breaks, _counts)
+
+            #drop the start of each piece, shared with the end of the previous one
+            _keep = numpy.ones(len(_distances), dtype=bool)
+            _keep[numpy.cumsum(_counts) - _counts] = False
+            _keep[0] = _first
+
+            _distances = _distances[_keep]
+            _first = False
+
+            yield _distances, self.get_points(_distances)[0]
+
+    def sample(self, interval, start=0.0, end=None, tolerance=0.0):
+        '''
+        Return the internal stations and coordinates sampled between start and end
+        as numpy arrays (see iter_samples())
+        '''
+
+        _chunks = list(self.iter_samples(interval, start, end, tolerance))
+
+        if not _chunks:
+            return numpy.zeros(0), numpy.zeros((0, 3))
+
+        return numpy.concatenate([_c[0] for _c in _chunks]), \
+            numpy.concatenate([_c[1] for _c in _chunks])
+
+    def iter_pieces(self, interval, start=0.0, end=None, tolerance=0.0, chunk_size=CHUNK_SIZE):
+        '''
+        Split the alignment between start and end at the geometry breaks into
+        pieces which are smooth in both plan and profile, sampling each at no
+        more than the interval, or adaptively to the tolerance.
+
+        Yields a (coordinates, tangents) numpy array tuple per piece,
+        suitable for interpolating a B-spline per piece.  Pieces are evaluated
+        in batches of roughly chunk_size points.
+        '''
+
+        for _breaks, _counts in self._iter_batches(interval, start, end, tolerance, chunk_size):
+
+            _distances, _piece = self._get_piece_distances(_breaks, _counts)
+
+            #evaluate each piece at its own ends, so the pieces share vertices
+            #but take the tangents on either side of the break
+            _coords, _tangents = self._get_piece_points(_distances, _piece, _breaks)
+
+            _splits = numpy.cumsum(_counts)[:-1]
+
+            for _piece in zip(numpy.split(_coords, _splits), numpy.split(_tangents, _splits)):
+                yield _piece
+
+    def get_pieces(self, interval, start=0.0, end=None, tolerance=0.0):
+        '''
+        Return the pieces of the alignment as a list (see iter_pieces())
+        '''
+
+        return list(self.iter_pieces(interval, start, end, tolerance))
+
+    def _get_piece_points(self, distances, pieces, breaks):
+        '''
+        Evaluate the stations of each piece on the geometry that piece spans
+        '''
+
+        _mid = (breaks[pieces] + breaks[pieces + 1]) / 2.0
+
+        _h_idx = self.station_index.find_elements(_mid)
+
+        coords, bearings = self.station_index.evaluate(
+            _h_idx, distances - self.station_index.start[_h_idx]
+        )
+
+        elevations, grades = self.profile.evaluate(distances, _mid)[:2]
+
+        coords[:, 2] = elevations
+
+        return coords, self._get_tangents(bearings, grades)
+
+    @staticmethod
+    def _get_tangents(bearings, grades):
+        '''
+        Return unit tangents along the bearings, rising at the grades (percent)
+        '''
+
+        _grade = grades / 100.0
+        _norm = numpy.sqrt(1.0 + _grade * _grade)
+
+        return numpy.column_stack([
+            numpy.sin(bearings) / _norm, numpy.cos(bearings) / _norm, _grade / _norm
+        ])
@@ -27,7 +27,6 @@ Arc generation tools
 
 import math
 import FreeCAD as App
-import Draft
 import numpy
 
 from Project.Support import Units, Utils
@@ -365,7 +364,11 @@ def get_coordinates(arc, points):
 
     return {'Start': _start, 'Center': _center, 'End': _end, 'PI': _pi}
 
-def get_parameters(arc):
+def get_parameters_matrix(arc):
+    '''
+    Calculate the arc parameters using the vector scalar matrix.
+    Retained for parity testing against the closed-form solver in get_parameters().
+    '''
 
     #Vector order:
     #Radius in / out, Tangent in / out, Middle, and Chord
@@ -440,6 +443,507 @@ def get_parameters(arc):
 
     #scale_factor = 1.0 / Units.scale_factor()
 
+def _to_array(arcs, key):
+    '''
+    Return the values of key across the arcs as a float array,
+    with missing or invalid values as nan
+    '''
+
+    _values = [_a.get(key) for _a in arcs]
+
+    #values are usually floats or missing (nan), which convert directly
+    try:
+        result = numpy.array(_values, dtype=float)
+
+        if result.shape == (len(arcs),):
+            return result
+
+    except (TypeError, ValueError):
+        pass
+
+    result = [Utils.to_float(_v) for _v in _values]
+
+    return numpy.array([numpy.nan if _v is None else _v for _v in result], dtype=float)
+
+def _to_points(arcs, key):
+    '''
+    Return the coordinates of key across the arcs as an (n, 3) array,
+    with missing coordinates as rows of nan
+    '''
+
+    _missing = (numpy.nan,) * 3
+
+    return numpy.array(
+        [tuple(_a[key]) if _a.get(key) else _missing for _a in arcs], dtype=float
+    ).reshape(-1, 3)
+
+def _first_valid(*values):
+    '''
+    Merge the arrays, taking the first non-nan value in each position
+    '''
+
+    result = values[0]
+
+    for _v in values[1:]:
+        result = numpy.where(numpy.isnan(result), _v, result)
+
+    return result
+
+def _first_positive(*values):
+    '''
+    Merge the arrays, taking the first positive, non-nan value in each position
+    '''
+
+    with numpy.errstate(invalid='ignore'):
+        return _first_valid(*[numpy.where(_v > 0.0, _v, numpy.nan) for _v in values])
+
+def _vector(head, tail):
+    '''
+    Return the 2D vectors from tail to head, nan where zero-length
+    '''
+
+    result = head[:, 0:2] - tail[:, 0:2]
+
+    with numpy.errstate(invalid='ignore'):
+        result[numpy.hypot(result[:, 0], result[:, 1]) == 0.0] = numpy.nan
+
+    return result
+
+def _length(vec):
+    '''
+    Return the lengths of the 2D vectors
+    '''
+
+    return numpy.hypot(vec[:, 0], vec[:, 1])
+
+def _bearing(vec):
+    '''
+    Return the bearings of the 2D vectors, clockwise from +y 'north'
+    '''
+
+    return numpy.arctan2(vec[:, 0], vec[:, 1]) % C.TWO_PI
+
+def _cross(lhs, rhs):
+    '''
+    Return the z-component of the cross product of the 2D vectors
+    '''
+
+    return lhs[:, 0] * rhs[:, 1] - lhs[:, 1] * rhs[:, 0]
+
+def _rotation(lhs, rhs):
+    '''
+    Return the rotation from lhs to rhs (1 = cw, -1 = ccw, nan = undefined)
+    '''
+
+    _c = _cross(lhs, rhs)
+
+    with numpy.errstate(invalid='ignore'):
+        return numpy.where(_c == 0.0, numpy.nan, -numpy.sign(_c))
+
+def _angle(lhs, rhs, direction):
+    '''
+    Return the angle swept from lhs to rhs in the direction of rotation
+    '''
+
+    _a = numpy.arctan2(_cross(lhs, rhs), numpy.sum(lhs * rhs, axis=1))
+
+    return (-direction * _a) % C.TWO_PI
+
+def _unit(bearing):
+    '''
+    Return the 2D unit vectors of the bearings
+    '''
+
+    return numpy.column_stack([numpy.sin(bearing), numpy.cos(bearing)])
+
+def solve(arcs):
+    '''
+    Closed-form arc solver.
+
+    Solves a list of arc dictionaries in a single vectorized pass,
+    dispatching on the parameters present for each arc (coordinate pairs,
+    radius / delta, PI / tangent, chord / tangent, bearings, and so on).
+    Calculated values take precedence over supplied ones, as in
+    get_parameters_matrix().
+
+    Returns a dictionary of numpy arrays keyed to the arc parameters,
+    with nan where a parameter cannot be determined.
+    '''
+
+    start, end = _to_points(arcs, 'Start'), _to_points(arcs, 'End')
+    center, pi = _to_points(arcs, 'Center'), _to_points(arcs, 'PI')
+
+    bearing_in = _to_array(arcs, 'BearingIn')
+    bearing_out = _to_array(arcs, 'BearingOut')
+
+    #vectors between the defined coordinates
+    _sc, _ec, _pc = _vector(start, center), _vector(end, center), _vector(pi, center)
+    _ps, _ep, _es = _vector(pi, start), _vector(end, pi), _vector(end, start)
+
+    #direction from coordinates, or from coordinates and the supplied start bearing
+    _right = numpy.column_stack([numpy.cos(bearing_in), -numpy.sin(bearing_in)])
+
+    with numpy.errstate(invalid='ignore'):
+        direction = _first_valid(
+            _rotation(_ps, _ep), _rotation(_sc, _ec), _rotation(_ps, _es),
+            _rotation(_es, _ep), _rotation(_sc, _pc), _rotation(_pc, _ec),
+            numpy.sign(numpy.sum(-_sc * _right, axis=1)),
+            numpy.sign(numpy.sum(_es * _right, axis=1)),
+            numpy.sign(_to_array(arcs, 'Direction'))
+        )
+
+        direction[direction == 0.0] = numpy.nan
+
+    delta = _first_positive(
+        _angle(_sc, _ec, direction), _angle(_ps, _ep, direction),
+        2.0 * _angle(_ps, _es, direction), 2.0 * _angle(_es, _ep, direction),
+        _to_array(arcs, 'Delta'), (direction * (bearing_out - bearing_in)) % C.TWO_PI
+    )
+
+    radius = _first_positive(_length(_sc), _length(_ec), _to_array(arcs, 'Radius'))
+
+    tangent = _first_positive(_length(_ps), _length(_ep), _to_array(arcs, 'Tangent'))
+    chord = _first_positive(_length(_es), _to_array(arcs, 'Chord'))
+    length = _to_array(arcs, 'Length')
+    external = _to_array(arcs, 'External')
+    middle = _to_array(arcs, 'MiddleOrdinate')
+
+    #resolve the delta from the radius and lengths, then the radius from the delta
+    with numpy.errstate(invalid='ignore', divide='ignore'):
+
+        delta = _first_positive(
+            delta, length / radius, 2.0 * numpy.arctan(tangent / radius),
+            2.0 * numpy.arcsin(chord / (2.0 * radius)),
+            2.0 * numpy.arccos(1.0 - middle / radius),
+            2.0 * numpy.arccos(radius / (radius + external)),
+            2.0 * numpy.arccos(chord / (2.0 * tangent))
+        )
+
+        half_delta = delta / 2.0
+
+        radius = _first_positive(
+            radius, tangent / numpy.tan(half_delta), chord / (2.0 * numpy.sin(half_delta)),
+            length / delta, middle / (1.0 - numpy.cos(half_delta)),
+            external / (1.0 / numpy.cos(half_delta) - 1.0)
+        )
+
+    bearing_in = _first_valid(
+        _bearing(_ps), _bearing(_ep) - direction * delta,
+        _bearing(_sc) + direction * C.HALF_PI,
+        _bearing(_ec) + direction * (C.HALF_PI - delta),
+        _bearing(_pc) + direction * (C.HALF_PI - half_delta),
+        _bearing(_es) - direction * half_delta,
+        bearing_in, bearing_out - direction * delta
+    ) % C.TWO_PI
+
+    tangent = radius * numpy.tan(half_delta)
+    chord = 2.0 * radius * numpy.sin(half_delta)
+
+    #unit vectors for the start tangent, center-to-start radius and chord
+    _forward = _unit(bearing_in)
+    _radial = _unit(bearing_in - direction * C.HALF_PI)
+    _chord = _unit(bearing_in + direction * half_delta)
+
+    #arcs with no coordinates start at the origin
+    _origin = numpy.where(
+        numpy.isnan(numpy.column_stack([start, end, center, pi])).all(axis=1), 0.0, numpy.nan
+    )
+
+    _start = _first_valid(
+        start[:, 0:2], pi[:, 0:2] - _forward * tangent[:, None],
+        center[:, 0:2] + _radial * radius[:, None], end[:, 0:2] - _chord * chord[:, None],
+        _origin[:, None]
+    )
+
+    _z = _first_valid(start[:, 2], pi[:, 2], center[:, 2], end[:, 2], numpy.zeros(len(arcs)))
+
+    def _point(given, coords):
+        return _first_valid(given, numpy.column_stack([coords, _z]))
+
+    return {
+        'Direction': direction,
+        'Delta': delta,
+        'Radius': radius,
+        'Length': radius * delta,
+        'Tangent': tangent,
+        'Chord': chord,
+        'External': radius * ((1.0 / numpy.cos(half_delta)) - 1.0),
+        'MiddleOrdinate': radius * (1.0 - numpy.cos(half_delta)),
+        'BearingIn': bearing_in,
+        'BearingOut': (bearing_in + direction * delta) % C.TWO_PI,
+        'Start': _point(start, _start),
+        'Center': _point(center, _start - _radial * radius[:, None]),
+        'End': _point(end, _start + _chord * chord[:, None]),
+        'PI': _point(pi, _start + _forward * tangent[:, None])
+    }
+
+def get_parameters_batch(arcs):
+    '''
+    Calculate the parameters of a list of arcs with the closed-form solver.
+    Returns a list of fully-defined arc dictionaries (see get_parameters()),
+    with None for arcs which cannot be resolved.
+    '''
+
+    if not arcs:
+        return []
+
+    solution = solve(arcs)
+
+    _checks = [
+        (('Radius', 'Tangent', 'Chord'), 'cannot determine radius / tangent lengths'),
+        (('Delta',), 'cannot determine central angle'),
+        (('Direction',), 'cannot determine curve direction'),
+        (('BearingIn', 'BearingOut'), 'cannot determine curve bearings'),
+        (('Start', 'Center', 'End', 'PI'), 'cannot calculate coordinates')
+    ]
+
+    _vectors = ['Start', 'Center', 'End', 'PI']
+    _count = len(arcs)
+
+    #index of the first failed check for each arc, -1 if all pass
+    _failed = numpy.full(_count, -1)
+
+    for _j, (_keys, _msg) in enumerate(_checks):
+
+        _invalid = numpy.isnan(
+            numpy.column_stack([solution[_k].reshape(_count, -1) for _k in _keys])
+        ).any(axis=1)
+
+        _failed[(_failed < 0) & _invalid] = _j
+
+    #convert the arrays once, building vectors only for the solved arcs
+    _scalars = [(_k, _v.tolist()) for _k, _v in solution.items() if _k not in _vectors]
+    _points = [(_k, solution[_k].tolist()) for _k in _vectors]
+
+    result = []
+
+    for _i, (_arc, _j) in enumerate(zip(arcs, _failed.tolist())):
+
+        if _j >= 0:
+            print('Invalid curve definition: ' + _checks[_j][1])
+            result.append(None)
+            continue
+
+        _solved = {'Type': 'arc'}
+
+        for _k, _v in _scalars:
+            _solved[_k] = _v[_i]
+
+        for _k, _v in _points:
+            _solved[_k] = App.Vector(*_v[_i])
+
+        #merge the result with the original dict to preserve other values
+        result.append({**_arc, **_solved})
+
+    return result
+
+def _first(*values):
+    '''
+    Return the first value which is not None
+    '''
+
+    for _v in values:
+        if _v is not None:
+            return _v
+
+    return None
+
+def _positive(value):
+    '''
+    Return the value if positive and finite, None otherwise
+    '''
+
+    if value is None or not 0.0 < value < math.inf:
+        return None
+
+    return value
+
+def _sub(head, tail):
+    '''
+    Return the 2D vector from tail to head as a tuple, None if undefined or zero-length
+    '''
+
+    if not (head and tail):
+        return None
+
+    result = (head.x - tail.x, head.y - tail.y)
+
+    if result == (0.0, 0.0):
+        return None
+
+    return result
+
+def _scalar(fn, *args):
+    '''
+    Return fn(*args) if all arguments are defined, None otherwise.
+    Math domain errors also return None.
+    '''
+
+    if any(_v is None for _v in args):
+        return None
+
+    try:
+        return fn(*args)
+
+    except (ValueError, ZeroDivisionError):
+        return None
+
+def _solve_arc(arc):
+    '''
+    Closed-form solver for a single arc.
+    Mirrors solve() using scalar math to avoid array overhead on single arcs.
+    Returns a dictionary of solved parameters, or None with an error message.
+    '''
+
+    start, end, center, pi = [arc.get(_k) for _k in ['Start', 'End', 'Center', 'PI']]
+
+    _sign = lambda _x: math.copysign(1.0, _x) if _x else None
+    _cross = lambda _l, _r: _l[0] * _r[1] - _l[1] * _r[0]
+    _rot = lambda _l, _r: _sign(-_cross(_l, _r))
+    _len = lambda _v: math.hypot(*_v)
+    _brg = lambda _v: math.atan2(*_v) % C.TWO_PI
+
+    bearing_in = Utils.to_float(arc.get('BearingIn'))
+    bearing_out = Utils.to_float(arc.get('BearingOut'))
+
+    _sc, _ec, _pc = _sub(start, center), _sub(end, center), _sub(pi, center)
+    _ps, _ep, _es = _sub(pi, start), _sub(end, pi), _sub(end, start)
+
+    _right = _scalar(lambda _b: (math.cos(_b), -math.sin(_b)), bearing_in)
+    _dot = lambda _l, _r: _l[0] * _r[0] + _l[1] * _r[1]
+
+    direction = _first(
+        _scalar(_rot, _ps, _ep), _scalar(_rot, _sc, _ec), _scalar(_rot, _ps, _es),
+        _scalar(_rot, _es, _ep), _scalar(_rot, _sc, _pc), _scalar(_rot, _pc, _ec),
+        _scalar(lambda _v, _r: _sign(-_dot(_v, _r)), _sc, _right),
+        _scalar(lambda _v, _r: _sign(_dot(_v, _r)), _es, _right),
+        _scalar(_sign, Utils.to_float(arc.get('Direction')))
+    )
+
+    if direction is None:
+        return None, 'cannot determine curve direction'
+
+    _angle = lambda _l, _r: (-direction * math.atan2(_cross(_l, _r), _dot(_l, _r))) % C.TWO_PI
+
+    radius = _first(*[_positive(_v) for _v in [
+        _scalar(_len, _sc), _scalar(_len, _ec), Utils.to_float(arc.get('Radius'))]])
+
+    tangent = _first(*[_positive(_v) for _v in [
+        _scalar(_len, _ps), _scalar(_len, _ep), Utils.to_float(arc.get('Tangent'))]])
+
+    chord = _first(*[_positive(_v) for _v in [
+        _scalar(_len, _es), Utils.to_float(arc.get('Chord'))]])
+
+    length = Utils.to_float(arc.get('Length'))
+    external = Utils.to_float(arc.get('External'))
+    middle = Utils.to_float(arc.get('MiddleOrdinate'))
+
+    delta = _first(*[_positive(_v) for _v in [
+        _scalar(_angle, _sc, _ec), _scalar(_angle, _ps, _ep),
+        _scalar(lambda _l, _r: 2.0 * _angle(_l, _r), _ps, _es),
+        _scalar(lambda _l, _r: 2.0 * _angle(_l, _r), _es, _ep),
+        Utils.to_float(arc.get('Delta')),
+        _scalar(lambda _i, _o: (direction * (_o - _i)) % C.TWO_PI, bearing_in, bearing_out),
+        _scalar(lambda _l, _r: _l / _r, length, radius),
+        _scalar(lambda _t, _r: 2.0 * math.atan(_t / _r), tangent, radius),
+        _scalar(lambda _c, _r: 2.0 * math.asin(_c / (2.0 * _r)), chord, radius),
+        _scalar(lambda _m, _r: 2.0 * math.acos(1.0 - _m / _r), middle, radius),
+        _scalar(lambda _e, _r: 2.0 * math.acos(_r / (_r + _e)), external, radius),
+        _scalar(lambda _c, _t: 2.0 * math.acos(_c / (2.0 * _t)), chord, tangent)
+    ]])
+
+    if delta is None:
+        return None, 'cannot determine central angle'
+
+    half_delta = delta / 2.0
+
+    radius = _first(*[_positive(_v) for _v in [
+        radius,
+        _scalar(lambda _t: _t / math.tan(half_delta), tangent),
+        _scalar(lambda _c: _c / (2.0 * math.sin(half_delta)), chord),
+        _scalar(lambda _l: _l / delta, length),
+        _scalar(lambda _m: _m / (1.0 - math.cos(half_delta)), middle),
+        _scalar(lambda _e: _e / (1.0 / math.cos(half_delta) - 1.0), external)
+    ]])
+
+    if radius is None:
+        return None, 'cannot determine radius / tangent lengths'
+
+    bearing_in = _first(
+        _scalar(_brg, _ps),
+        _scalar(lambda _v: _brg(_v) - direction * delta, _ep),
+        _scalar(lambda _v: _brg(_v) + direction * C.HALF_PI, _sc),
+        _scalar(lambda _v: _brg(_v) + direction * (C.HALF_PI - delta), _ec),
+        _scalar(lambda _v: _brg(_v) + direction * (C.HALF_PI - half_delta), _pc),
+        _scalar(lambda _v: _brg(_v) - direction * half_delta, _es),
+        bearing_in, _scalar(lambda _b: _b - direction * delta, bearing_out)
+    )
+
+    if bearing_in is None:
+        return None, 'cannot determine curve bearings'
+
+    bearing_in %= C.TWO_PI
+
+    tangent = radius * math.tan(half_delta)
+    chord = 2.0 * radius * math.sin(half_delta)
+
+    _vec = lambda _b, _l: App.Vector(math.sin(_b), math.cos(_b), 0.0).multiply(_l)
+
+    _forward = _vec(bearing_in, tangent)
+    _radial = _vec(bearing_in - direction * C.HALF_PI, radius)
+    _chord = _vec(bearing_in + direction * half_delta, chord)
+
+    _start = start
+
+    if not _start:
+
+        if pi:
+            _start = pi.sub(_forward)
+
+        elif center:
+            _start = center.add(_radial)
+
+        elif end:
+            _start = end.sub(_chord)
+
+        else:
+            _start = App.Vector()
+
+    _start = App.Vector(_start)
+    _start.z = _first(*[_p.z if _p else None for _p in [start, pi, center, end]], 0.0)
+
+    return {
+        'Direction': direction,
+        'Delta': delta,
+        'Radius': radius,
+        'Length': radius * delta,
+        'Tangent': tangent,
+        'Chord': chord,
+        'External': radius * ((1.0 / math.cos(half_delta)) - 1.0),
+        'MiddleOrdinate': radius * (1.0 - math.cos(half_delta)),
+        'BearingIn': bearing_in,
+        'BearingOut': (bearing_in + direction * delta) % C.TWO_PI,
+        'Start': _start,
+        'Center': center if center else _start.sub(_radial),
+        'End': end if end else _start.add(_chord),
+        'PI': pi if pi else _start.add(_forward)
+    }, None
+
+def get_parameters(arc):
+    '''
+    Return a fully-defined arc, calculating any missing parameters
+    from those provided with the closed-form solver
+    '''
+
+    result, error = _solve_arc(arc)
+
+    if not result:
+        print('Invalid curve definition: ' + error)
+        return None
+
+    #merge the result with the original dict to preserve other values
+    return {**arc, **{'Type': 'arc'}, **result}
+
 def convert_units(arc, to_document=False):
     '''
     Cnvert the units of the arc parameters to or from document units
@@ -580,6 +1084,112 @@ def run_test(arc, comp, excludes):
 
 #{'Direction': -1.0, 'Delta': 50.3161, 'Radius': 670.0, 'Length': 588.3816798810216, 'Tangent': 314.67910063712156, 'Chord': 569.6563702820052, 'External': 70.21816809491217, 'MiddleOrd': 63.55717091445238, 'BearingIn': 139.3986, 'BearingOut': 89.0825, 'Start': Vector (400.44639227036157, -467.1857190779628, 0.0), 'Center': Vector (909.1475140855633, -31.154563466399697, 0.0), 'End': Vector (919.8760307993049, -701.0686616380407, 0.0), 'PI': Vector (605.2372756996326, -706.1075272957279, 0.0)}
 
+def get_segment_deltas(arcs, interval, interval_type='Segment', scale_factor=None):
+    '''
+    Calculate the segment deltas for a list of arcs as a single array.
+
+    arcs        - list of arc dictionaries (see get_points())
+    interval    - value for the interval type (non-zero, positive),
+                  or an array of values, one per arc
+    interval_type - 'Segment', 'Interval', or 'Tolerance' (see get_points()),
+                  or 'Count' for exactly (interval) equal segments per arc
+    scale_factor - document-to-system units scale.  Queried if not provided.
+
+    Returns a tuple of numpy arrays (deltas, counts) where deltas contains
+    the central angle of each point for every arc, (zero at the arc start,
+    the arc delta at the end), and counts is the number of points per arc.
+    '''
+
+    if scale_factor is None:
+        scale_factor = Units.scale_factor()
+
+    angle = numpy.array([_a['Delta'] for _a in arcs], dtype=float)
+    radius = numpy.array([_a['Radius'] for _a in arcs], dtype=float)
+    interval = numpy.asarray(interval, dtype=float)
+
+    #define the incremental angle for segment calculations, defaulting to 'Segment'
+    _ratio = (interval * scale_factor) / radius
+
+    if interval_type == 'Count':
+        _segments = numpy.maximum(numpy.broadcast_to(numpy.floor(interval), angle.shape), 1.0)
+        _delta = angle / _segments
+
+    elif interval_type == 'Interval':
+        _delta = _ratio
+
+    elif interval_type == 'Tolerance':
+
+        #a tolerance beyond the arc diameter places a single segment
+        _delta = 2.0 * numpy.arccos(1.0 - numpy.clip(_ratio, 0.0, 2.0))
+
+    else:
+        _delta = angle / interval
+
+    if interval_type == 'Count':
+        counts = _segments.astype(int) + 1
+
+    else:
+
+        #segment count per arc, mirroring int(angle / delta) + 1 in get_points_reference()
+        with numpy.errstate(divide='ignore', invalid='ignore'):
+            _segments = numpy.floor(angle / _delta)
+
+        _segments[~numpy.isfinite(_segments) | (_segments < 0.0)] = 0.0
+
+        counts = _segments.astype(int) + 2
+
+    #local point index within each arc, zero at the arc start
+    _offsets = numpy.repeat(numpy.cumsum(counts) - counts, counts)
+    _local = numpy.arange(counts.sum()) - _offsets
+
+    deltas = _local * numpy.repeat(_delta, counts)
+
+    #the last point of each arc falls exactly on the central angle
+    deltas[numpy.cumsum(counts) - 1] = angle
+
+    return deltas, counts
+
+def get_points_batch(arcs, interval, interval_type='Segment', scale_factor=None):
+    '''
+    Discretize a list of arcs in a single vectorized pass.
+
+    Arguments are the same as get_points(), with arcs as a list of arc dictionaries.
+
+    Returns a list of numpy arrays of shape (n, 3), one per arc.
+    Each array begins with the arc start coordinate and concludes with the end point.
+    '''
+
+    if not arcs:
+        return []
+
+    deltas, counts = get_segment_deltas(arcs, interval, interval_type, scale_factor)
+
+    bearing_in = numpy.repeat([_a['BearingIn'] for _a in arcs], counts)
+    direction = numpy.repeat([_a['Direction'] for _a in arcs], counts)
+    radius = numpy.repeat([_a['Radius'] for _a in arcs], counts)
+    start = numpy.repeat([tuple(_a['Start']) for _a in arcs], counts, axis=0)
+
+    #forward and right unit vectors from the starting bearing
+    _fw_x = numpy.sin(bearing_in)
+    _fw_y = numpy.cos(bearing_in)
+
+    _dfw = numpy.sin(deltas) * radius
+    _drt = direction * (1.0 - numpy.cos(deltas)) * radius
+
+    points = numpy.array(start, dtype=float)
+    points[:, 0] += _fw_x * _dfw + _fw_y * _drt
+    points[:, 1] += _fw_y * _dfw - _fw_x * _drt
+
+    return numpy.split(points, numpy.cumsum(counts)[:-1])
+
+def get_points_array(arc_dict, interval, interval_type='Segment', scale_factor=None):
+    '''
+    Discretize a single arc, returning the points as a numpy array of shape (n, 3).
+    See get_points() for argument descriptions.
+    '''
+
+    return get_points_batch([arc_dict], interval, interval_type, scale_factor)[0]
+
 def get_points(arc_dict, interval, interval_type='Segment'):
     '''
     Discretize an arc into the specified segments.
@@ -603,6 +1213,17 @@ def get_points(arc_dict, interval, interval_type='Segment'):
     Points are returned references to start_coord
     '''
 
+    result = [App.Vector(*_p) for _p in get_points_array(arc_dict, interval, interval_type)]
+    result[0] = arc_dict['Start']
+
+    return result
+
+def get_points_reference(arc_dict, interval, interval_type='Segment'):
+    '''
+    Per-point reference implementation of get_points().
+    Retained for parity testing against the vectorized implementation.
+    '''
+
     angle = arc_dict['Delta']
     direction = arc_dict['Direction']
     bearing_in = arc_dict['BearingIn']
@@ -623,7 +1244,7 @@ def get_points(arc_dict, interval, interval_type='Segment'):
         _delta = _ratio
 
     elif interval_type == 'Tolerance':
-        _delta = 2.0 * math.acos(1 - _ratio)
+        _delta = 2.0 * math.acos(1 - min(_ratio, 2.0))
 
     #pre-calculate the segment deltas, increasing from zero to the central angle
     segment_deltas = [float(_i + 1) * _delta for _i in range(0, int(angle / _delta) + 1)]
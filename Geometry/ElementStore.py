@@ -0,0 +1,290 @@
+# -*- coding: utf-8 -*-
+# **************************************************************************
+# *                                                                        *
+# *  Copyright (c) 2018 Joel Graff <monograff76@gmail.com>                 *
+# *                                                                        *
+# *  This program is free software; you can redistribute it and/or modify  *
+# *  it under the terms of the GNU Lesser General Public License (LGPL)    *
+# *  as published by the Free Software Foundation; either version 2 of     *
+# *  the License, or (at your option) any later version.                   *
+# *  for detail see the LICENCE text file.                                 *
+# *                                                                        *
+# *  This program is distributed in the hope that it will be useful,       *
+# *  but WITHOUT ANY WARRANTY; without even the implied warranty of        *
+# *  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the         *
+# *  GNU Library General Public License for more details.                  *
+# *                                                                        *
+# *  You should have received a copy of the GNU Library General Public     *
+# *  License along with this program; if not, write to the Free Software   *
+# *  Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  *
+# *  USA                                                                   *
+# *                                                                        *
+# **************************************************************************
+
+'''
+Columnar store of alignment geometry elements
+'''
+
+import base64
+import json
+import zlib
+
+from collections.abc import MutableMapping
+
+import numpy
+
+import FreeCAD as App
+
+#coordinate fields, returned as vectors
+VECTOR_FIELDS = ('Start', 'End', 'Center', 'PI')
+
+#element fields stored as columns.  Missing values are stored as nan.
+DTYPE = numpy.dtype(
+    [('Type', 'U8')]
+    + [(_k, 'f8', (3,)) for _k in VECTOR_FIELDS]
+    + [(_k, 'f8') for _k in (
+        'Radius', 'StartRadius', 'EndRadius', 'Delta', 'Direction', 'BearingIn', 'BearingOut',
+        'Length', 'Tangent', 'Chord', 'External', 'MiddleOrdinate',
+        'StartCurvature', 'CurvatureRate', 'StartStation'
+    )]
+    + [('InternalStation', 'f8', (2,))]
+)
+
+STATE_VERSION = 1
+
+class ElementView(MutableMapping):
+    '''
+    Dictionary view of a single element in an ElementStore.
+    Reads and writes go to the store's arrays.  Keys without a column
+    are held in the store's extras.
+    '''
+
+    __slots__ = ('store', 'index')
+
+    def __init__(self, store, index):
+
+        self.store = store
+        self.index = index
+
+    def __getitem__(self, key):
+
+        if key not in DTYPE.names:
+            return self.store.extras[self.index][key]
+
+        _value = self.store.data[key][self.index]
+
+        if key == 'Type':
+
+            if not _value:
+                raise KeyError(key)
+
+            return str(_value)
+
+        if numpy.isnan(_value).any():
+            raise KeyError(key)
+
+        if key in VECTOR_FIELDS:
+            return App.Vector(*_value)
+
+        if key == 'InternalStation':
+            return (float(_value[0]), float(_value[1]))
+
+        return float(_value)
+
+    def __setitem__(self, key, value):
+
+        if key not in DTYPE.names:
+            self.store.extras.setdefault(self.index, {})[key] = value
+            return
+
+        if value is None:
+            self.__delitem__(key)
+            return
+
+        self.store.data[key][self.index] = tuple(value) \
+            if key in VECTOR_FIELDS or key == 'InternalStation' else value
+
+    def __delitem__(self, key):
+
+        if key not in self:
+            raise KeyError(key)
+
+        if key not in DTYPE.names:
+            del self.store.extras[self.index][key]
+
+        elif key == 'Type':
+            self.store.data[key][self.index] = ''
+
+        else:
+            self.store.data[key][self.index] = numpy.nan
+
+    def __contains__(self, key):
+
+        if key not in DTYPE.names:
+            return key in self.store.extras.get(self.index, {})
+
+        _value = self.store.data[key][self.index]
+
+        if key == 'Type':
+            return bool(_value)
+
+        return not numpy.isnan(_value).any()
+
+    def __iter__(self):
+
+        _record = self.store.data[self.index]
+
+        for _k in DTYPE.names:
+
+            if _k == 'Type':
+                if _record[_k]:
+                    yield _k
+
+            elif not numpy.isnan(_record[_k]).any():
+                yield _k
+
+        for _k in self.store.extras.get(self.index, {}):
+            yield _k
+
+    def __len__(self):
+        return sum(1 for _k in self)
+
+    def __repr__(self):
+        return repr(dict(self))
+
+class ElementStore(object):
+    '''
+    Alignment geometry elements stored as a structured numpy array,
+    one column per element parameter.
+
+    Indexing returns dictionary views of the elements, so the store can stand
+    in for a list of element dictionaries.  Columns are available as arrays
+    through the data attribute (e.g. store.data['Radius']).
+    '''
+
+    def __init__(self, elements=None):
+        '''
+        elements - optional list of element dictionaries
+        '''
+
+        self.data = numpy.zeros(0, dtype=DTYPE)
+        self.extras = {}
+
+        if elements:
+            self.extend(elements)
+
+    def __len__(self):
+        return len(self.data)
+
+    def __getitem__(self, index):
+
+        if isinstance(index, slice):
+            return [ElementView(self, _i) for _i in range(len(self.data))[index]]
+
+        if index < 0:
+            index += len(self.data)
+
+        if not 0 <= index < len(self.data):
+            raise IndexError('element index out of range')
+
+        return ElementView(self, index)
+
+    def __setitem__(self, index, element):
+
+        if index < 0:
+            index += len(self.data)
+
+        #copy before clearing, in case the element is a view of this index
+        element = dict(element)
+
+        self.data[index] = self._empty()
+        self.extras.pop(index, None)
+
+        _view = ElementView(self, index)
+
+        for _k, _v in element.items():
+            _view[_k] = _v
+
+    def __iter__(self):
+
+        for _i in range(len(self.data)):
+            yield ElementView(self, _i)
+
+    @staticmethod
+    def _empty():
+        '''
+        Return an element record with every value missing
+        '''
+
+        result = numpy.zeros(1, dtype=DTYPE)
+
+        for _k in DTYPE.names[1:]:
+            result[_k] = numpy.nan
+
+        return result[0]
+
+    def append(self, element):
+        '''
+        Add an element dictionary to the end of the store
+        '''
+
+        self.extend([element])
+
+    def extend(self, elements):
+        '''
+        Add a list of element dictionaries to the end of the store
+        '''
+
+        elements = [dict(_e) for _e in elements]
+
+        _first = len(self.data)
+
+        self.data = numpy.concatenate([
+            self.data, numpy.full(len(elements), self._empty(), dtype=DTYPE)
+        ])
+
+        for _i, _e in enumerate(elements):
+
+            _view = ElementView(self, _first + _i)
+
+            for _k, _v in _e.items():
+                _view[_k] = _v
+
+    def to_list(self):
+        '''
+        Return the elements as a list of dictionaries
+        '''
+
+        return [dict(_v) for _v in self]
+
+    def to_state(self):
+        '''
+        Return a compact, JSON-serializable state of the store
+        '''
+
+        return {
+            'version': STATE_VERSION,
+            'count': len(self.data),
+            'data': base64.b64encode(zlib.compress(self.data.tobytes())).decode('ascii'),
+            'extras': json.dumps({str(_k): _v for _k, _v in self.extras.items() if _v})
+        }
+
+    @staticmethod
+    def from_state(state):
+        '''
+        Return a store restored from the state returned by to_state()
+        '''
+
+        result = ElementStore()
+
+        if state.get('version') != STATE_VERSION:
+            print('Unsupported element store version: ', state.get('version'))
+            return result
+
+        result.data = numpy.frombuffer(
+            zlib.decompress(base64.b64decode(state['data'])), dtype=DTYPE, count=state['count']
+        ).copy()
+
+        result.extras = {int(_k): _v for _k, _v in json.loads(state['extras']).items()}
+
+        return result
@@ -67,7 +67,9 @@ def get_parameters(line):
         if line.get('Start'):
             line['End'] = line['Start'].add(_vec)
         else:
-            line['Start'] = line['End'].add(_vec)
+            line['Start'] = line['End'].sub(_vec)
+
+        line['BearingOut'] = line['BearingIn']
 
     else:
         print('Unable to calculate line parametters')
@@ -0,0 +1,412 @@
+# -*- coding: utf-8 -*-
+# **************************************************************************
+# *                                                                        *
+# *  Copyright (c) 2018 Joel Graff <monograff76@gmail.com>                 *
+# *                                                                        *
+# *  This program is free software; you can redistribute it and/or modify  *
+# *  it under the terms of the GNU Lesser General Public License (LGPL)    *
+# *  as published by the Free Software Foundation; either version 2 of     *
+# *  the License, or (at your option) any later version.                   *
+# *  for detail see the LICENCE text file.                                 *
+# *                                                                        *
+# *  This program is distributed in the hope that it will be useful,       *
+# *  but WITHOUT ANY WARRANTY; without even the implied warranty of        *
+# *  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the         *
+# *  GNU Library General Public License for more details.                  *
+# *                                                                        *
+# *  You should have received a copy of the GNU Library General Public     *
+# *  License along with this program; if not, write to the Free Software   *
+# *  Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  *
+# *  USA                                                                   *
+# *                                                                        *
+# **************************************************************************
+
+'''
+Spatial index for projecting points onto solved alignment geometry
+'''
+
+import math
+
+import numpy
+
+from Project.Support.Utils import Constants as C
+
+class ProjectionIndex(object):
+    '''
+    Uniform grid over the element bounding boxes of a StationIndex.
+
+    Points are projected analytically onto the candidate lines and arcs
+    sharing their grid cell, returning the internal station and offset
+    of the nearest projection.
+    '''
+
+    #maximum number of point / element pairs evaluated at once
+    CHUNK_SIZE = 1000000
+
+    #points sampled along each spiral to bound it
+    SPIRAL_SAMPLES = 17
+
+    #Newton iterations projecting points onto spirals
+    SPIRAL_ITERATIONS = 12
+
+    def __init__(self, station_index, max_offset=0.0, cell_size=None):
+        '''
+        station_index - StationIndex of the solved alignment geometry
+        max_offset - element bounding boxes are padded by this distance.
+                     Points within it are resolved from the grid alone.
+        cell_size - grid cell size.  Defaults to the median element length.
+        '''
+
+        self.station_index = station_index
+        self.max_offset = max_offset
+
+        _idx = station_index
+
+        #arc centers and central angles
+        with numpy.errstate(divide='ignore', invalid='ignore'):
+            _radius = numpy.where(_idx.curvature != 0.0, 1.0 / _idx.curvature, 0.0)
+
+        self.center = _idx.origin[:, 0:2] + numpy.column_stack(
+            [numpy.cos(_idx.bearing), -numpy.sin(_idx.bearing)]) * _radius[:, None]
+
+        self.delta = numpy.abs(_idx.curvature * _idx.length + 0.5 * _idx.rate * _idx.length ** 2)
+
+        _bounds = self._get_bounds()
+        _bounds[:, 0:2] -= max_offset
+        _bounds[:, 2:4] += max_offset
+
+        if cell_size is None:
+            cell_size = max(float(numpy.median(_idx.length)), 1.0) if len(_idx) else 1.0
+
+        self.cell_size = cell_size
+        self.origin = _bounds[:, 0:2].min(axis=0) if len(_idx) else numpy.zeros(2)
+
+        #grid cell ranges of each element bounding box
+        _lo = numpy.floor((_bounds[:, 0:2] - self.origin) / cell_size).astype(int)
+        _hi = numpy.floor((_bounds[:, 2:4] - self.origin) / cell_size).astype(int)
+
+        self.columns = int(_hi[:, 0].max()) + 1 if len(_idx) else 1
+
+        _span = _hi - _lo + 1
+        _counts = _span[:, 0] * _span[:, 1]
+
+        #rasterize the bounding boxes, listing every element in each cell it covers
+        _elements = numpy.repeat(numpy.arange(len(_idx)), _counts)
+        _local = numpy.arange(_counts.sum()) - numpy.repeat(numpy.cumsum(_counts) - _counts, _counts)
+        _nx = _span[_elements, 0]
+
+        _cells = (_lo[_elements, 0] + _local % _nx) \
+            + (_lo[_elements, 1] + _local // _nx) * self.columns
+
+        _order = numpy.argsort(_cells, kind='stable')
+
+        self.cells = _cells[_order]
+        self.elements = _elements[_order]
+
+    def _get_bounds(self):
+        '''
+        Return the element bounding boxes as an (n, 4) array of (xmin, ymin, xmax, ymax).
+        Arcs are bounded by their tangent triangle, or their circle beyond a half-turn.
+        '''
+
+        _idx = self.station_index
+
+        _start = _idx.origin[:, 0:2]
+        _end, _ = _idx.evaluate(numpy.arange(len(_idx)), _idx.length)
+
+        _half = numpy.minimum(self.delta / 2.0, C.HALF_PI)
+
+        with numpy.errstate(divide='ignore', invalid='ignore'):
+            _tangent = numpy.where(
+                _idx.curvature != 0.0, numpy.tan(_half) / numpy.abs(_idx.curvature), 0.0
+            )
+
+        _pi = _start + numpy.column_stack(
+            [numpy.sin(_idx.bearing), numpy.cos(_idx.bearing)]) * _tangent[:, None]
+
+        _pts = numpy.stack([_start, _end[:, 0:2], _pi])
+
+        result = numpy.hstack([_pts.min(axis=0), _pts.max(axis=0)])
+
+        #arcs of a half-turn or more are bounded by the full circle
+        _wide = (self.delta >= math.pi) & (_idx.rate == 0.0)
+
+        with numpy.errstate(divide='ignore'):
+            _radius = 1.0 / numpy.abs(_idx.curvature[_wide])
+
+        result[_wide, 0:2] = self.center[_wide] - _radius[:, None]
+        result[_wide, 2:4] = self.center[_wide] + _radius[:, None]
+
+        #spirals are bounded by sampled points, padded by the largest chord error
+        _spirals = numpy.flatnonzero(_idx.rate != 0.0)
+
+        if len(_spirals):
+
+            _steps = self.SPIRAL_SAMPLES - 1
+            _elements = numpy.repeat(_spirals, self.SPIRAL_SAMPLES)
+            _local = numpy.tile(numpy.linspace(0.0, 1.0, self.SPIRAL_SAMPLES), len(_spirals)) \
+                * _idx.length[_elements]
+
+            _pts = _idx.evaluate(_elements, _local)[0][:, 0:2].reshape(len(_spirals), -1, 2)
+
+            _max_k = numpy.maximum(
+                numpy.abs(_idx.curvature[_spirals]),
+                numpy.abs(_idx.curvature[_spirals] + _idx.rate[_spirals] * _idx.length[_spirals])
+            )
+
+            _pad = _max_k * (_idx.length[_spirals] / _steps) ** 2 / 8.0
+
+            result[_spirals, 0:2] = _pts.min(axis=1) - _pad[:, None]
+            result[_spirals, 2:4] = _pts.max(axis=1) + _pad[:, None]
+
+        return result
+
+    def _get_cells(self, points):
+        '''
+        Return the grid cell (column, row) of each point, with a mask of the finite points
+        '''
+
+        _finite = numpy.isfinite(points).all(axis=1)
+        _cell = numpy.floor((numpy.where(_finite[:, None], points, self.origin) - self.origin)
+                            / self.cell_size).astype(int)
+
+        return _cell, _finite
+
+    def _get_cell_pairs(self, owners, columns, rows):
+        '''
+        Return the (owner, element) index pairs for the elements in each cell
+        '''
+
+        _inside = (columns >= 0) & (columns < self.columns) & (rows >= 0)
+        _keys = numpy.where(_inside, columns + rows * self.columns, -1)
+
+        _lo = numpy.searchsorted(self.cells, _keys, side='left')
+        _hi = numpy.searchsorted(self.cells, _keys, side='right')
+
+        _counts = _hi - _lo
+
+        _owners = numpy.repeat(owners, _counts)
+        _local = numpy.arange(_counts.sum()) \
+            - numpy.repeat(numpy.cumsum(_counts) - _counts, _counts)
+
+        return _owners, self.elements[numpy.repeat(_lo, _counts) + _local]
+
+    def _get_candidates(self, points):
+        '''
+        Return the (point, element) index pairs for the elements sharing each point's cell
+        '''
+
+        _cell, _finite = self._get_cells(points)
+        _cell[~_finite] = -1
+
+        return self._get_cell_pairs(numpy.arange(len(points)), _cell[:, 0], _cell[:, 1])
+
+    def _get_neighbours(self, points, indices, radius):
+        '''
+        Return the (point, element) index pairs for the elements in the other cells
+        overlapping the square of the radius about each point, in chunks of at most
+        CHUNK_SIZE cells
+
+        indices - indices of the points to search
+        radius - search radius of each point
+        '''
+
+        if not len(indices):
+            return
+
+        _points = points[indices]
+
+        _own = self._get_cells(_points)[0]
+        _lo = self._get_cells(_points - radius[:, None])[0]
+        _hi = self._get_cells(_points + radius[:, None])[0]
+
+        _span = _hi - _lo + 1
+        _counts = _span[:, 0] * _span[:, 1]
+
+        _ends = numpy.cumsum(_counts)
+        _starts = _ends - _counts
+        _breaks = numpy.searchsorted(
+            _ends, numpy.arange(self.CHUNK_SIZE, _ends[-1], self.CHUNK_SIZE)
+        )
+
+        for _first, _last in zip(numpy.r_[0, _breaks], numpy.r_[_breaks, len(indices)]):
+
+            _pos = numpy.repeat(numpy.arange(_first, _last), _counts[_first:_last])
+            _local = numpy.arange(len(_pos)) + _starts[_first] - _starts[_pos]
+
+            _columns = _lo[_pos, 0] + _local % _span[_pos, 0]
+            _rows = _lo[_pos, 1] + _local // _span[_pos, 0]
+
+            #the point's own cell has been searched
+            _other = (_columns != _own[_pos, 0]) | (_rows != _own[_pos, 1])
+
+            yield self._get_cell_pairs(indices[_pos[_other]], _columns[_other], _rows[_other])
+
+    def _project_pairs(self, points, elements):
+        '''
+        Project each point onto its paired element.
+        Returns arrays of the distance along the element, the offset and the distance
+        between the point and its projection.
+        '''
+
+        _idx = self.station_index
+
+        _k = _idx.curvature[elements]
+        _bearing = _idx.bearing[elements]
+        _length = _idx.length[elements]
+
+        _vec = points - _idx.origin[elements, 0:2]
+
+        #tangents - distance along the forward vector
+        local = _vec[:, 0] * numpy.sin(_bearing) + _vec[:, 1] * numpy.cos(_bearing)
+
+        #arcs - angle swept from the start radius to the point radius
+        _is_arc = (_k != 0.0) & (_idx.rate[elements] == 0.0)
+
+        if _is_arc.any():
+
+            _dir = numpy.sign(_k[_is_arc])
+            _center = self.center[elements[_is_arc]]
+            _radial = points[_is_arc] - _center
+            _start = _idx.origin[elements[_is_arc], 0:2] - _center
+
+            _swept = (_dir * (numpy.arctan2(_radial[:, 0], _radial[:, 1])
+                              - numpy.arctan2(_start[:, 0], _start[:, 1]))) % C.TWO_PI
+
+            #beyond the arc, snap to the nearer end
+            _delta = self.delta[elements[_is_arc]]
+            _beyond = _swept > _delta
+
+            _swept[_beyond] = numpy.where(
+                _swept[_beyond] - _delta[_beyond] > C.TWO_PI - _swept[_beyond], 0.0, _delta[_beyond]
+            )
+
+            local[_is_arc] = _swept / numpy.abs(_k[_is_arc])
+
+        local = numpy.clip(local, 0.0, _length)
+
+        #spirals - refine the tangent projection by Newton iteration
+        _is_spiral = _idx.rate[elements] != 0.0
+
+        if _is_spiral.any():
+            local[_is_spiral] = self._project_spirals(
+                points[_is_spiral], elements[_is_spiral], local[_is_spiral]
+            )
+
+        _pts, _bearings = _idx.evaluate(elements, local)
+        _diff = points - _pts[:, 0:2]
+
+        #offsets are positive to the right of the alignment
+        offset = _diff[:, 0] * numpy.cos(_bearings) - _diff[:, 1] * numpy.sin(_bearings)
+
+        return local, offset, numpy.hypot(_diff[:, 0], _diff[:, 1])
+
+    def _project_spirals(self, points, elements, local):
+        '''
+        Return the distances along the spirals to the projections of the points,
+        solving for a zero tangential offset, starting at the passed distances
+        '''
+
+        _idx = self.station_index
+        _length = _idx.length[elements]
+
+        for _i in range(self.SPIRAL_ITERATIONS):
+
+            _pts, _bearings = _idx.evaluate(elements, local)
+            _diff = points - _pts[:, 0:2]
+
+            _sin, _cos = numpy.sin(_bearings), numpy.cos(_bearings)
+
+            #tangential and right offsets, and the curvature at the current distance
+            _along = _diff[:, 0] * _sin + _diff[:, 1] * _cos
+            _right = _diff[:, 0] * _cos - _diff[:, 1] * _sin
+            _k = _idx.curvature[elements] + _idx.rate[elements] * local
+
+            #derivative of the tangential offset, falling back to a unit step
+            #where the point lies beyond the center of curvature
+            _slope = 1.0 - _k * _right
+            _slope[_slope < 0.1] = 1.0
+
+            _step = _along / _slope
+            local = numpy.clip(local + _step, 0.0, _length)
+
+            if numpy.all(numpy.abs(_step) < 1e-6):
+                break
+
+        return local
+
+    def _nearest(self, points, pair_points, pair_elements, stations, offsets, distances):
+        '''
+        Reduce the projected pairs to the nearest projection for each point,
+        updating the result arrays in place
+        '''
+
+        if not len(pair_points):
+            return
+
+        _local, _offset, _dist = self._project_pairs(points[pair_points], pair_elements)
+
+        _order = numpy.lexsort((_dist, pair_points))
+        _first = numpy.unique(pair_points[_order], return_index=True)[1]
+        _best = _order[_first]
+
+        _pt = pair_points[_best]
+        _closer = _dist[_best] < distances[_pt]
+        _best, _pt = _best[_closer], _pt[_closer]
+
+        stations[_pt] = self.station_index.start[pair_elements[_best]] + _local[_best]
+        offsets[_pt] = _offset[_best]
+        distances[_pt] = _dist[_best]
+
+    def project(self, points, exhaustive=True):
+        '''
+        Project points onto the alignment.
+
+        points - array of (x, y) or (x, y, z) coordinates
+        exhaustive - test points with no grid candidates against every element.
+                     Otherwise, those points return nan.  Points with candidates
+                     are resolved to the nearest element in either case.
+
+        Returns a tuple of numpy arrays (internal stations, offsets).
+        Offsets are positive to the right of the alignment.
+        '''
+
+        points = numpy.atleast_2d(numpy.asarray(points, dtype=float))[:, 0:2]
+
+        stations = numpy.full(len(points), numpy.nan)
+        offsets = numpy.full(len(points), numpy.nan)
+        distances = numpy.full(len(points), numpy.inf)
+
+        if not len(self.station_index):
+            return stations, offsets
+
+        _pair_points, _pair_elements = self._get_candidates(points)
+
+        self._nearest(points, _pair_points, _pair_elements, stations, offsets, distances)
+
+        #a nearer element may lie in a neighbouring cell, within the distance to the
+        #projection less the padding of the bounding boxes, so search the cells in it
+        _radius = distances - self.max_offset
+        _search = numpy.flatnonzero(numpy.isfinite(_radius) & (_radius > 0.0))
+
+        for _pair_points, _pair_elements in self._get_neighbours(
+                points, _search, _radius[_search]):
+
+            self._nearest(points, _pair_points, _pair_elements, stations, offsets, distances)
+
+        if not exhaustive:
+            return stations, offsets
+
+        #test the remaining points against all elements, in chunks to bound memory
+        _missing = numpy.flatnonzero(numpy.isnan(stations) & numpy.isfinite(points).all(axis=1))
+        _count = len(self.station_index)
+        _step = max(1, self.CHUNK_SIZE // _count)
+
+        for _i in range(0, len(_missing), _step):
+
+            _pts = _missing[_i:_i + _step]
+
+            self._nearest(points, numpy.repeat(_pts, _count), numpy.tile(numpy.arange(_count), len(_pts)),
+                          stations, offsets, distances)
+
+        return stations, offsets
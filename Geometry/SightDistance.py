@@ -0,0 +1,197 @@
+# -*- coding: utf-8 -*-
+# **************************************************************************
+# *                                                                        *
+# *  Copyright (c) 2018 Joel Graff <monograff76@gmail.com>                 *
+# *                                                                        *
+# *  This program is free software; you can redistribute it and/or modify  *
+# *  it under the terms of the GNU Lesser General Public License (LGPL)    *
+# *  as published by the Free Software Foundation; either version 2 of     *
+# *  the License, or (at your option) any later version.                   *
+# *  for detail see the LICENCE text file.                                 *
+# *                                                                        *
+# *  This program is distributed in the hope that it will be useful,       *
+# *  but WITHOUT ANY WARRANTY; without even the implied warranty of        *
+# *  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the         *
+# *  GNU Library General Public License for more details.                  *
+# *                                                                        *
+# *  You should have received a copy of the GNU Library General Public     *
+# *  License along with this program; if not, write to the Free Software   *
+# *  Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  *
+# *  USA                                                                   *
+# *                                                                        *
+# **************************************************************************
+
+'''
+Stopping / passing sight distance analysis along a composite 3D alignment
+'''
+
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy
+
+#AASHTO driver eye and object heights (mm)
+EYE_HEIGHT = 1066.8
+STOPPING_OBJECT_HEIGHT = 609.6
+PASSING_OBJECT_HEIGHT = 1066.8
+
+#approximate number of ray samples evaluated per chunk of stations
+CHUNK_SIZE = 1000000
+
+class SightDistance(object):
+    '''
+    Sight distance engine for an Alignment3d.
+
+    For each station, the sight line from the driver's eye is marched ahead
+    along the alignment to targets at regular distances.  A target is hidden
+    if the roadway crests above the sight line, or if the sight line crosses
+    an obstruction line offset to either side of the driver's path.
+    The sight distance is the distance along the alignment to the last target
+    visible before the first hidden one.  All lengths are in system units (mm).
+    '''
+
+    def __init__(self, alignment, eye_height=EYE_HEIGHT,
+                 object_height=STOPPING_OBJECT_HEIGHT, offset=0.0, clearance=None):
+        '''
+        alignment - Alignment3d to analyze
+        eye_height, object_height - driver eye and object heights above the roadway
+        offset - lateral offset of the driver's path, right of the alignment
+                 in the direction of travel
+        clearance - lateral distance from the driver's path to obstruction lines
+                    on either side (e.g. a cut slope or barrier), or None to
+                    ignore horizontal obstructions
+        '''
+
+        self.alignment = alignment
+        self.eye_height = eye_height
+        self.object_height = object_height
+        self.offset = offset
+        self.clearance = clearance
+
+    def get_sight_distances(self, stations, max_distance, step=304.8,
+                            direction=1, workers=None, chunk_size=CHUNK_SIZE):
+        '''
+        Return the sight distance at each internal station as a numpy array.
+
+        stations - internal stations of the driver's eye (mm)
+        max_distance - distance beyond which sight is not checked
+        step - spacing of the targets along the road
+        direction - 1 to look ahead of the stations, -1 to look back
+        workers - number of threads analyzing chunks of stations in parallel.
+                  Chunks are analyzed serially if None or 1.
+        chunk_size - approximate number of ray samples per chunk
+        '''
+
+        stations = numpy.atleast_1d(numpy.asarray(stations, dtype=float))
+
+        distances = numpy.arange(1, int(numpy.ceil(max_distance / step)) + 1) * step
+        distances[-1] = max_distance
+
+        _count = max(1, int(chunk_size // len(distances)))
+        _chunks = [stations[_i:_i + _count] for _i in range(0, len(stations), _count)]
+
+        if not workers or workers == 1 or len(_chunks) == 1:
+            _results = [self._get_chunk(_c, distances, direction) for _c in _chunks]
+
+        else:
+
+            with ThreadPoolExecutor(max_workers=workers) as _pool:
+                _results = list(_pool.map(
+                    lambda _c: self._get_chunk(_c, distances, direction), _chunks
+                ))
+
+        if not _results:
+            return numpy.zeros(0)
+
+        return numpy.concatenate(_results)
+
+    def _get_path(self, stations, direction):
+        '''
+        Return the driver's path coordinates, and the travel direction and
+        its right-hand normal in plan, at the stations
+        '''
+
+        coords, tangents = self.alignment.get_points(stations)
+
+        _forward = direction * tangents[:, :2]
+        _forward /= numpy.linalg.norm(_forward, axis=1)[:, None]
+
+        _right = numpy.column_stack([_forward[:, 1], -_forward[:, 0]])
+
+        coords[:, :2] += self.offset * _right
+
+        return coords, _forward, _right
+
+    def _get_chunk(self, stations, distances, direction):
+        '''
+        Return the sight distances at a chunk of stations
+        '''
+
+        _n, _k = len(stations), len(distances)
+
+        _eye, _forward, _right = self._get_path(stations, direction)
+        _eye[:, 2] += self.eye_height
+
+        _targets, _t_forward, _t_right = self._get_path(
+            (stations[:, None] + direction * distances[None, :]).ravel(), direction
+        )
+
+        _targets = _targets.reshape(_n, _k, 3)
+
+        #plan vectors from the eye to each target
+        _vec = _targets[:, :, :2] - _eye[:, None, :2]
+        _range = numpy.linalg.norm(_vec, axis=2)
+
+        #the roadway crests above the sight line if it rises above the
+        #steepest sight line to the road surface nearer to the eye
+        with numpy.errstate(divide='ignore', invalid='ignore'):
+            _surface = (_targets[:, :, 2] - _eye[:, None, 2]) / _range
+            _target = (_targets[:, :, 2] + self.object_height - _eye[:, None, 2]) / _range
+
+        visible = _target >= self._exclusive(numpy.maximum, _surface)
+
+        if self.clearance is not None:
+
+            _t_right = _t_right.reshape(_n, _k, 2) * self.clearance
+
+            #angles from the eye's line of travel, positive to the right
+            _angle = self._get_angles(_vec, _forward, _right)
+            _inside_right = self._get_angles(_vec + _t_right, _forward, _right)
+            _inside_left = self._get_angles(_vec - _t_right, _forward, _right)
+
+            visible &= _angle <= self._exclusive(numpy.minimum, _inside_right)
+            visible &= _angle >= self._exclusive(numpy.maximum, _inside_left)
+
+        #targets beyond the end of the alignment are never visible
+        _hidden = numpy.argmin(visible, axis=1)
+        _all_visible = visible.all(axis=1)
+
+        result = numpy.where(_hidden > 0, distances[numpy.maximum(_hidden - 1, 0)], 0.0)
+        result[_all_visible] = distances[-1]
+
+        return result
+
+    @staticmethod
+    def _get_angles(vectors, forward, right):
+        '''
+        Return the angles of the plan vectors from the forward directions,
+        positive to the right
+        '''
+
+        return numpy.arctan2(
+            numpy.einsum('nkj,nj->nk', vectors, right),
+            numpy.einsum('nkj,nj->nk', vectors, forward)
+        )
+
+    @staticmethod
+    def _exclusive(func, values):
+        '''
+        Return the running func (numpy.maximum / minimum) of the values along
+        each row, excluding each value itself
+        '''
+
+        _fill = -numpy.inf if func is numpy.maximum else numpy.inf
+
+        result = numpy.full(values.shape, _fill)
+        result[:, 1:] = func.accumulate(values[:, :-1], axis=1)
+
+        return result
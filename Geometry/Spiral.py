@@ -1,85 +1,512 @@
-import FreeCAD as App
+# -*- coding: utf-8 -*-
+# **************************************************************************
+# *                                                                        *
+# *  Copyright (c) 2018 Joel Graff <monograff76@gmail.com>                 *
+# *                                                                        *
+# *  This program is free software; you can redistribute it and/or modify  *
+# *  it under the terms of the GNU Lesser General Public License (LGPL)    *
+# *  as published by the Free Software Foundation; either version 2 of     *
+# *  the License, or (at your option) any later version.                   *
+# *  for detail see the LICENCE text file.                                 *
+# *                                                                        *
+# *  This program is distributed in the hope that it will be useful,       *
+# *  but WITHOUT ANY WARRANTY; without even the implied warranty of        *
+# *  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the         *
+# *  GNU Library General Public License for more details.                  *
+# *                                                                        *
+# *  You should have received a copy of the GNU Library General Public     *
+# *  License along with this program; if not, write to the Free Software   *
+# *  Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  *
+# *  USA                                                                   *
+# *                                                                        *
+# **************************************************************************
+
+'''
+Clothoid (Euler spiral) element functions.
+
+Curvature varies linearly with distance along the spiral, from the start radius
+to the end radius.  Positions are evaluated with Fresnel integrals.
+'''
+
 import math
 
-def discretize_spiral(start_coord, bearing, radius, angle, length, interval, interval_type):
+import numpy
+
+from scipy import special
+
+import FreeCAD as App
+
+from Project.Support import Units
+from Project.Support.Utils import Constants as C
+from Geometry import Arc, Support
+
+#below this quadratic heading term (radians), a spiral is evaluated as an arc
+QUADRATIC_TOLERANCE = 1e-10
+
+def get_curvature(radius, direction):
     '''
-    Discretizes a spiral curve using the length parameter.  
+    Return the signed curvature (direction / radius) of a spiral end.
+    Infinite or missing radii are tangent (zero curvature).
     '''
 
-    #generate inbound spiral
-    #generate circular arc
-    #generate outbound spiral
+    if radius is None or not math.isfinite(radius):
+        return 0.0
 
-    points = []
+    return direction / radius
 
-    length_mm = length * 304.80
-    radius_mm = radius * 304.80
+def get_local(curvature, rate, distances):
+    '''
+    Evaluate spirals in their local frame, with the origin at the spiral start,
+    and the initial tangent along the forward axis.
 
-    bearing_in = App.Vector(math.sin(bearing), math.cos(bearing))
+    curvature - signed curvature at the spiral start (positive clockwise)
+    rate - change in signed curvature per unit length
+    distances - distances from the spiral start
 
-    curve_dir = 1.0
+    Arguments broadcast as numpy arrays.
 
-    if angle < 0.0:
-        curve_dir = -1.0
-        angle = abs(angle)
+    Returns a tuple of arrays (forward, right, angle), where angle is the
+    change in bearing from the spiral start.
+    '''
+
+    _k = numpy.asarray(curvature, dtype=float)
+    _m = numpy.asarray(rate, dtype=float)
+    _s = numpy.asarray(distances, dtype=float)
+
+    _k, _m, _s = numpy.broadcast_arrays(_k, _m, _s)
+
+    angle = _k * _s + 0.5 * _m * _s * _s
+
+    forward = _s.copy()
+    right = numpy.zeros(_s.shape)
+
+    _fresnel = numpy.abs(0.5 * _m * _s * _s) > QUADRATIC_TOLERANCE
+    _arc = ~_fresnel & (_k != 0.0)
 
-    _Xc = ((length_mm**2) / (6.0 * radius_mm))
-    _Yc = (length_mm - ((length_mm**3) / (40 * radius_mm**2)))
+    #constant curvature - arc relations
+    if _arc.any():
 
-    _dY = App.Vector(bearing_in).multiply(_Yc)
-    _dX = App.Vector(bearing_in.y, -bearing_in.x, 0.0).multiply(curve_dir).multiply(_Xc)
+        _ka = _k[_arc]
+        forward[_arc] = numpy.sin(angle[_arc]) / _ka
+        right[_arc] = (1.0 - numpy.cos(angle[_arc])) / _ka
 
-    theta_spiral = length_mm/(2 * radius_mm)
-    arc_start = start_coord.add(_dX.add(_dY))
-    arc_coords = [arc_start]
-    #arc_coords.extend(_HorizontalAlignment.discretize_arc(arc_start, bearing + (theta_spiral * curve_dir), radius, curve_dir * (angle - (2 * theta_spiral)), interval, interval_type))
+    #varying curvature - the heading is quadratic in distance,
+    #a * (s + s0)^2 - a * s0^2, integrated with the Fresnel integrals
+    if _fresnel.any():
+
+        _a = 0.5 * _m[_fresnel]
+        _sign = numpy.sign(_a)
+        _s0 = _k[_fresnel] / (2.0 * _a)
+
+        _root = numpy.sqrt(2.0 * numpy.abs(_a) / math.pi)
+
+        _sin_0, _cos_0 = special.fresnel(_s0 * _root)
+        _sin_1, _cos_1 = special.fresnel((_s[_fresnel] + _s0) * _root)
+
+        _integral = ((_cos_1 - _cos_0) + 1j * _sign * (_sin_1 - _sin_0)) / _root
+        _integral *= numpy.exp(-1j * _a * _s0 * _s0)
+
+        forward[_fresnel] = _integral.real
+        right[_fresnel] = _integral.imag
+
+    return forward, right, angle
+
+def get_parameters(spiral):
+    '''
+    Solve a spiral from its start coordinate and bearing, length,
+    start / end radii, and direction.
+
+    The start bearing may be inferred from the PI if not supplied.
+
+    Returns the solved spiral dictionary, or None if the spiral is underdefined
+    '''
+
+    _start = spiral.get('Start')
+    _length = spiral.get('Length')
+    _dir = spiral.get('Direction')
+    _bearing = spiral.get('BearingIn')
+
+    if _bearing is None and _start and spiral.get('PI'):
+        _bearing = Support.get_bearing(spiral['PI'].sub(_start))
+
+    if _start is None or _bearing is None or not _length or not _dir:
+        print('Invalid spiral definition: start, bearing, length and direction required')
+        return None
+
+    _radii = [spiral.get('StartRadius'), spiral.get('EndRadius')]
+
+    if any(_r is not None and _r <= 0.0 for _r in _radii):
+        print('Invalid spiral definition: radii must be positive')
+        return None
 
-    if len(arc_coords) < 2:
+    _k_start = get_curvature(_radii[0], _dir)
+    _k_end = get_curvature(_radii[1], _dir)
+
+    if _k_start == _k_end:
+        print('Invalid spiral definition: start and end radii are equal')
+        return None
+
+    _rate = (_k_end - _k_start) / _length
+
+    _fwd, _right, _angle = get_local(_k_start, _rate, _length)
+    _fwd, _right, _angle = float(_fwd), float(_right), float(_angle)
+
+    _sin, _cos = math.sin(_bearing), math.cos(_bearing)
+
+    _end = App.Vector(
+        _start.x + _fwd * _sin + _right * _cos, _start.y + _fwd * _cos - _right * _sin, _start.z
+    )
+
+    result = {
+        **spiral,
+        'Type': 'spiral',
+        'Start': App.Vector(_start),
+        'End': _end,
+        'BearingIn': _bearing,
+        'BearingOut': (_bearing + _angle) % C.TWO_PI,
+        'Delta': abs(_angle),
+        'Direction': _dir,
+        'Length': _length,
+        'StartCurvature': _k_start,
+        'CurvatureRate': _rate,
+        'Chord': _end.sub(_start).Length,
+    }
+
+    result.pop('Center', None)
+
+    #the PI is the intersection of the start and end tangents
+    result['PI'] = None
+
+    if not Support.within_tolerance(math.sin(_angle)):
+
+        _tangent = _fwd - _right * math.cos(_angle) / math.sin(_angle)
+        result['PI'] = _start.add(App.Vector(_sin, _cos, 0.0).multiply(_tangent))
+
+    return result
+
+def get_distances(spiral, interval, interval_type='Segment', scale_factor=None):
+    '''
+    Return the distances along a spiral at which it is discretized.
+
+    interval_type - 'Segment' divides the spiral into (interval) equal segments.
+                    'Interval' spaces points (interval) document units apart.
+                    'Tolerance' limits the chord error to (interval) document units,
+                    placing points closer together as the curvature increases.
+    '''
+
+    if scale_factor is None:
+        scale_factor = Units.scale_factor()
+
+    _length = spiral['Length']
+
+    if interval_type == 'Interval':
+        _count = int(math.ceil(_length / (interval * scale_factor)))
+
+    elif interval_type == 'Tolerance':
+        return _get_tolerance_distances(spiral, interval * scale_factor)
+
+    else:
+        _count = int(interval)
+
+    return numpy.linspace(0.0, _length, max(_count, 1) + 1)
+
+def get_tolerance_count(spiral, tolerance):
+    '''
+    Return the (fractional) number of segments needed to hold the chord error
+    of a spiral to the tolerance (system units), with the parameters of the
+    closed-form spacing as a tuple (count, start curvature, curvature rate, scale)
+    '''
+
+    _length = spiral['Length']
+    _k0 = abs(spiral['StartCurvature'])
+    _k1 = abs(spiral['StartCurvature'] + spiral['CurvatureRate'] * _length)
+
+    _rate = (_k1 - _k0) / _length
+    _scale = 1.0 / math.sqrt(8.0 * tolerance)
+
+    return _scale * (2.0 / 3.0) * (_k1 ** 1.5 - _k0 ** 1.5) / _rate, _k0, _rate, _scale
+
+def _get_tolerance_distances(spiral, tolerance):
+    '''
+    Return distances along a spiral limiting the chord error to the tolerance.
+    See _get_tolerance_distances_batch().
+    '''
+
+    return _get_tolerance_distances_batch(
+        [spiral['Length']], [spiral['StartCurvature']], [spiral['CurvatureRate']], tolerance
+    )[0]
+
+def _get_tolerance_distances_batch(lengths, start_curvatures, rates, tolerance):
+    '''
+    Return distances along a list of spirals limiting the chord error to the tolerance,
+    as a tuple of numpy arrays (distances, counts).
+
+    The chord error of a segment of length h at curvature k is about k * h^2 / 8,
+    so points are spaced at a density of sqrt(|k| / (8 * tolerance)).  With curvature
+    linear in distance, the cumulative density inverts in closed form.
+    '''
+
+    _length = numpy.asarray(lengths, dtype=float)
+    _start = numpy.asarray(start_curvatures, dtype=float)
+    _signed_rate = numpy.asarray(rates, dtype=float)
+
+    #cumulative segment count at the spiral end, as in get_tolerance_count()
+    _k0 = numpy.abs(_start)
+    _k1 = numpy.abs(_start + _signed_rate * _length)
+
+    _rate = (_k1 - _k0) / _length
+    _scale = 1.0 / math.sqrt(8.0 * tolerance)
+
+    _total = _scale * (2.0 / 3.0) * (_k1 ** 1.5 - _k0 ** 1.5) / _rate
+
+    _segments = numpy.maximum(numpy.ceil(_total), 1.0)
+    counts = _segments.astype(int) + 1
+
+    _ids = numpy.repeat(numpy.arange(len(_length)), counts)
+    _local = numpy.arange(counts.sum()) - numpy.repeat(numpy.cumsum(counts) - counts, counts)
+
+    _targets = _local * (_total / _segments)[_ids]
+
+    #curvature at which each target count is reached, then its distance
+    _k = numpy.maximum(
+        _k0[_ids] ** 1.5 + 1.5 * _rate[_ids] * _targets / _scale, 0.0
+    ) ** (2.0 / 3.0)
+
+    result = (_k - _k0[_ids]) / _rate[_ids]
+    result[_local == 0] = 0.0
+    result[numpy.cumsum(counts) - 1] = _length
+
+    #curvature varies within each segment, so split any segment whose
+    #midpoint still deviates from its chord by more than the tolerance
+    for _i in range(4):
+
+        #segments within a single spiral
+        _seg = numpy.flatnonzero(_ids[:-1] == _ids[1:])
+        _seg_ids = _ids[_seg]
+
+        _mid = 0.5 * (result[_seg] + result[_seg + 1])
+        _pts = numpy.column_stack(get_local(
+            numpy.concatenate([_start[_ids], _start[_seg_ids]]),
+            numpy.concatenate([_signed_rate[_ids], _signed_rate[_seg_ids]]),
+            numpy.concatenate([result, _mid])
+        )[0:2])
+
+        _ends, _mids = _pts[:len(result)], _pts[len(result):]
+        _chord = _ends[_seg + 1] - _ends[_seg]
+        _offset = _mids - _ends[_seg]
+
+        _error = numpy.abs(_chord[:, 0] * _offset[:, 1] - _chord[:, 1] * _offset[:, 0]) \
+            / numpy.hypot(_chord[:, 0], _chord[:, 1])
+
+        _split = _error > tolerance
+
+        if not _split.any():
+            break
+
+        result = numpy.concatenate([result, _mid[_split]])
+        _ids = numpy.concatenate([_ids, _seg_ids[_split]])
+
+        _order = numpy.lexsort((result, _ids))
+        result, _ids = result[_order], _ids[_order]
+
+    return result, numpy.bincount(_ids, minlength=len(_length))
+
+def get_positions(spiral, distances):
+    '''
+    Return the coordinates and bearings at distances along a solved spiral
+    as a tuple of numpy arrays (coordinates (n, 3), bearings (n,))
+    '''
+
+    _fwd, _right, _angle = get_local(spiral['StartCurvature'], spiral['CurvatureRate'], distances)
+
+    _bearing = spiral['BearingIn']
+    _sin, _cos = math.sin(_bearing), math.cos(_bearing)
+
+    result = numpy.empty((len(_fwd), 3))
+    result[:, 0] = spiral['Start'].x + _fwd * _sin + _right * _cos
+    result[:, 1] = spiral['Start'].y + _fwd * _cos - _right * _sin
+    result[:, 2] = spiral['Start'].z
+
+    return result, (_bearing + _angle) % C.TWO_PI
+
+def get_points(spiral, interval, interval_type='Segment', scale_factor=None):
+    '''
+    Discretize a solved spiral, returning an (n, 3) numpy array of points
+    from the spiral start to its end
+    '''
+
+    return get_positions(
+        spiral, get_distances(spiral, interval, interval_type, scale_factor)
+    )[0]
+
+def discretize_spiral(start_coord, bearing, radius, angle, length, interval, interval_type):
+    '''
+    Discretizes a spiral-arc-spiral curve, with equal entry and exit spirals.
+
+    radius, length - central arc radius and spiral length in document units
+    angle - total central angle (radians), negative for counter-clockwise curves
+
+    Returns a list of vectors, or None if the spirals leave no central arc.
+    '''
+
+    _sf = Units.scale_factor()
+
+    _dir = 1.0
+
+    if angle < 0.0:
+        _dir = -1.0
+
+    length_mm = length * _sf
+    radius_mm = radius * _sf
+
+    arc_delta = abs(angle) - length_mm / radius_mm
+
+    if arc_delta < 0.0:
         print('Invalid central arc defined for spiral')
         return None
 
-    segment_length = arc_coords[0].distanceToPoint(arc_coords[1])
-    segments = int(length_mm / segment_length) + 1
+    spiral_in = get_parameters({
+        'Start': start_coord, 'BearingIn': bearing, 'Length': length_mm,
+        'StartRadius': math.inf, 'EndRadius': radius_mm, 'Direction': _dir
+    })
+
+    arc = Arc.get_parameters({
+        'Start': spiral_in['End'], 'BearingIn': spiral_in['BearingOut'],
+        'Radius': radius_mm, 'Delta': arc_delta, 'Direction': _dir
+    })
+
+    spiral_out = get_parameters({
+        'Start': arc['End'], 'BearingIn': arc['BearingOut'], 'Length': length_mm,
+        'StartRadius': radius_mm, 'EndRadius': math.inf, 'Direction': _dir
+    })
+
+    points = [
+        get_points(spiral_in, interval, interval_type, _sf),
+        Arc.get_points_batch([arc], interval, interval_type, _sf)[0][1:],
+        get_points(spiral_out, interval, interval_type, _sf)[1:]
+    ]
+
+    return [App.Vector(*_p) for _p in numpy.concatenate(points)]
+
+def get_distances_batch(lengths, start_curvatures, rates, interval, interval_type='Segment',
+                        scale_factor=None):
+    '''
+    Return the distances along a list of spirals at which they are discretized,
+    as a tuple of numpy arrays (distances, counts), where counts is the number
+    of distances per spiral.  See get_distances() for the interval types.
+    '''
+
+    if scale_factor is None:
+        scale_factor = Units.scale_factor()
+
+    lengths = numpy.asarray(lengths, dtype=float)
+
+    if interval_type == 'Tolerance':
+        return _get_tolerance_distances_batch(
+            lengths, start_curvatures, rates, interval * scale_factor
+        )
+
+    if interval_type == 'Interval':
+        _segments = numpy.ceil(lengths / (interval * scale_factor))
+
+    else:
+        _segments = numpy.full(lengths.shape, float(int(interval)))
+
+    _segments = numpy.maximum(_segments, 1.0)
+    counts = _segments.astype(int) + 1
+
+    _local = numpy.arange(counts.sum()) - numpy.repeat(numpy.cumsum(counts) - counts, counts)
+
+    distances = _local * numpy.repeat(lengths / _segments, counts)
+    distances[numpy.cumsum(counts) - 1] = lengths
+
+    return distances, counts
+
+def discretize_spirals(bearings, radii, angles, lengths, interval, interval_type):
+    '''
+    Discretize spiral-arc-spiral curves in a single vectorized pass.
+
+    Arguments are arrays with one value per curve, as for discretize_spiral().
+    Points match those of discretize_spiral(), with each curve starting at the origin.
+
+    Returns a tuple of numpy arrays (points (n, 3), counts), where counts is the
+    number of points per curve, or None if the spirals of any curve leave no central arc.
+    '''
+
+    _sf = Units.scale_factor()
+
+    bearings = numpy.asarray(bearings, dtype=float)
+    angles = numpy.asarray(angles, dtype=float)
+
+    _dir = numpy.where(angles < 0.0, -1.0, 1.0)
+    _length = numpy.asarray(lengths, dtype=float) * _sf
+    _radius = numpy.asarray(radii, dtype=float) * _sf
+
+    _arc_delta = numpy.abs(angles) - _length / _radius
+
+    if (_arc_delta < 0.0).any():
+        print('Invalid central arc defined for spiral at curves',
+              numpy.flatnonzero(_arc_delta < 0.0).tolist())
+        return None
+
+    _k = _dir / _radius
+    _rate = _k / _length
+
+    #spiral in, arc and spiral out, each in the frame of its own start
+    _in_dist, _in_counts = get_distances_batch(
+        _length, numpy.zeros(len(_k)), _rate, interval, interval_type, _sf
+    )
 
-    for _i in range(0, segments):
+    _arc_deltas, _arc_counts = Arc.get_segment_deltas(
+        [{'Delta': _d, 'Radius': _r} for _d, _r in zip(_arc_delta, _radius)],
+        interval, interval_type, _sf
+    )
 
-        _len = float(_i) * segment_length
+    _out_dist, _out_counts = get_distances_batch(_length, _k, -_rate, interval, interval_type, _sf)
 
-        _x = (_len ** 3) / (6.0 * radius_mm * length_mm)
-        _y = _len - ((_len**5) / (40 * (radius_mm ** 2) * (length_mm**2)))
+    _in = get_local(numpy.repeat(0.0, len(_in_dist)), numpy.repeat(_rate, _in_counts), _in_dist)
 
-        _dY = App.Vector(bearing_in).multiply(_y)
-        _dX = App.Vector(bearing_in.y, -bearing_in.x, 0.0).multiply(curve_dir).multiply(_x)
+    _arc_radius = numpy.repeat(_radius, _arc_counts)
+    _arc = (numpy.sin(_arc_deltas) * _arc_radius,
+            numpy.repeat(_dir, _arc_counts) * (1.0 - numpy.cos(_arc_deltas)) * _arc_radius)
 
-        points.append(start_coord.add(_dY.add(_dX)))
+    _out = get_local(numpy.repeat(_k, _out_counts), numpy.repeat(-_rate, _out_counts), _out_dist)
 
-    points.extend(arc_coords)
+    #the arc and spiral out are rotated by the deflection of the pieces before them
+    _spiral_angle = _dir * _length / (2.0 * _radius)
+    _bearings = [bearings, bearings + _spiral_angle, bearings + _spiral_angle + _dir * _arc_delta]
 
-    exit_bearing = bearing + (angle * curve_dir)
-    bearing_out = App.Vector(math.sin(exit_bearing), math.cos(exit_bearing), 0.0)
+    _origin = numpy.zeros((len(bearings), 2))
+    _points, _curves = [], []
 
-    _dY = App.Vector(bearing_out).multiply(_Yc)
-    _dX = App.Vector(-bearing_out.y, bearing_out.x, 0.0).multiply(curve_dir).multiply(_Xc)
+    for _local, _counts, _bearing in zip([_in, _arc, _out],
+                                         [_in_counts, _arc_counts, _out_counts], _bearings):
 
-    end_coord = points[-1].add(_dY.add(_dX))
+        _b = numpy.repeat(_bearing, _counts)
+        _sin, _cos = numpy.sin(_b), numpy.cos(_b)
 
-    temp = [end_coord]
+        _xy = numpy.column_stack([_local[0] * _sin + _local[1] * _cos,
+                                  _local[0] * _cos - _local[1] * _sin])
 
-    for _i in range(1, segments):
+        _xy += numpy.repeat(_origin, _counts, axis=0)
 
-        _len = float(_i) * segment_length
+        _ends = numpy.cumsum(_counts) - 1
+        _keep = numpy.ones(len(_xy), dtype=bool)
 
-        if _len > length_mm:
-            _len = length_mm
+        #each following piece begins at the last point of the one before
+        if _points:
+            _keep[_ends - _counts + 1] = False
 
-        _x = (_len ** 3) / (6.0 * radius_mm * length_mm)
-        _y = _len - ((_len ** 5) / (40 * (radius_mm ** 2) * (length_mm**2)))
+        _origin = _xy[_ends]
 
-        _dY = App.Vector(-bearing_out).multiply(_y)
-        _dX = App.Vector(bearing_out.y, -bearing_out.x, 0.0).multiply(curve_dir).multiply(_x)
+        _points.append(_xy[_keep])
+        _curves.append(numpy.repeat(numpy.arange(len(bearings)), _counts)[_keep])
 
-        temp.append(end_coord.add(_dY.add(_dX)))
+    #interleave the pieces, curve by curve
+    _curves = numpy.concatenate(_curves)
+    _order = numpy.argsort(_curves, kind='stable')
 
-    points.extend(temp[::-1])
+    points = numpy.zeros((len(_curves), 3))
+    points[:, 0:2] = numpy.concatenate(_points)[_order]
 
-    return points
\ No newline at end of file
+    return points, numpy.bincount(_curves, minlength=len(bearings))
@@ -0,0 +1,210 @@
+# -*- coding: utf-8 -*-
+# **************************************************************************
+# *                                                                        *
+# *  Copyright (c) 2018 Joel Graff <monograff76@gmail.com>                 *
+# *                                                                        *
+# *  This program is free software; you can redistribute it and/or modify  *
+# *  it under the terms of the GNU Lesser General Public License (LGPL)    *
+# *  as published by the Free Software Foundation; either version 2 of     *
+# *  the License, or (at your option) any later version.                   *
+# *  for detail see the LICENCE text file.                                 *
+# *                                                                        *
+# *  This program is distributed in the hope that it will be useful,       *
+# *  but WITHOUT ANY WARRANTY; without even the implied warranty of        *
+# *  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the         *
+# *  GNU Library General Public License for more details.                  *
+# *                                                                        *
+# *  You should have received a copy of the GNU Library General Public     *
+# *  License along with this program; if not, write to the Free Software   *
+# *  Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  *
+# *  USA                                                                   *
+# *                                                                        *
+# **************************************************************************
+
+'''
+Station index for analytic position queries along solved alignment geometry
+'''
+
+import numpy
+
+from Project.Support.Utils import Constants as C
+from Geometry import Spiral
+
+class StationIndex(object):
+    '''
+    Index of solved alignment elements, sorted by internal station.
+
+    Positions are evaluated analytically on each element, locating the
+    element by binary search over the element start stations.
+    Internal stations are distances along the alignment in system units (mm).
+    '''
+
+    def __init__(self, geometry, length=None):
+        '''
+        geometry - list of solved element dictionaries, each with an 'InternalStation' tuple,
+                   or an ElementStore of the solved elements
+        length - total alignment length.  Positions beyond the last element are
+                 projected along the final tangent up to this length.
+        '''
+
+        #an element store supplies its columns directly
+        if hasattr(geometry, 'data'):
+            self._set_columns(geometry)
+
+        else:
+            self._set_elements(geometry)
+
+        self.total_length = length
+
+        if length is None and self.elements:
+            self.total_length = self.start[-1] + self.length[-1]
+
+    def _set_elements(self, geometry):
+        '''
+        Build the index arrays from a list of element dictionaries
+        '''
+
+        elements = sorted(
+            [_g for _g in geometry if _g and _g.get('InternalStation')],
+            key=lambda _g: _g['InternalStation'][0]
+        )
+
+        self.elements = elements
+
+        self.start = numpy.array([_g['InternalStation'][0] for _g in elements], dtype=float)
+        self.length = numpy.array([_g['Length'] for _g in elements], dtype=float)
+        self.origin = numpy.array([tuple(_g['Start']) for _g in elements], dtype=float)
+        self.bearing = numpy.array([_g['BearingIn'] for _g in elements], dtype=float)
+
+        #signed curvature (direction / radius) at the element start, zero for tangents
+        self.curvature = numpy.array([
+            _g['Direction'] / _g['Radius'] if _g['Type'] == 'arc'
+            else _g['StartCurvature'] if _g['Type'] == 'spiral' else 0.0 for _g in elements
+        ], dtype=float)
+
+        #change in curvature per unit length, non-zero for spirals only
+        self.rate = numpy.array([
+            _g['CurvatureRate'] if _g['Type'] == 'spiral' else 0.0 for _g in elements
+        ], dtype=float)
+
+    def _set_columns(self, store):
+        '''
+        Build the index arrays from the columns of an ElementStore
+        '''
+
+        _data = store.data
+
+        _valid = ~numpy.isnan(_data['InternalStation']).any(axis=1)
+        _order = numpy.flatnonzero(_valid)[
+            numpy.argsort(_data['InternalStation'][_valid, 0], kind='stable')
+        ]
+
+        _data = _data[_order]
+
+        self.elements = [store[_i] for _i in _order]
+
+        self.start = _data['InternalStation'][:, 0].copy()
+        self.length = _data['Length'].copy()
+        self.origin = _data['Start'].copy()
+        self.bearing = _data['BearingIn'].copy()
+
+        _arc = _data['Type'] == 'arc'
+        _spiral = _data['Type'] == 'spiral'
+
+        self.curvature = numpy.zeros(len(_data))
+        self.curvature[_arc] = _data['Direction'][_arc] / _data['Radius'][_arc]
+        self.curvature[_spiral] = _data['StartCurvature'][_spiral]
+
+        self.rate = numpy.zeros(len(_data))
+        self.rate[_spiral] = _data['CurvatureRate'][_spiral]
+
+    def __len__(self):
+        return len(self.elements)
+
+    def find_elements(self, distances):
+        '''
+        Return the indices of the elements containing the internal stations.
+        Stations before the first element return the first element.
+        '''
+
+        _idx = numpy.searchsorted(self.start, distances, side='right') - 1
+
+        return numpy.clip(_idx, 0, len(self.elements) - 1)
+
+    def get_positions(self, distances):
+        '''
+        Return the coordinates and tangent bearings at the internal stations.
+
+        distances - array of internal stations (mm)
+
+        Returns a tuple of numpy arrays (coordinates (n, 3), bearings (n,)).
+        Stations outside the alignment return nan.
+        '''
+
+        distances = numpy.atleast_1d(numpy.asarray(distances, dtype=float))
+
+        coords = numpy.full((len(distances), 3), numpy.nan)
+        bearings = numpy.full(len(distances), numpy.nan)
+
+        if not self.elements:
+            return coords, bearings
+
+        _valid = (distances >= 0.0) & (distances <= self.total_length)
+
+        _s = distances[_valid]
+        _idx = self.find_elements(_s)
+
+        _pts, _out = self.evaluate(_idx, _s - self.start[_idx])
+
+        coords[_valid] = _pts
+        bearings[_valid] = _out
+
+        return coords, bearings
+
+    def evaluate(self, indices, local):
+        '''
+        Return the coordinates and tangent bearings at distances along the elements.
+
+        indices - array of element indices
+        local - array of distances from the start of each element.
+                Distances beyond either end of an element are projected along
+                the tangent at that end.
+        '''
+
+        _on_element = numpy.clip(local, 0.0, self.length[indices])
+        _remainder = local - _on_element
+
+        _k = self.curvature[indices]
+        _bearing = self.bearing[indices]
+
+        #central angle swept along the element (zero on tangents)
+        _delta = _k * _on_element
+        _is_arc = _k != 0.0
+
+        #forward and right offsets from the element start in its local frame
+        _forward = _on_element.copy()
+        _right = numpy.zeros(len(local))
+
+        with numpy.errstate(divide='ignore', invalid='ignore'):
+            _forward[_is_arc] = numpy.sin(numpy.abs(_delta[_is_arc])) / numpy.abs(_k[_is_arc])
+            _right[_is_arc] = (1.0 - numpy.cos(_delta[_is_arc])) / _k[_is_arc]
+
+        #spirals are evaluated with the Fresnel integrals
+        _rate = self.rate[indices]
+        _is_spiral = _rate != 0.0
+
+        if _is_spiral.any():
+
+            _forward[_is_spiral], _right[_is_spiral], _delta[_is_spiral] = Spiral.get_local(
+                _k[_is_spiral], _rate[_is_spiral], _on_element[_is_spiral]
+            )
+
+        _out = _bearing + _delta
+
+        _sin, _cos = numpy.sin(_bearing), numpy.cos(_bearing)
+
+        _pts = self.origin[indices].copy()
+        _pts[:, 0] += _forward * _sin + _right * _cos + _remainder * numpy.sin(_out)
+        _pts[:, 1] += _forward * _cos - _right * _sin + _remainder * numpy.cos(_out)
+
+        return _pts, _out % C.TWO_PI
@@ -0,0 +1,269 @@
+# -*- coding: utf-8 -*-
+# **************************************************************************
+# *                                                                        *
+# *  Copyright (c) 2018 Joel Graff <monograff76@gmail.com>                 *
+# *                                                                        *
+# *  This program is free software; you can redistribute it and/or modify  *
+# *  it under the terms of the GNU Lesser General Public License (LGPL)    *
+# *  as published by the Free Software Foundation; either version 2 of     *
+# *  the License, or (at your option) any later version.                   *
+# *  for detail see the LICENCE text file.                                 *
+# *                                                                        *
+# *  This program is distributed in the hope that it will be useful,       *
+# *  but WITHOUT ANY WARRANTY; without even the implied warranty of        *
+# *  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the         *
+# *  GNU Library General Public License for more details.                  *
+# *                                                                        *
+# *  You should have received a copy of the GNU Library General Public     *
+# *  License along with this program; if not, write to the Free Software   *
+# *  Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  *
+# *  USA                                                                   *
+# *                                                                        *
+# **************************************************************************
+
+'''
+Superelevation schedule for solved horizontal alignments
+'''
+
+import numpy
+
+from Project.Support.LruCache import LruCache
+
+#design speed (km/h) and AASHTO maximum relative gradient (percent)
+RELATIVE_GRADIENTS = (
+    (20.0, 30.0, 40.0, 50.0, 60.0, 70.0, 80.0, 90.0, 100.0, 110.0, 120.0, 130.0),
+    (0.80, 0.75, 0.70, 0.65, 0.60, 0.55, 0.50, 0.47, 0.44, 0.41, 0.38, 0.35)
+)
+
+#design speed (km/h) and AASHTO side friction factors for open highways
+SIDE_FRICTION = (
+    (20.0, 30.0, 40.0, 50.0, 60.0, 70.0, 80.0, 90.0, 100.0, 110.0, 120.0, 130.0),
+    (0.18, 0.17, 0.17, 0.16, 0.15, 0.14, 0.14, 0.13, 0.12, 0.11, 0.09, 0.08)
+)
+
+#schedules shared by callers holding the same alignment geometry
+_SCHEDULES = LruCache(16)
+
+def get_schedule(station_index, design_speed, e_max=0.08, **kwargs):
+    '''
+    Return the superelevation schedule for the station index, building it
+    on first use.  Schedules are keyed by the element geometry and
+    parameters, so changed geometry builds a new schedule.
+    See SuperelevationSchedule for the arguments.
+    '''
+
+    _key = (
+        station_index.start.tobytes(), station_index.length.tobytes(),
+        station_index.curvature.tobytes(), station_index.rate.tobytes(),
+        design_speed, e_max, tuple(sorted(kwargs.items()))
+    )
+
+    result = _SCHEDULES.get(_key)
+
+    if result is None:
+        result = SuperelevationSchedule(station_index, design_speed, e_max, **kwargs)
+        _SCHEDULES.set(_key, result)
+
+    return result
+
+def get_design_rates(radii, design_speed, e_max=0.08, side_friction=None):
+    '''
+    Return the design superelevation rate for each curve radius (mm),
+    distributed parabolically between zero on a tangent and e_max at the
+    minimum radius, approximating AASHTO method 5.
+
+    design_speed - km/h
+    side_friction - maximum side friction factor.  Defaults to the AASHTO
+                    value for the design speed.
+    '''
+
+    if side_friction is None:
+        side_friction = numpy.interp(design_speed, *SIDE_FRICTION)
+
+    #minimum radius (m) for the design speed at e_max
+    _r_min = design_speed**2 / (127.0 * (e_max + side_friction))
+
+    _ratio = numpy.minimum(_r_min / (numpy.asarray(radii, dtype=float) / 1000.0), 1.0)
+
+    return e_max * (2.0 * _ratio - _ratio * _ratio)
+
+class SuperelevationSchedule(object):
+    '''
+    Superelevation transitions for the curves of a solved alignment.
+
+    The section revolves about the alignment.  On each transition, the
+    outside lane rotates at a constant rate from normal crown, through the
+    tangent runout to a level slope, and through the runoff to the full
+    design rate.  The inside lane keeps its normal crown until the outside
+    lane reaches it, then rotates with the outside lane.
+
+    Simple curves place runoff_fraction of the runoff on the tangent.
+    Curves with spiral transitions place the runoff on the spirals.
+    Cross slopes are ratios, positive rising away from the alignment.
+    Lengths are in system units (mm).
+    '''
+
+    def __init__(self, station_index, design_speed, e_max=0.08, normal_crown=0.02,
+                 lane_width=3600.0, lanes=1, runoff_fraction=2.0 / 3.0,
+                 relative_gradient=None, side_friction=None):
+        '''
+        station_index - StationIndex of the solved horizontal alignment
+        design_speed - km/h
+        e_max - maximum superelevation rate
+        normal_crown - normal cross slope of the lanes
+        lane_width, lanes - width and number of the lanes rotated on each side
+        runoff_fraction - portion of the runoff on the tangent for simple curves
+        relative_gradient - maximum relative gradient (percent).
+                            Defaults to the AASHTO value for the design speed.
+        side_friction - maximum side friction factor (see get_design_rates())
+        '''
+
+        self.normal_crown = normal_crown
+
+        if relative_gradient is None:
+            relative_gradient = numpy.interp(design_speed, *RELATIVE_GRADIENTS)
+
+        _index = station_index
+        _arcs = numpy.flatnonzero((_index.curvature != 0.0) & (_index.rate == 0.0))
+
+        _radius = 1.0 / numpy.abs(_index.curvature[_arcs])
+        _rates = get_design_rates(_radius, design_speed, e_max, side_friction)
+
+        #curves flat enough to keep normal crown have no transitions
+        _keep = _rates >= normal_crown
+
+        _arcs, _rates = _arcs[_keep], _rates[_keep]
+
+        _start = _index.start[_arcs]
+        _end = _start + _index.length[_arcs]
+
+        #runoff length (AASHTO), adjusted for the number of lanes rotated
+        _factor = (1.0 + 0.5 * (lanes - 1)) / lanes
+        _runoff = numpy.full(
+            len(_arcs), lane_width * lanes * _factor * 100.0 / relative_gradient
+        ) * _rates
+
+        _runoff_in, _runoff_out = _runoff.copy(), _runoff.copy()
+
+        _full_start = _start + (1.0 - runoff_fraction) * _runoff
+        _full_end = _end - (1.0 - runoff_fraction) * _runoff
+
+        #spirals leading into / out of the arcs carry the runoff
+        for _side, _offset in (('in', -1), ('out', 1)):
+
+            _adj = numpy.clip(_arcs + _offset, 0, len(_index.rate) - 1)
+            _spiral = (_index.rate[_adj] != 0.0) & (_adj != _arcs)
+
+            if _side == 'in':
+                _full_start[_spiral] = _start[_spiral]
+                _runoff_in[_spiral] = _index.length[_adj][_spiral]
+
+            else:
+                _full_end[_spiral] = _end[_spiral]
+                _runoff_out[_spiral] = _index.length[_adj][_spiral]
+
+        #short curves reach their peak at the middle of the arc
+        _mid = (_full_start + _full_end) / 2.0
+        _short = _full_start > _full_end
+
+        _full_start[_short] = _mid[_short]
+        _full_end[_short] = _mid[_short]
+
+        #tangent runout removes the adverse crown at the runoff rate
+        _crown = normal_crown / _rates
+
+        self.stations = numpy.column_stack([
+            _full_start - _runoff_in * (1.0 + _crown),
+            _full_start,
+            _full_end,
+            _full_end + _runoff_out * (1.0 + _crown)
+        ])
+
+        self.rates = _rates
+        self.direction = numpy.sign(_index.curvature[_arcs])
+
+        #rotation of the outside lane from normal crown to the design rate
+        self.amounts = self.direction * (normal_crown + _rates)
+
+        _order = numpy.argsort(self.stations[:, 0], kind='stable')
+
+        self.stations = self.stations[_order]
+        self.rates = self.rates[_order]
+        self.direction = self.direction[_order]
+        self.amounts = self.amounts[_order]
+
+    def __len__(self):
+        return len(self.rates)
+
+    def _get_amount(self, indices, stations):
+        '''
+        Return the rotation amount of the curves at the stations,
+        zero outside of their transitions
+        '''
+
+        _a, _b, _c, _d = self.stations[indices].T
+
+        with numpy.errstate(divide='ignore', invalid='ignore'):
+            _in = numpy.where(_b > _a, (stations - _a) / (_b - _a), 1.0)
+            _out = numpy.where(_d > _c, (_d - stations) / (_d - _c), 1.0)
+
+        _fraction = numpy.clip(numpy.minimum(_in, _out), 0.0, 1.0)
+        _fraction[(stations < _a) | (stations > _d)] = 0.0
+
+        return self.amounts[indices] * _fraction
+
+    def get_amounts(self, stations):
+        '''
+        Return the signed rotation of the outside lane from normal crown at
+        each internal station, positive for curves to the right.
+
+        Transitions of neighbouring curves may overlap: reverse curves rotate
+        through level, compound curves keep the larger rotation.
+        '''
+
+        stations = numpy.atleast_1d(numpy.asarray(stations, dtype=float))
+
+        if not len(self.rates):
+            return numpy.zeros(len(stations))
+
+        _idx = numpy.searchsorted(self.stations[:, 0], stations, side='right') - 1
+
+        _current = self._get_amount(numpy.maximum(_idx, 0), stations)
+        _current[_idx < 0] = 0.0
+
+        _previous = self._get_amount(numpy.maximum(_idx - 1, 0), stations)
+        _previous[_idx < 1] = 0.0
+
+        return numpy.maximum(numpy.maximum(_current, _previous), 0.0) \
+            + numpy.minimum(numpy.minimum(_current, _previous), 0.0)
+
+    def get_cross_slopes(self, stations):
+        '''
+        Return the left and right cross slopes at each internal station
+        as a tuple of numpy arrays
+        '''
+
+        _amounts = self.get_amounts(stations)
+        _abs = numpy.abs(_amounts)
+
+        _outside = -self.normal_crown + _abs
+        _inside = numpy.minimum(-self.normal_crown, self.normal_crown - _abs)
+
+        #the outside of a curve to the right is on the left
+        left = numpy.where(_amounts > 0.0, _outside, _inside)
+        right = numpy.where(_amounts > 0.0, _inside, _outside)
+
+        return left, right
+
+    def get_rotations(self, stations):
+        '''
+        Return the angle (radians) rotating a rigid section about the
+        alignment, so the outside lane meets its scheduled cross slope.
+        Angles are positive counter-clockwise looking ahead (left side up).
+        '''
+
+        _amounts = self.get_amounts(stations)
+
+        return numpy.sign(_amounts) * (
+            numpy.arctan(numpy.abs(_amounts) - self.normal_crown) + numpy.arctan(self.normal_crown)
+        )
@@ -185,3 +185,14 @@ def vector_from_angle(angle):
         return None
 
     return App.Vector(math.sin(_angle), math.cos(_angle), 0.0)
+
+def rotate_bearing(vector, angle):
+    '''
+    Rotate a vector clockwise by the angle in radians,
+    consistent with bearings measured clockwise from +y 'north'
+    '''
+
+    _cos = math.cos(angle)
+    _sin = math.sin(angle)
+
+    return App.Vector(vector.x * _cos + vector.y * _sin, vector.y * _cos - vector.x * _sin, vector.z)
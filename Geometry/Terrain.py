@@ -0,0 +1,113 @@
+# -*- coding: utf-8 -*-
+# **************************************************************************
+# *                                                                        *
+# *  Copyright (c) 2018 Joel Graff <monograff76@gmail.com>                 *
+# *                                                                        *
+# *  This program is free software; you can redistribute it and/or modify  *
+# *  it under the terms of the GNU Lesser General Public License (LGPL)    *
+# *  as published by the Free Software Foundation; either version 2 of     *
+# *  the License, or (at your option) any later version.                   *
+# *  for detail see the LICENCE text file.                                 *
+# *                                                                        *
+# *  This program is distributed in the hope that it will be useful,       *
+# *  but WITHOUT ANY WARRANTY; without even the implied warranty of        *
+# *  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the         *
+# *  GNU Library General Public License for more details.                  *
+# *                                                                        *
+# *  You should have received a copy of the GNU Library General Public     *
+# *  License along with this program; if not, write to the Free Software   *
+# *  Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  *
+# *  USA                                                                   *
+# *                                                                        *
+# **************************************************************************
+
+'''
+Triangulated (TIN) terrain surface held as vertex and triangle index arrays
+'''
+
+import numpy
+
+from Geometry.TerrainIndex import TerrainIndex
+
+class Terrain(object):
+    '''
+    TIN surface as contiguous numpy arrays.
+
+    Vertices are an (n, 3) float array of coordinates in system units (mm),
+    triangles an (m, 3) integer array of vertex indices.
+    '''
+
+    def __init__(self, vertices, triangles, name=''):
+        '''
+        vertices - (n, 3) array of vertex coordinates
+        triangles - (m, 3) array of indices into vertices
+        name - surface name
+        '''
+
+        self.name = name
+        self.vertices = numpy.ascontiguousarray(vertices, dtype=float).reshape(-1, 3)
+        self.triangles = numpy.ascontiguousarray(triangles, dtype=numpy.int32).reshape(-1, 3)
+
+        self.index = None
+
+    def __len__(self):
+        return len(self.triangles)
+
+    def get_bounds(self):
+        '''
+        Return the plan bounds of the surface as (xmin, ymin, xmax, ymax)
+        '''
+
+        if not len(self.vertices):
+            return None
+
+        return tuple(numpy.concatenate([
+            self.vertices[:, 0:2].min(axis=0), self.vertices[:, 0:2].max(axis=0)
+        ]))
+
+    def get_elevation_range(self):
+        '''
+        Return the lowest and highest vertex elevations
+        '''
+
+        if not len(self.vertices):
+            return None
+
+        return float(self.vertices[:, 2].min()), float(self.vertices[:, 2].max())
+
+    def get_triangle_points(self, indices=None):
+        '''
+        Return the vertex coordinates of the triangles as an (m, 3, 3) array
+
+        indices - triangle indices.  All triangles are returned if None.
+        '''
+
+        _triangles = self.triangles if indices is None else self.triangles[indices]
+
+        return self.vertices[_triangles]
+
+    def get_index(self):
+        '''
+        Return the spatial index of the triangles, building it on first use
+        '''
+
+        if self.index is None:
+            self.index = TerrainIndex(self)
+
+        return self.index
+
+    def elevation_at(self, points):
+        '''
+        Return the surface elevations at an array of (x, y) points,
+        nan where a point is off the surface
+        '''
+
+        return self.get_index().elevation_at(points)
+
+    def profile_along(self, alignment, stations):
+        '''
+        Return the surface elevations at the stations along a horizontal alignment,
+        nan where a station is off the surface
+        '''
+
+        return self.get_index().profile_along(alignment, stations)
@@ -0,0 +1,290 @@
+# -*- coding: utf-8 -*-
+# **************************************************************************
+# *                                                                        *
+# *  Copyright (c) 2018 Joel Graff <monograff76@gmail.com>                 *
+# *                                                                        *
+# *  This program is free software; you can redistribute it and/or modify  *
+# *  it under the terms of the GNU Lesser General Public License (LGPL)    *
+# *  as published by the Free Software Foundation; either version 2 of     *
+# *  the License, or (at your option) any later version.                   *
+# *  for detail see the LICENCE text file.                                 *
+# *                                                                        *
+# *  This program is distributed in the hope that it will be useful,       *
+# *  but WITHOUT ANY WARRANTY; without even the implied warranty of        *
+# *  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the         *
+# *  GNU Library General Public License for more details.                  *
+# *                                                                        *
+# *  You should have received a copy of the GNU Library General Public     *
+# *  License along with this program; if not, write to the Free Software   *
+# *  Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  *
+# *  USA                                                                   *
+# *                                                                        *
+# **************************************************************************
+
+'''
+Spatial index for sampling elevations on TIN terrain surfaces
+'''
+
+import numpy
+
+class TerrainIndex(object):
+    '''
+    Uniform grid over the triangles of a Terrain.
+
+    Each occupied cell lists the triangles overlapping it.  Points are
+    located by binary search over the sorted cell keys and tested against
+    the cell's triangles with precomputed barycentric transforms.
+    '''
+
+    #maximum number of point / triangle pairs evaluated at once
+    CHUNK_SIZE = 1000000
+
+    #barycentric tolerance for points on triangle edges
+    EPSILON = 1e-9
+
+    def __init__(self, terrain, cell_size=None):
+        '''
+        terrain - Terrain surface to index
+        cell_size - grid cell size.  Defaults to the median triangle extent,
+                    as the root of the median bounding box area.
+        '''
+
+        self.terrain = terrain
+
+        _pts = terrain.get_triangle_points()
+
+        #barycentric transforms of the triangles, mapping (x, y) relative
+        #to the first vertex to the weights of the second and third vertices
+        self.base = _pts[:, 0, 0:2]
+        self.heights = _pts[:, :, 2]
+
+        _u = _pts[:, 1, 0:2] - self.base
+        _v = _pts[:, 2, 0:2] - self.base
+
+        _det = _u[:, 0] * _v[:, 1] - _u[:, 1] * _v[:, 0]
+
+        #degenerate triangles are excluded from the grid
+        _valid = numpy.abs(_det) > 0.0
+        _det[~_valid] = 1.0
+
+        self.transform = numpy.stack([
+            numpy.column_stack([_v[:, 1], -_v[:, 0]]),
+            numpy.column_stack([-_u[:, 1], _u[:, 0]])
+        ], axis=1) / _det[:, None, None]
+
+        _lo = numpy.minimum(numpy.minimum(_pts[:, 0, 0:2], _pts[:, 1, 0:2]), _pts[:, 2, 0:2])
+        _hi = numpy.maximum(numpy.maximum(_pts[:, 0, 0:2], _pts[:, 1, 0:2]), _pts[:, 2, 0:2])
+
+        if cell_size is None:
+            cell_size = float(numpy.sqrt(numpy.median((_hi - _lo).prod(axis=1)))) \
+                if len(_pts) else 1.0
+
+        self.cell_size = max(cell_size, 1e-6)
+        self.origin = _lo.min(axis=0) if len(_pts) else numpy.zeros(2)
+
+        _lo = numpy.floor((_lo - self.origin) / self.cell_size).astype(numpy.int64)
+        _hi = numpy.floor((_hi - self.origin) / self.cell_size).astype(numpy.int64)
+
+        self.columns = int(_hi[:, 0].max()) + 1 if len(_pts) else 1
+
+        _cells, _triangles = self._rasterize(_pts, numpy.flatnonzero(_valid), _lo, _hi)
+
+        _order = numpy.argsort(_cells, kind='stable')
+
+        #occupied cells, with the offsets of their triangles in the triangle list
+        self.cells, self.offsets = numpy.unique(_cells[_order], return_index=True)
+        self.offsets = numpy.append(self.offsets, len(_order))
+        self.triangles = _triangles[_order]
+
+    def _get_breaks(self, ends):
+        '''
+        Return the indices splitting the cumulative counts into chunks of
+        at most CHUNK_SIZE, apart from single entries exceeding it
+        '''
+
+        return numpy.unique(
+            numpy.searchsorted(ends, numpy.arange(self.CHUNK_SIZE, ends[-1], self.CHUNK_SIZE))
+        )
+
+    def _rasterize(self, points, triangles, lo, hi):
+        '''
+        Return the (cell, triangle) pairs of the grid cells overlapping each triangle.
+        Cells of the triangle bounding boxes are tested against the triangle edges,
+        so long, narrow triangles list only the cells they cross.
+        '''
+
+        if not len(triangles):
+            return numpy.zeros(0, dtype=numpy.int64), numpy.zeros(0, dtype=numpy.int64)
+
+        _axes = self._get_axes(points[triangles, :, 0:2])
+
+        _span = hi[triangles] - lo[triangles] + 1
+        _counts = _span[:, 0] * _span[:, 1]
+
+        _cells, _result = [], []
+
+        #bound the number of bounding box cells tested at once
+        _ends = numpy.cumsum(_counts)
+        _starts = _ends - _counts
+        _breaks = self._get_breaks(_ends)
+
+        for _first, _last in zip(numpy.r_[0, _breaks], numpy.r_[_breaks, len(triangles)]):
+
+            _pos = numpy.repeat(numpy.arange(_first, _last), _counts[_first:_last])
+
+            if not len(_pos):
+                continue
+
+            _local = numpy.arange(len(_pos)) + _starts[_first] - _starts[_pos]
+
+            _cx = lo[triangles[_pos], 0] + _local % _span[_pos, 0]
+            _cy = lo[triangles[_pos], 1] + _local // _span[_pos, 0]
+
+            _keep = self._overlaps(_axes, _pos, _cx, _cy)
+
+            _cells.append((_cx + _cy * self.columns)[_keep])
+            _result.append(triangles[_pos[_keep]])
+
+        return numpy.concatenate(_cells), numpy.concatenate(_result)
+
+    def _get_axes(self, triangles):
+        '''
+        Return the separating axes of the triangle edges as
+        (normal x, normal y, projection minimum, projection maximum)
+        arrays for each edge, with the cell radius on the axis subtracted
+        from the minimum and added to the maximum
+        '''
+
+        _half = 0.5 * self.cell_size
+
+        result = []
+
+        for _i in range(3):
+
+            _edge = triangles[:, (_i + 1) % 3] - triangles[:, _i]
+            _normal = numpy.column_stack([-_edge[:, 1], _edge[:, 0]])
+
+            #the projections of the edge vertices coincide
+            _edge_proj = triangles[:, _i, 0] * _normal[:, 0] + triangles[:, _i, 1] * _normal[:, 1]
+            _apex_proj = triangles[:, (_i + 2) % 3, 0] * _normal[:, 0] \
+                + triangles[:, (_i + 2) % 3, 1] * _normal[:, 1]
+
+            _radius = _half * (numpy.abs(_normal[:, 0]) + numpy.abs(_normal[:, 1]))
+
+            result.append((_normal[:, 0], _normal[:, 1],
+                           numpy.minimum(_edge_proj, _apex_proj) - _radius,
+                           numpy.maximum(_edge_proj, _apex_proj) + _radius))
+
+        return result
+
+    def _overlaps(self, axes, triangles, columns, rows):
+        '''
+        Return True for each (triangle, cell) pair where the triangle crosses the cell,
+        testing the cell center against the separating axes of the triangle edges
+        '''
+
+        _x = self.origin[0] + (columns + 0.5) * self.cell_size
+        _y = self.origin[1] + (rows + 0.5) * self.cell_size
+
+        result = numpy.ones(len(triangles), dtype=bool)
+
+        for _nx, _ny, _min, _max in axes:
+
+            _proj = _x * _nx[triangles] + _y * _ny[triangles]
+            result &= (_proj >= _min[triangles]) & (_proj <= _max[triangles])
+
+        return result
+
+    def _get_candidates(self, points):
+        '''
+        Return the number of triangles in each point's cell and the first
+        entry of the cell in the triangle list
+        '''
+
+        _finite = numpy.isfinite(points).all(axis=1)
+
+        _cell = numpy.floor(
+            (numpy.where(_finite[:, None], points, self.origin) - self.origin) / self.cell_size
+        ).astype(numpy.int64)
+
+        _inside = _finite & (_cell[:, 0] >= 0) & (_cell[:, 0] < self.columns) & (_cell[:, 1] >= 0)
+        _keys = numpy.where(_inside, _cell[:, 0] + _cell[:, 1] * self.columns, -1)
+
+        _pos = numpy.minimum(numpy.searchsorted(self.cells, _keys), len(self.cells) - 1)
+        _found = self.cells[_pos] == _keys
+
+        _first = self.offsets[_pos]
+
+        return numpy.where(_found, self.offsets[_pos + 1] - _first, 0), _first
+
+    def _sample(self, points, counts, first, result):
+        '''
+        Interpolate the elevations of the points on the triangles containing them,
+        updating the result array in place
+        '''
+
+        _pairs = numpy.repeat(numpy.arange(len(points)), counts)
+        _local = numpy.arange(counts.sum()) - numpy.repeat(numpy.cumsum(counts) - counts, counts)
+
+        _tri = self.triangles[numpy.repeat(first, counts) + _local]
+
+        _delta = points[_pairs] - self.base[_tri]
+        _transform = self.transform[_tri]
+
+        _u = _transform[:, 0, 0] * _delta[:, 0] + _transform[:, 0, 1] * _delta[:, 1]
+        _v = _transform[:, 1, 0] * _delta[:, 0] + _transform[:, 1, 1] * _delta[:, 1]
+
+        _inside = (_u >= -self.EPSILON) & (_v >= -self.EPSILON) & (_u + _v <= 1.0 + self.EPSILON)
+
+        #the first triangle containing each point
+        _pt, _idx = numpy.unique(_pairs[_inside], return_index=True)
+        _best = numpy.flatnonzero(_inside)[_idx]
+
+        _u, _v = _u[_best], _v[_best]
+        _z = self.heights[_tri[_best]]
+
+        result[_pt] = (1.0 - _u - _v) * _z[:, 0] + _u * _z[:, 1] + _v * _z[:, 2]
+
+    def elevation_at(self, points):
+        '''
+        Return the surface elevations at the points
+
+        points - array of (x, y) or (x, y, z) coordinates in system units
+
+        Returns an array of elevations, nan where a point is off the surface.
+        '''
+
+        points = numpy.atleast_2d(numpy.asarray(points, dtype=float))[:, 0:2]
+        result = numpy.full(len(points), numpy.nan)
+
+        if not len(self.cells) or not len(points):
+            return result
+
+        _counts, _first = self._get_candidates(points)
+
+        #split the points to bound the number of pairs evaluated at once
+        _ends = numpy.cumsum(_counts)
+        _breaks = self._get_breaks(_ends)
+
+        for _lo, _hi in zip(numpy.r_[0, _breaks], numpy.r_[_breaks, len(points)]):
+
+            _result = result[_lo:_hi]
+            self._sample(points[_lo:_hi], _counts[_lo:_hi], _first[_lo:_hi], _result)
+
+        return result
+
+    def profile_along(self, alignment, stations):
+        '''
+        Return the surface elevations along an alignment
+
+        alignment - horizontal alignment providing get_station_coordinates(),
+                    e.g. an AlignmentModel or HorizontalAlignment proxy
+        stations - array of stations in document units
+
+        Returns an array of elevations in system units, nan where a station
+        is off the surface or the alignment.
+        '''
+
+        _coords, _ = alignment.get_station_coordinates(numpy.atleast_1d(stations))
+
+        return self.elevation_at(_coords)
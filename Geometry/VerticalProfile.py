@@ -0,0 +1,149 @@
+# -*- coding: utf-8 -*-
+# **************************************************************************
+# *                                                                        *
+# *  Copyright (c) 2018 Joel Graff <monograff76@gmail.com>                 *
+# *                                                                        *
+# *  This program is free software; you can redistribute it and/or modify  *
+# *  it under the terms of the GNU Lesser General Public License (LGPL)    *
+# *  as published by the Free Software Foundation; either version 2 of     *
+# *  the License, or (at your option) any later version.                   *
+# *  for detail see the LICENCE text file.                                 *
+# *                                                                        *
+# *  This program is distributed in the hope that it will be useful,       *
+# *  but WITHOUT ANY WARRANTY; without even the implied warranty of        *
+# *  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the         *
+# *  GNU Library General Public License for more details.                  *
+# *                                                                        *
+# *  You should have received a copy of the GNU Library General Public     *
+# *  License along with this program; if not, write to the Free Software   *
+# *  Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  *
+# *  USA                                                                   *
+# *                                                                        *
+# **************************************************************************
+
+'''
+Vertical profile of tangents and equal-tangent parabolic curves,
+evaluated in closed form for arrays of stations
+'''
+
+import numpy
+
+class VerticalProfile(object):
+    '''
+    Sorted vertical curve data for a profile.
+
+    Each curve is defined by its PI station and elevation, incoming and
+    outgoing grades (percent), and length.  Tangents join successive curves,
+    and extend beyond the first and last curves.  Breakpoints are curves of zero length.
+    Stations and elevations are in consistent length units.
+    '''
+
+    def __init__(self, stations, elevations, grades_in, grades_out, lengths):
+        '''
+        stations, elevations - PI stations and elevations
+        grades_in, grades_out - tangent grades (percent) on either side of each PI
+        lengths - curve lengths
+        '''
+
+        _order = numpy.argsort(numpy.asarray(stations, dtype=float), kind='stable')
+
+        _pi = numpy.asarray(stations, dtype=float)[_order]
+        _elev = numpy.asarray(elevations, dtype=float)[_order]
+
+        self.grade_in = numpy.asarray(grades_in, dtype=float)[_order] / 100.0
+        self.grade_out = numpy.asarray(grades_out, dtype=float)[_order] / 100.0
+        self.length = numpy.asarray(lengths, dtype=float)[_order]
+
+        #VPC / VPT stations and the VPC elevation
+        self.pc = _pi - self.length / 2.0
+        self.pt = _pi + self.length / 2.0
+        self.elevation = _elev - self.grade_in * self.length / 2.0
+
+        #rate of change of grade along each curve (zero for breakpoints)
+        with numpy.errstate(divide='ignore', invalid='ignore'):
+            self.rate = numpy.where(
+                self.length > 0.0, (self.grade_out - self.grade_in) / self.length, 0.0
+            )
+
+        _overlaps = numpy.flatnonzero(self.pt[:-1] > self.pc[1:])
+
+        if len(_overlaps):
+            print('Overlapping vertical curves at PI stations %s' % _pi[_overlaps + 1])
+
+    def __len__(self):
+        return len(self.pc)
+
+    def evaluate(self, stations, locations=None):
+        '''
+        Return the elevation, grade (percent) and K-value (length per percent
+        change of grade) at each station, as a tuple of numpy arrays.
+        K-values are infinite on tangents.
+
+        locations - optional stations used to select the curve for each station,
+                    e.g. to evaluate a station at a VPC on the preceding tangent
+        '''
+
+        stations = numpy.asarray(stations, dtype=float)
+
+        if locations is None:
+            locations = stations
+
+        if not len(self.pc):
+            _nan = numpy.full(stations.shape, numpy.nan)
+            return _nan, _nan.copy(), _nan.copy()
+
+        #the curve at or preceding each station, or the first curve
+        _idx = numpy.clip(numpy.searchsorted(self.pc, locations, side='right') - 1, 0, None)
+
+        _x = stations - self.pc[_idx]
+        _length = self.length[_idx]
+        _g1 = self.grade_in[_idx]
+        _rate = self.rate[_idx]
+
+        #distance along the curve and beyond it, on the outgoing tangent.
+        #Stations before the first curve extend its incoming tangent.
+        _on_curve = numpy.clip(_x, 0.0, _length)
+        _before = numpy.minimum(_x, 0.0)
+        _after = numpy.maximum(_x - _length, 0.0)
+
+        _g2 = self.grade_out[_idx]
+
+        elevation = self.elevation[_idx] + _g1 * (_on_curve + _before) \
+            + 0.5 * _rate * _on_curve * _on_curve + _g2 * _after
+
+        grade = numpy.where(_x > _length, _g2, _g1 + _rate * _on_curve)
+
+        with numpy.errstate(divide='ignore'):
+            k_value = numpy.where(
+                (_x >= 0.0) & (_x <= _length) & (_rate != 0.0), 0.01 / numpy.abs(_rate), numpy.inf
+            )
+
+        return elevation, grade * 100.0, k_value
+
+    def get_elevations(self, stations):
+        '''
+        Return the elevations at the stations
+        '''
+
+        return self.evaluate(stations)[0]
+
+def from_vertical_curves(curves, station_fn=None):
+    '''
+    Build a profile from VerticalCurve document objects.
+
+    station_fn - optional function converting the PI station values to
+                 profile stations (e.g. to distances along the alignment)
+    '''
+
+    _stations = [_c.PI_Station.Value for _c in curves]
+
+    if station_fn:
+        _stations = [station_fn(_s) for _s in _stations]
+
+    return VerticalProfile(
+        _stations,
+        [_c.PI_Elevation.Value for _c in curves],
+        [_c.Grade_In for _c in curves],
+        [_c.Grade_Out for _c in curves],
+        [_c.Length.Value for _c in curves]
+    )
@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+# **************************************************************************
+# *                                                                        *
+# *  Copyright (c) 2018 Joel Graff <monograff76@gmail.com>                 *
+# *                                                                        *
+# *  This program is free software; you can redistribute it and/or modify  *
+# *  it under the terms of the GNU Lesser General Public License (LGPL)    *
+# *  as published by the Free Software Foundation; either version 2 of     *
+# *  the License, or (at your option) any later version.                   *
+# *  for detail see the LICENCE text file.                                 *
+# *                                                                        *
+# *  This program is distributed in the hope that it will be useful,       *
+# *  but WITHOUT ANY WARRANTY; without even the implied warranty of        *
+# *  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the         *
+# *  GNU Library General Public License for more details.                  *
+# *                                                                        *
+# *  You should have received a copy of the GNU Library General Public     *
+# *  License along with this program; if not, write to the Free Software   *
+# *  Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  *
+# *  USA                                                                   *
+# *                                                                        *
+# **************************************************************************
+
+'''
+Least-recently-used cache class definition
+'''
+
+__title__ = "LruCache.py"
+__author__ = "Joel Graff"
+__url__ = "https://www.freecadweb.org"
+
+from collections import OrderedDict
+
+class LruCache(object):
+    '''
+    Dictionary-style cache with a bounded number of entries.
+    The least-recently-used entry is evicted when the bound is exceeded.
+    '''
+
+    def __init__(self, max_size=1024):
+
+        self.max_size = max_size
+        self.data = OrderedDict()
+
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self.data)
+
+    def __contains__(self, key):
+        return key in self.data
+
+    def get(self, key, default=None):
+        '''
+        Return the value for the key, marking it as most recently used
+        '''
+
+        if key not in self.data:
+            self.misses += 1
+            return default
+
+        self.hits += 1
+        self.data.move_to_end(key)
+
+        return self.data[key]
+
+    def set(self, key, value):
+        '''
+        Store the value for the key, evicting the least recently used entries
+        '''
+
+        self.data[key] = value
+        self.data.move_to_end(key)
+
+        while len(self.data) > self.max_size:
+            self.data.popitem(last=False)
+
+    def clear(self):
+        '''
+        Remove all entries and reset the statistics
+        '''
+
+        self.data.clear()
+
+        self.hits = 0
+        self.misses = 0
@@ -0,0 +1,168 @@
+# -*- coding: utf-8 -*-
+# **************************************************************************
+# *                                                                        *
+# *  Copyright (c) 2018 Joel Graff <monograff76@gmail.com>                 *
+# *                                                                        *
+# *  This program is free software; you can redistribute it and/or modify  *
+# *  it under the terms of the GNU Lesser General Public License (LGPL)    *
+# *  as published by the Free Software Foundation; either version 2 of     *
+# *  the License, or (at your option) any later version.                   *
+# *  for detail see the LICENCE text file.                                 *
+# *                                                                        *
+# *  This program is distributed in the hope that it will be useful,       *
+# *  but WITHOUT ANY WARRANTY; without even the implied warranty of        *
+# *  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the         *
+# *  GNU Library General Public License for more details.                  *
+# *                                                                        *
+# *  You should have received a copy of the GNU Library General Public     *
+# *  License along with this program; if not, write to the Free Software   *
+# *  Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  *
+# *  USA                                                                   *
+# *                                                                        *
+# **************************************************************************
+
+'''
+Compiled station equation table for converting between stations and
+internal stations (distances along an alignment)
+'''
+
+__title__ = "StationTable.py"
+__author__ = "Joel Graff"
+__url__ = "https://www.freecadweb.org"
+
+import numpy
+
+from Project.Support.LruCache import LruCache
+
+#compiled tables shared by callers which hold only the raw equations
+_TABLES = LruCache(64)
+
+def get_table(equations, start=None, end=None, scale=1.0):
+    '''
+    Return the compiled table for the equations, building it on first use.
+    Tables are keyed by their equation values, so changed equations
+    compile a new table.
+    '''
+
+    _key = (tuple((float(_e[0]), float(_e[1])) for _e in equations), start, end, scale)
+
+    result = _TABLES.get(_key)
+
+    if result is None:
+        result = StationTable(equations, start, end, scale)
+        _TABLES.set(_key, result)
+
+    return result
+
+class StationTable(object):
+    '''
+    Sorted table of the station ranges defined by a set of station equations.
+
+    Each range runs from an equation's ahead station to the next equation's
+    back station.  Conversions in either direction locate the range by
+    binary search and accept scalars or arrays.
+    '''
+
+    def __init__(self, equations, start=None, end=None, scale=1.0):
+        '''
+        equations - list of (back, ahead) station pairs, in alignment order.
+                    Any additional values (e.g. App.Vector direction) are ignored.
+        start - starting station.  If None, the first equation's ahead station
+                is the starting station and its back station is ignored.
+        end - ending station, bounding the last range.  Unbounded if None.
+        scale - internal station units per station unit
+        '''
+
+        _eqs = [(float(_e[0]), float(_e[1])) for _e in equations]
+
+        if start is None:
+
+            start = _eqs[0][1] if _eqs else 0.0
+            _eqs = _eqs[1:]
+
+        self.scale = scale
+
+        #ahead / back stations bounding each range
+        self.ahead = numpy.array([start] + [_e[1] for _e in _eqs], dtype=float)
+        self.back = numpy.array(
+            [_e[0] for _e in _eqs] + [numpy.inf if end is None else end], dtype=float
+        )
+
+        #distance from the start of the alignment to the start of each range
+        _lengths = self.back[:-1] - self.ahead[:-1]
+        self.distance = numpy.concatenate([[0.0], numpy.cumsum(_lengths)])
+
+        #ranges sorted by ahead station for station lookups
+        self.order = numpy.argsort(self.ahead, kind='stable')
+        self.sorted_ahead = self.ahead[self.order]
+
+        #backward equations repeat stations, so more than one range may hold a station
+        self.overlapping = bool(
+            numpy.any(self.sorted_ahead[1:] < numpy.maximum.accumulate(self.back[self.order])[:-1])
+        )
+
+    def __len__(self):
+        return len(self.ahead)
+
+    def find_ranges(self, stations):
+        '''
+        Return the indices of the ranges containing the stations.
+        Stations repeated by a backward equation resolve to the later range.
+        Stations outside every range resolve to the range with the nearest
+        preceding ahead station, or the first range if before them all.
+        '''
+
+        stations = numpy.asarray(stations, dtype=float)
+
+        _idx = numpy.searchsorted(self.sorted_ahead, stations, side='right') - 1
+        result = numpy.where(_idx < 0, 0, self.order[numpy.clip(_idx, 0, None)])
+
+        if not self.overlapping:
+            return result
+
+        #test the ranges from last to first, keeping the latest holding each station
+        result = numpy.array(result)
+        _found = numpy.zeros(result.shape, dtype=bool)
+
+        for _i in range(len(self.ahead) - 1, -1, -1):
+
+            _in = ~_found & (self.ahead[_i] <= stations) & (stations <= self.back[_i])
+
+            result[_in] = _i
+            _found |= _in
+
+        return result
+
+    def contains(self, stations):
+        '''
+        Return True where the stations fall within a station range
+        '''
+
+        stations = numpy.asarray(stations, dtype=float)
+        _idx = self.find_ranges(stations)
+
+        return (self.ahead[_idx] <= stations) & (stations <= self.back[_idx])
+
+    def to_distance(self, stations):
+        '''
+        Convert stations to internal stations
+        '''
+
+        stations = numpy.asarray(stations, dtype=float)
+        _idx = self.find_ranges(stations)
+
+        result = (self.distance[_idx] + stations - self.ahead[_idx]) * self.scale
+
+        return result if result.ndim else float(result)
+
+    def to_station(self, distances):
+        '''
+        Convert internal stations to stations
+        '''
+
+        _pos = numpy.asarray(distances, dtype=float) / self.scale
+        _idx = numpy.clip(numpy.searchsorted(self.distance, _pos, side='right') - 1, 0, None)
+
+        result = self.ahead[_idx] + _pos - self.distance[_idx]
+
+        return result if result.ndim else float(result)
@@ -32,38 +32,92 @@ __url__ = "https://www.freecadweb.org"
 import FreeCAD as App
 from Project.Support.Const import Const
 
+class UnitsContext(object):
+    '''
+    Document units resolved from the unit schema preference
+    '''
+
+    def __init__(self, schema):
+
+        self.schema = schema
+
+        #need to add support for international spellings for metric units
+        self.names = ['m', 'meter', 'meters']
+        self.scale_factor = 1000.0
+
+        if schema == 7:
+            self.names = ['ft', 'foot', 'feet']
+            self.scale_factor = 304.80
+
+        self.is_metric = 'm' in self.names
+
+class _UnitsObserver(object):
+    '''
+    Parameter observer which invalidates the units context
+    when the unit schema preference changes
+    '''
+
+    def OnChange(self, grp, param):
+
+        if param == 'UserSchema':
+            invalidate_context()
+
+_UNITS_PARAM = 'User parameter:BaseApp/Preferences/Units'
+
+#resolved units context and the preference observer which invalidates it
+_CONTEXT = None
+_OBSERVER = None
+
+def get_context():
+    '''
+    Return the units context, resolving it from the preferences on first use
+    '''
+
+    global _CONTEXT, _OBSERVER
+
+    if _CONTEXT is None:
+
+        _grp = App.ParamGet(_UNITS_PARAM)
+
+        if _OBSERVER is None and hasattr(_grp, 'Attach'):
+            _OBSERVER = _UnitsObserver()
+            _grp.Attach(_OBSERVER)
+
+        _CONTEXT = UnitsContext(_grp.GetInt('UserSchema'))
+
+    return _CONTEXT
+
+def invalidate_context():
+    '''
+    Discard the units context, forcing the preferences to be read on next use
+    '''
+
+    global _CONTEXT
+
+    _CONTEXT = None
+
 def get_doc_units():
     '''
     Return the units (feet / meters) of active document
 
     format - format of string (0 = abbreviated, 1 = singular, 2 = plural)
     '''
-    #need to add support for international spellings for metric units
-
-    english = ['ft', 'foot', 'feet']
-    metric = ['m', 'meter', 'meters']
-
-    if App.ParamGet('User parameter:BaseApp/Preferences/Units').GetInt('UserSchema') == 7:
-        return english
 
-    return metric
+    return list(get_context().names)
 
 def is_metric_doc():
     '''
     Returns true if the passed document is using metric units
     '''
 
-    return 'm' in get_doc_units()
+    return get_context().is_metric
 
 def scale_factor():
     '''
     Return the scale factor to convert the document units to mm
     '''
 
-    if get_doc_units()[0] == 'ft':
-        return 304.80
-    
-    return 1000.0
+    return get_context().scale_factor
 
 class UnitNames(Const):
     '''
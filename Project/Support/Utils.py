@@ -34,6 +34,7 @@ import math
 import FreeCAD as App
 
 from Project.Support.Const import Const
+from Project.Support import StationTable
 
     #Regular expressions for detecting stations
     #rex_station = re.compile(r'[0-9]+\+[0-9]{2}\.[0-9]{2,}')
@@ -169,31 +170,8 @@ def station_to_distance(station, equations):
         print('Station not floating point value')
         return 0
 
-    start_sta = -1
-    end_sta = -1
-    distance = 0.0
-
-    for eqn in equations:
-
-        #the equation back is the end of the current range
-        end_sta = eqn[0]
-
-        #less than zero - initial station equation
-        if not (start_sta < 0.0 or end_sta < 0.0):
-
-            #if the station falls between two values,
-            #calculate the final segment length and break out
-            if _s <= end_sta and _s >= start_sta:
-                distance += _s - start_sta
-                break
-
-            #accumulate distance across this station range
-            distance += end_sta - start_sta
-
-        #forward is the starting station for the next range
-        start = eqn[1]
-
-    return distance
+    #the first equation's forward station is the starting station
+    return StationTable.get_table(equations).to_distance(_s)
 
 def scrub_stationing(station):
     '''
@@ -31,7 +31,7 @@ from PySide import QtGui, QtCore
 import FreeCAD as App
 import FreeCADGui as Gui
 
-from Corridor.Alignment import AlignmentGroup, HorizontalAlignment
+from Corridor.Alignment import AlignmentGroup, HorizontalAlignment, AlignmentModel
 
 from Project.Tasks.alignment import ImportXmlSubtask
 from Project.Tasks.alignment import ImportCsvSubtask
@@ -49,6 +49,9 @@ class ImportAlignmentTask:
         self.form = None
         self.subtask = None
 
+        #solve alignments across a process pool before creating the document objects
+        self.parallel = True
+
     def accept(self):
         '''
         Accept the task parameters
@@ -68,9 +71,13 @@ class ImportAlignmentTask:
 
         AlignmentGroup.create()
 
+        models = AlignmentModel.build_all(
+            data['Alignments'], workers=None if self.parallel else 1
+        )
+
         for key, value in data['Alignments'].items():
 
-            result = HorizontalAlignment.create(value, value['meta']['ID'] + ' Horiz')
+            result = HorizontalAlignment.create(models[key], value['meta']['ID'] + ' Horiz')
 
             if result.errors:
                 errors += result.errors
@@ -139,7 +139,14 @@ class AlignmentExporter(object):
         Write individual alignment to XML
         '''
 
-        _align_node = LandXml.add_child(parent, 'Alignment')
+        parent.append(self._get_alignment_node(data))
+
+    def _get_alignment_node(self, data):
+        '''
+        Return the XML subtree of an individual alignment
+        '''
+
+        _align_node = etree.Element('Alignment')
 
         #write the alignment attributes
         self._write_tree_data(data['meta'], _align_node, maps.XML_ATTRIBS['Alignment'])
@@ -170,16 +177,28 @@ class AlignmentExporter(object):
             if _node is not None:
                 self._write_coordinates(_geo, _node)
 
+        return _align_node
+
     def write(self, data, source_path, target_path):
         '''
-        Write the alignment data to a land xml file in the target location
+        Write the alignment data to a land xml file in the target location.
+
+        The template elements of the source file are written first, followed
+        by the alignments, each streamed to the file as it is generated.
+
+        data - iterable of alignment data dictionaries
         '''
 
         root = etree.parse(source_path).getroot()
 
-        _parent = LandXml.add_child(root, 'Alignments')
+        with LandXml.XmlWriter(target_path) as _writer:
+
+            _writer.start(root.tag, root.attrib)
+
+            for _node in root:
+                _writer.write(_node)
 
-        for _align in data:
-            self._write_alignment_data(_align, _parent)
+            _writer.start('Alignments')
 
-        LandXml.write_to_file(root, target_path)
+            for _align in data:
+                _writer.write(self._get_alignment_node(_align))
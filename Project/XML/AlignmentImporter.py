@@ -25,14 +25,12 @@
 Importer for Alignments in LandXML files
 '''
 
-import math
-
 from xml.etree import ElementTree as etree
 
 import FreeCAD as App
 
-from Project.Support import Units, Utils
-from Project.XML import LandXml
+from Project.Support import Units
+from Project.XML import LandXml, AttributeParser
 from Project.XML.KeyMaps import KeyMaps as maps
 
 class AlignmentImporter(object):
@@ -43,6 +41,7 @@ class AlignmentImporter(object):
     def __init__(self):
 
         self.errors = []
+        self.units = Units.get_context()
 
     def _validate_units(self, units):
         '''
@@ -55,9 +54,9 @@ class AlignmentImporter(object):
 
         xml_units = units[0].attrib['linearUnit']
 
-        if xml_units != Units.get_doc_units()[1]:
+        if xml_units != self.units.names[1]:
             self.errors.append(
-                'Document units of ' + Units.get_doc_units()[1] + ' expected, units of ' +
+                'Document units of ' + self.units.names[1] + ' expected, units of ' +
                 xml_units + 'found')
             return ''
 
@@ -86,16 +85,17 @@ class AlignmentImporter(object):
 
         return align_name
 
-    def _parse_data(self, align_name, tags, attrib):
+    def _parse_data(self, align_name, element, attrib):
         '''
         Build a dictionary keyed to the internal attribute names from the XML
+
+        element - LandXML element name of the attributes
         '''
-        result = {}
+
+        _parser = AttributeParser.get_parser(element, self.units.scale_factor)
 
         #test to ensure all required tags are in the imrpoted XML data
-        missing_tags = set(tags[0]).difference(
-                            set(list(attrib.keys()))
-                        )
+        missing_tags = _parser.get_missing(attrib)
 
         #report error and skip the alignment if required tags are missing
         if missing_tags:
@@ -105,48 +105,12 @@ class AlignmentImporter(object):
             )
             return None
 
-        #merge the required / optional tag dictionaries and iterate the items
-        for _tag in tags[0] + tags[1]:
-
-            attr_val = LandXml.convert_token(_tag, attrib.get(_tag))
-
-            if attr_val is None:
-
-                if _tag in tags[0]:
-                    self.errors.append(
-                        'Missing or invalid %s attribute in alignment %s'
-                        % (_tag, align_name)
-                    )
-
-            #test for angles and convert to radians
-            elif _tag in maps.XML_TAGS['angle']:
-                attr_val = Utils.to_float(attrib.get(_tag))
-
-                if attr_val:
-                    attr_val = math.radians(attr_val)
-
-            #test for lengths to convert to mm
-            elif _tag in maps.XML_TAGS['length']:
-                attr_val = Utils.to_float(attrib.get(_tag))
-
-                if attr_val:
-                    attr_val = attr_val * Units.scale_factor()
+        result, invalid_tags = _parser.parse(attrib)
 
-            #convert rotation from string to number
-            elif _tag == 'rot':
-
-                attr_val = 0.0
-
-                if attrib.get(_tag) == 'cw':
-                    attr_val = 1.0
-
-                elif attrib.get(_tag) == 'ccw':
-                    attr_val = -1.0
-
-            if not attr_val:
-                attr_val = LandXml.get_tag_default(_tag)
-
-            result[maps.XML_MAP[_tag]] = attr_val
+        for _tag in invalid_tags:
+            self.errors.append(
+                'Missing or invalid %s attribute in alignment %s' % (_tag, align_name)
+            )
 
         return result
 
@@ -156,7 +120,7 @@ class AlignmentImporter(object):
         returning it as a dictionary keyed to the alignment name
         '''
 
-        result = self._parse_data(align_name, maps.XML_ATTRIBS['Alignment'], alignment.attrib)
+        result = self._parse_data(align_name, 'Alignment', alignment.attrib)
 
         _start = LandXml.get_child_as_vector(alignment, 'Start')
 
@@ -181,7 +145,7 @@ class AlignmentImporter(object):
 
             print(equation.attrib)
 
-            _dict = self._parse_data(align_name, maps.XML_ATTRIBS['StaEquation'], equation.attrib)
+            _dict = self._parse_data(align_name, 'StaEquation', equation.attrib)
             _dict['Alignment'] = align_name
 
             print('\n<--- dict --->\n', _dict)
@@ -206,7 +170,7 @@ class AlignmentImporter(object):
                 _pt = LandXml.get_child_as_vector(curve, _tag)
 
                 if _pt:
-                    _pt.multiply(Units.scale_factor())
+                    _pt.multiply(self.units.scale_factor)
                 else:
 
                     #report missing coordinates
@@ -223,7 +187,7 @@ class AlignmentImporter(object):
 
             result.append({
                 **coords,
-                **self._parse_data(align_name, maps.XML_ATTRIBS[curve_type], curve.attrib)
+                **self._parse_data(align_name, curve_type, curve.attrib)
             })
 
         return result
@@ -258,7 +222,7 @@ class AlignmentImporter(object):
                 points.append(None)
 
                 if _pt:
-                    points[-1] = (_pt.multiply(Units.scale_factor()))
+                    points[-1] = (_pt.multiply(self.units.scale_factor))
                     continue
 
                 if not (node_tag == 'Line' and _tag in ['Center', 'PI']):
@@ -271,57 +235,116 @@ class AlignmentImporter(object):
                       'Center': points[2], 'PI': points[3]}
 
             result.append({**coords,
-                **self._parse_data(align_name, maps.XML_ATTRIBS[node_tag], geo_node.attrib)
+                **self._parse_data(align_name, node_tag, geo_node.attrib)
                })
 
         print ('\n<---- Import result ---->\n', result)
         return result
 
-    def import_file(self, filepath):
+    @staticmethod
+    def _is_subtree(tag, node, parents, names):
         '''
-        Import a LandXML and build the Python dictionary fronm the appropriate elements
+        Return True if the element subtree is built by the importer:
+        the project, the units and the requested alignments
         '''
 
-        #get element tree and key nodes for parsing
-        doc = etree.parse(filepath)
-        root = doc.getroot()
+        if len(parents) == 1:
+            return tag in ['Project', 'Units']
 
-        project = LandXml.get_child(root, 'Project')
-        units = LandXml.get_child(root, 'Units')
-        alignments = LandXml.get_child(root, 'Alignments')
+        if tag != 'Alignment' or LandXml.get_local_name(parents[-1].tag) != 'Alignments':
+            return False
 
-        #aport if key nodes are missing
-        if not units:
-            self.errors.append('Missing project units')
-            return None
+        return names is None or node.attrib.get('name') in names
 
-        unit_name = self._validate_units(units)
+    def import_file(self, filepath, names=None):
+        '''
+        Import a LandXML and build the Python dictionary fronm the appropriate elements.
 
-        if not unit_name:
-            self.errors.append('Invalid project units')
-            return None
+        The file is streamed, building only the project, units and alignment
+        subtrees and discarding all other elements as they are read,
+        so memory use does not grow with the size of the file.
 
-        #default project name if missing
-        project_name = 'Unknown Project'
+        names - list of the names of the alignments to import.  If None, all are imported.
+        '''
 
-        if not project is None:
-            project_name = project.attrib['name']
+        #resolve the document units once for the import
+        self.units = Units.get_context()
+
+        if names is not None:
+            names = set(names)
 
         #build final dictionary and return
         result = {}
         result['Project'] = {}
-        result['Project'][maps.XML_MAP['name']] = project_name
+
+        #default project name if missing
+        result['Project'][maps.XML_MAP['name']] = 'Unknown Project'
         result['Alignments'] = {}
 
-        for alignment in alignments:
+        unit_name = None
+
+        #open elements, from the root, and the subtree being built
+        _parents = []
+        _subtree = None
+
+        for _event, _node in etree.iterparse(filepath, events=('start', 'end')):
+
+            _tag = LandXml.get_local_name(_node.tag)
+
+            if _event == 'start':
+
+                if _subtree is None and self._is_subtree(_tag, _node, _parents, names):
+                    _subtree = _node
+
+                _parents.append(_node)
+                continue
+
+            _parents.pop()
+
+            #leave the subtree intact until it is complete
+            if _subtree is not None and _node is not _subtree:
+                continue
+
+            if _node is _subtree:
 
-            align_name = self._get_alignment_name(alignment, list(result.keys()))
+                _subtree = None
 
-            result['Alignments'][align_name] = {}
-            align_dict = result['Alignments'][align_name]
+                if _tag == 'Units':
 
-            align_dict['meta'] = self._parse_meta_data(align_name, alignment)
-            align_dict['station'] = self._parse_station_data(align_name, alignment)
-            align_dict['geometry'] = self._parse_coord_geo_data(align_name, alignment)
+                    #aport if the units are missing or invalid
+                    if not _node:
+                        self.errors.append('Missing project units')
+                        return None
+
+                    unit_name = self._validate_units(_node)
+
+                    if not unit_name:
+                        self.errors.append('Invalid project units')
+                        return None
+
+                elif _tag == 'Project':
+                    result['Project'][maps.XML_MAP['name']] = _node.attrib['name']
+
+                else:
+                    align_name = self._get_alignment_name(
+                        _node, list(result['Alignments'].keys())
+                    )
+
+                    result['Alignments'][align_name] = {}
+                    align_dict = result['Alignments'][align_name]
+
+                    align_dict['meta'] = self._parse_meta_data(align_name, _node)
+                    align_dict['station'] = self._parse_station_data(align_name, _node)
+                    align_dict['geometry'] = self._parse_coord_geo_data(align_name, _node)
+
+            #discard the element, along with its siblings, which are also complete
+            _node.clear()
+
+            if _parents:
+                del _parents[-1][:]
+
+        if unit_name is None:
+            self.errors.append('Missing project units')
+            return None
 
         return result
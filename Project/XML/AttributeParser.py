@@ -0,0 +1,153 @@
+# -*- coding: utf-8 -*-
+# **************************************************************************
+# *                                                                        *
+# *  Copyright (c) 20XX Joel Graff <monograff76@gmail.com>                         *
+# *                                                                        *
+# *  This program is free software; you can redistribute it and/or modify  *
+# *  it under the terms of the GNU Lesser General Public License (LGPL)    *
+# *  as published by the Free Software Foundation; either version 2 of     *
+# *  the License, or (at your option) any later version.                   *
+# *  for detail see the LICENCE text file.                                 *
+# *                                                                        *
+# *  This program is distributed in the hope that it will be useful,       *
+# *  but WITHOUT ANY WARRANTY; without even the implied warranty of        *
+# *  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the         *
+# *  GNU Library General Public License for more details.                  *
+# *                                                                        *
+# *  You should have received a copy of the GNU Library General Public     *
+# *  License along with this program; if not, write to the Free Software   *
+# *  Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  *
+# *  USA                                                                   *
+# *                                                                        *
+# **************************************************************************
+
+'''
+Compiled attribute parsers for LandXML elements
+'''
+
+import math
+
+from Project.Support import Utils
+from Project.XML import LandXml
+from Project.XML.KeyMaps import KeyMaps as maps
+
+#rotation directions of curves and spirals
+_ROTATION = {'cw': 1.0, 'ccw': -1.0}
+
+class AttributeParser(object):
+    '''
+    Attribute parser for a LandXML element type.
+
+    The tag list of the element is compiled once from KeyMaps into tuples of the
+    internal key, required flag, type and unit converters and default value of
+    each attribute, with the unit scale factor bound into the length converters,
+    so each element is converted in a single pass without searching the key map lists.
+    '''
+
+    def __init__(self, element, scale_factor):
+        '''
+        element - LandXML element name, keying KeyMaps.XML_ATTRIBS
+        scale_factor - scale of document units to system units
+        '''
+
+        self.element = element
+        self.required = maps.XML_ATTRIBS[element][0]
+
+        self.tags = [
+            (_tag, maps.XML_MAP[_tag], _tag in self.required, self._get_type_converter(_tag),
+             self._get_converter(_tag, scale_factor), LandXml.get_tag_default(_tag))
+            for _tag in maps.XML_ATTRIBS[element][0] + maps.XML_ATTRIBS[element][1]
+        ]
+
+    @staticmethod
+    def _get_type_converter(tag):
+        '''
+        Return the function converting a tag's value string to its data type,
+        as LandXml.convert_token does
+        '''
+
+        _type = LandXml.TAG_TYPES.get(tag)
+
+        if not _type or _type == 'string':
+            return None
+
+        if _type == 'float':
+            return Utils.to_float
+
+        return lambda _v: LandXml.convert_token(tag, _v)
+
+    @staticmethod
+    def _get_converter(tag, scale_factor):
+        '''
+        Return the function converting a tag's typed value to its internal value
+        '''
+
+        #angles are converted to radians
+        if tag in maps.XML_TAGS['angle']:
+            return lambda _v: math.radians(_v) if _v else _v
+
+        #lengths are converted to system units
+        if tag in maps.XML_TAGS['length']:
+            return lambda _v: _v * scale_factor if _v else _v
+
+        if tag == 'rot':
+            return lambda _v: _ROTATION.get(_v, 0.0)
+
+        return None
+
+    def parse(self, attrib):
+        '''
+        Return the dictionary of internal attribute values of an element's attributes,
+        with the list of the required attributes which are missing or invalid.
+        Missing attributes are assigned their default value.
+        '''
+
+        result = {}
+        invalid = []
+
+        for _tag, _key, _required, _type, _converter, _default in self.tags:
+
+            _value = attrib.get(_tag)
+
+            if not _value:
+                _value = None
+
+            elif _type:
+                _value = _type(_value)
+
+            if _value is None:
+
+                if _required:
+                    invalid.append(_tag)
+
+            elif _converter:
+                _value = _converter(_value)
+
+            if not _value:
+                _value = _default
+
+            result[_key] = _value
+
+        return result, invalid
+
+    def get_missing(self, attrib):
+        '''
+        Return the set of required attributes not in the element's attributes
+        '''
+
+        return set(self.required).difference(attrib)
+
+_PARSERS = {}
+
+def get_parser(element, scale_factor):
+    '''
+    Return the attribute parser for the element type and scale factor,
+    compiling it on first use
+    '''
+
+    _key = (element, scale_factor)
+
+    if _key not in _PARSERS:
+        _PARSERS[_key] = AttributeParser(element, scale_factor)
+
+    return _PARSERS[_key]
@@ -25,8 +25,6 @@
 Importer for LandXML files
 '''
 
-import re
-
 from shutil import copyfile
 from xml.etree import ElementTree as etree
 from xml.dom import minidom
@@ -39,6 +37,34 @@ from Project.XML.KeyMaps import KeyMaps
 XML_VERSION = 'v1.2'
 XML_NAMESPACE = {XML_VERSION: 'http://www.landxml.org/schema/LandXML-1.2'}
 
+#prefixes of the other namespaces written to LandXML files
+XML_PREFIXES = {'http://www.w3.org/2001/XMLSchema-instance': 'xsi'}
+
+#entities of the characters escaped in text and attribute values
+_TEXT_ENTITIES = [('&', '&amp;'), ('<', '&lt;'), ('>', '&gt;')]
+_ATTRIBUTE_ENTITIES = _TEXT_ENTITIES + [
+    ('"', '&quot;'), ('\n', '&#10;'), ('\r', '&#13;'), ('\t', '&#09;')
+]
+
+def escape(text, entities=None):
+    '''
+    Return the text with markup characters replaced by their entities
+    '''
+
+    for _char, _entity in entities or _TEXT_ENTITIES:
+
+        if _char in text:
+            text = text.replace(_char, _entity)
+
+    return text
+
+#data type of each tag, keyed by tag from the KeyMaps type lists
+TAG_TYPES = {}
+
+for _type, _tags in KeyMaps.XML_TYPES.items():
+    for _tag in _tags:
+        TAG_TYPES.setdefault(_tag, _type)
+
 def convert_token(tag, value):
     '''
     Given a LandXML tag and it's value, return it
@@ -48,13 +74,7 @@ def convert_token(tag, value):
     if not tag or not value:
         return None
 
-    _typ = None
-
-    for _k, _v in KeyMaps.XML_TYPES.items():
-
-        if tag in _v:
-            _typ = _k
-            break
+    _typ = TAG_TYPES.get(tag)
 
     if not _typ or _typ == 'string':
         return value
@@ -73,35 +93,204 @@ def convert_token(tag, value):
 
     return None
 
+def get_local_name(tag):
+    '''
+    Return the tag name without its namespace
+    '''
+
+    return tag.rsplit('}', 1)[-1]
+
 def get_tag_default(tag):
     '''
     Return the data type and default value for a tag
     '''
 
-    if tag in KeyMaps.XML_TYPES['float']:
+    _typ = TAG_TYPES.get(tag)
+
+    if _typ == 'float':
         return 0.0
 
-    if tag in KeyMaps.XML_TYPES['string']:
+    if _typ == 'string':
         return ''
 
     return None
 
-def write_to_file(node, target, pretty_print=True):
+class XmlWriter(object):
     '''
-    Write the node to the target file, prettyprinting if desrired
+    Incremental LandXML writer.
+
+    Elements are opened and closed with start() and end(), and complete
+    subtrees are serialized with write(), so a document can be streamed
+    to disk as it is generated.  Output is indented as it is written.
+
+    Elements in the LandXML namespace, or in no namespace, are written in
+    the default namespace declared on the root element.  Other namespaces
+    are written with their XML_PREFIXES prefix.
     '''
 
-    etree.register_namespace(XML_VERSION, XML_NAMESPACE[XML_VERSION])
+    def __init__(self, target, indent='  '):
+        '''
+        target - file path to write
+        indent - indentation of each level.  If None, no whitespace is written.
+        '''
+
+        self.target = target
+        self.indent = indent
+        self.file = None
+        self.tags = []
+        self.prefixes = {}
+
+    def __enter__(self):
+
+        self.file = open(self.target, 'w', encoding='utf-8')
+        self.file.write('<?xml version="1.0" encoding="utf-8"?>')
+
+        return self
+
+    def __exit__(self, *args):
+
+        self.close()
+
+    def close(self):
+        '''
+        Close any open elements and the file
+        '''
+
+        if self.file is None:
+            return
+
+        while self.tags:
+            self.end()
+
+        if self.indent is not None:
+            self.file.write('\n')
+
+        self.file.close()
+        self.file = None
+
+    def _get_name(self, name, declarations):
+        '''
+        Return the qualified name of a tag or attribute, adding the declaration
+        of its namespace to the element's declarations if not already in scope
+        '''
+
+        if name[0] != '{':
+            return name
+
+        _uri, _local = name[1:].split('}', 1)
+
+        if _uri == XML_NAMESPACE[XML_VERSION]:
+            return _local
 
-    _xml = minidom.parseString(etree.tostring(node, encoding='utf-8').decode('utf-8'))
+        _prefix = self.prefixes.get(_uri)
 
-    if pretty_print:
-        _xml = _xml.toprettyxml(indent='  ', encoding='utf-8').decode('utf-8')
-        _xml = re.sub(XML_VERSION + ':', '', _xml)
-        _xml = re.sub('xmlns:' + XML_VERSION, 'xmlns', _xml)
+        if _prefix is None:
+
+            _prefix = declarations.get(_uri) or XML_PREFIXES.get(_uri) \
+                or 'ns' + str(len(declarations))
+
+            declarations[_uri] = _prefix
+
+        return _prefix + ':' + _local
+
+    def _get_start(self, tag, attrib):
+        '''
+        Return the start tag of an element, without the closing bracket
+        '''
+
+        _declarations = {}
+
+        _tag = self._get_name(tag, _declarations)
+
+        _attributes = [
+            ' %s="%s"' % (self._get_name(_k, _declarations), escape(str(_v), _ATTRIBUTE_ENTITIES))
+            for _k, _v in attrib.items()
+        ]
+
+        #the root element declares the default namespace
+        _namespaces = []
+
+        if not self.tags:
+
+            _namespaces.append(' xmlns="%s"' % XML_NAMESPACE[XML_VERSION])
+
+            #namespaces declared on the root are in scope for the document
+            self.prefixes = _declarations
+
+        _namespaces.extend(
+            ' xmlns:%s="%s"' % (_v, escape(_k, _ATTRIBUTE_ENTITIES))
+            for _k, _v in _declarations.items()
+        )
+
+        return '<' + _tag + ''.join(_namespaces) + ''.join(_attributes), _tag
+
+    def _write_line(self, text):
+        '''
+        Write text on a new line at the current depth
+        '''
+
+        if self.indent is not None:
+            self.file.write('\n' + self.indent * len(self.tags))
+
+        self.file.write(text)
+
+    def start(self, tag, attrib=None):
+        '''
+        Open an element, writing its start tag
+        '''
+
+        _start, _tag = self._get_start(tag, attrib or {})
+
+        self._write_line(_start + '>')
+        self.tags.append(_tag)
+
+    def end(self):
+        '''
+        Close the most recently opened element
+        '''
+
+        _tag = self.tags.pop()
+
+        self._write_line('</' + _tag + '>')
+
+    def write(self, node):
+        '''
+        Write a complete element subtree at the current depth.
+        Whitespace-only text is replaced by the writer's indentation.
+        '''
+
+        _start, _tag = self._get_start(node.tag, node.attrib)
+
+        _text = node.text if node.text and node.text.strip() else ''
+
+        if not len(node):
+
+            if _text:
+                self._write_line(_start + '>' + escape(_text) + '</' + _tag + '>')
+
+            else:
+                self._write_line(_start + '/>')
+
+        else:
+
+            self._write_line(_start + '>' + escape(_text))
+            self.tags.append(_tag)
+
+            for _child in node:
+                self.write(_child)
+
+            self.end()
+
+        if node.tail and node.tail.strip():
+            self.file.write(escape(node.tail))
+
+def write_to_file(node, target, pretty_print=True):
+    '''
+    Write the node to the target file, prettyprinting if desrired
+    '''
 
-    with open(target, 'w', encoding='UTF-8') as _file:
-        _file.write(_xml)
+    with XmlWriter(target, '  ' if pretty_print else None) as _writer:
+        _writer.write(node)
 
 def dump_node(node):
     '''
@@ -0,0 +1,365 @@
+# -*- coding: utf-8 -*-
+# **************************************************************************
+# *                                                                        *
+# *  Copyright (c) 20XX Joel Graff <monograff76@gmail.com>                         *
+# *                                                                        *
+# *  This program is free software; you can redistribute it and/or modify  *
+# *  it under the terms of the GNU Lesser General Public License (LGPL)    *
+# *  as published by the Free Software Foundation; either version 2 of     *
+# *  the License, or (at your option) any later version.                   *
+# *  for detail see the LICENCE text file.                                 *
+# *                                                                        *
+# *  This program is distributed in the hope that it will be useful,       *
+# *  but WITHOUT ANY WARRANTY; without even the implied warranty of        *
+# *  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the         *
+# *  GNU Library General Public License for more details.                  *
+# *                                                                        *
+# *  You should have received a copy of the GNU Library General Public     *
+# *  License along with this program; if not, write to the Free Software   *
+# *  Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  *
+# *  USA                                                                   *
+# *                                                                        *
+# **************************************************************************
+
+'''
+Importer for TIN Surfaces in LandXML files
+'''
+
+import re
+import warnings
+
+import numpy
+
+from Project.Support import Units
+from Project.XML.KeyMaps import KeyMaps as maps
+from Geometry.Terrain import Terrain
+
+#patterns of the surface points (P) as (id, coordinates), faces (F) as (attributes, indices),
+#surface start / end tags, and the project, units and units definition tags.
+#Tags are formatted with the namespace prefix of the root element.
+_PATTERNS = {
+    'point': rb'<{0}P\s[^>]*?\bid\s*=\s*["\']([^"\']*)["\'][^>]*>([^<]*)</',
+    'face': rb'<{0}F(\s[^>]*)?>([^<]*)</',
+    'surface': rb'<(/?){0}Surface(\s[^>]*)?>',
+    'project': rb'<{0}Project(\s[^>]*)?>',
+    'units': rb'<{0}(?:Imperial|Metric)(\s[^>]*)?>'
+}
+
+#root element, with its namespace prefix
+_ROOT = re.compile(rb'<([\w.-]+:)?LandXML\b')
+
+#comments and CDATA sections, which hold no markup, and the start of an unclosed one
+_COMMENT = re.compile(rb'<!--.*?-->|<!\[CDATA\[.*?\]\]>', re.DOTALL)
+_COMMENT_START = re.compile(rb'<!--|<!\[CDATA\[')
+
+#attribute value
+_ATTRIBUTE = r'\b{}\s*=\s*["\']([^"\']*)["\']'
+
+class SurfaceImporter(object):
+    '''
+    LandXML parsing class for TIN surfaces.
+
+    The file is scanned in chunks, converting the surface points and faces
+    of each chunk directly to numpy arrays, without building the document
+    tree or per-point objects.  Memory use is bounded by the chunk size
+    and the resulting arrays.
+    '''
+
+    #bytes of the file scanned at once
+    CHUNK_SIZE = 1 << 22
+
+    def __init__(self):
+
+        self.errors = []
+        self.units = Units.get_context()
+        self.patterns = None
+
+    def _set_patterns(self, chunk):
+        '''
+        Compile the tag patterns for the namespace prefix of the root element,
+        if the chunk holds the root element
+        '''
+
+        _match = _ROOT.search(chunk)
+
+        if not _match:
+            return
+
+        _prefix = re.escape(_match.group(1)) if _match.group(1) else b''
+
+        self.patterns = {
+            _k: re.compile(_v.replace(b'{0}', _prefix)) for _k, _v in _PATTERNS.items()
+        }
+
+    @staticmethod
+    def _get_attribute(attributes, name):
+        '''
+        Return the value of the named attribute in a tag's attribute bytes
+        '''
+
+        if not attributes:
+            return None
+
+        _match = re.search(_ATTRIBUTE.format(name).encode(), attributes)
+
+        if not _match:
+            return None
+
+        return _match.group(1).decode('utf-8', 'replace')
+
+    def _validate_units(self, units):
+        '''
+        Validate the linear units of the file, ensuring they match the document
+        '''
+
+        if units is None:
+            self.errors.append('Missing project units')
+            return ''
+
+        if units != self.units.names[1]:
+            self.errors.append(
+                'Document units of ' + self.units.names[1] + ' expected, units of ' +
+                units + ' found')
+            return ''
+
+        return units
+
+    @staticmethod
+    def _to_array(values, columns, dtype=float):
+        '''
+        Convert a list of space-delimited value strings to an array of rows,
+        returning the array and a mask of the rows converted.
+        Rows with too few values are padded with zeros, and extra values dropped.
+        '''
+
+        with warnings.catch_warnings():
+
+            #incomplete values are detected by the count below
+            warnings.simplefilter('ignore', DeprecationWarning)
+
+            try:
+                result = numpy.fromstring(b' '.join(values), dtype=dtype, sep=' ')
+
+            #newer numpy versions raise on unparsed data, rather than warning
+            except ValueError:
+                result = numpy.zeros(0, dtype=dtype)
+
+        if len(result) == len(values) * columns:
+            return result.reshape(-1, columns), numpy.ones(len(values), dtype=bool)
+
+        #fall back to converting row by row
+        result = numpy.zeros((len(values), columns), dtype=dtype)
+        valid = numpy.ones(len(values), dtype=bool)
+
+        for _i, _v in enumerate(values):
+
+            _row = _v.split()[0:columns]
+
+            try:
+                result[_i, 0:len(_row)] = [dtype(float(_x)) for _x in _row]
+
+            except (ValueError, OverflowError):
+                valid[_i] = False
+
+        return result, valid
+
+    def _build_surface(self, name, surface):
+        '''
+        Return a Terrain of the points and faces read for the surface.
+        Faces are mapped from point ids to vertex indices,
+        dropping any which refer to missing points.
+        '''
+
+        ids = numpy.concatenate(surface['ids'] or [numpy.zeros(0, dtype=numpy.int64)])
+        vertices = numpy.concatenate(surface['points'] or [numpy.zeros((0, 3))])
+        faces = numpy.concatenate(surface['faces'] or [numpy.zeros((0, 3), dtype=numpy.int64)])
+
+        vertices *= self.units.scale_factor
+
+        if not len(ids):
+
+            if len(faces):
+                self.errors.append('Missing points in surface %s' % name)
+
+            return Terrain(vertices, numpy.zeros((0, 3)), name)
+
+        _order = numpy.argsort(ids, kind='stable')
+        _sorted = ids[_order]
+
+        _pos = numpy.minimum(numpy.searchsorted(_sorted, faces), len(ids) - 1)
+        _missing = ~(_sorted[_pos] == faces).all(axis=1)
+
+        if _missing.any():
+            self.errors.append('%d faces refer to missing points in surface %s'
+                               % (_missing.sum(), name))
+
+        return Terrain(vertices, _order[_pos[~_missing]], name)
+
+    def _read_surface(self, surface, chunk):
+        '''
+        Read the points and visible faces of a chunk of a surface definition
+        '''
+
+        _points = self.patterns['point'].findall(chunk)
+
+        if _points:
+
+            _ids, _valid = self._to_array([_p[0] for _p in _points], 1, numpy.int64)
+            _coords, _valid_coords = self._to_array([_p[1] for _p in _points], 3)
+
+            _valid &= _valid_coords
+
+            if not _valid.all():
+                self.errors.append('%d invalid points skipped in surface %s'
+                                   % ((~_valid).sum(), surface['name']))
+
+            surface['ids'].append(_ids[_valid, 0])
+            surface['points'].append(_coords[_valid])
+
+        #invisible faces (i="1") lie outside the surface boundary
+        _faces = [_f[1] for _f in self.patterns['face'].findall(chunk)
+                  if not _f[0] or self._get_attribute(_f[0], 'i') != '1']
+
+        if _faces:
+
+            _faces, _valid = self._to_array(_faces, 3, numpy.int64)
+
+            if not _valid.all():
+                self.errors.append('%d invalid faces skipped in surface %s'
+                                   % ((~_valid).sum(), surface['name']))
+
+            surface['faces'].append(_faces[_valid])
+
+    def _read_chunk(self, chunk, result, names):
+        '''
+        Read a complete chunk of the file, splitting it at the surface tags
+        '''
+
+        if self.patterns is None:
+            self._set_patterns(chunk)
+
+        #only the prolog precedes the root element
+        if self.patterns is None:
+            return
+
+        #the tags searched for are found in few chunks, so test for their names first
+        if result['Units'] is None and (b'Imperial' in chunk or b'Metric' in chunk):
+
+            _match = self.patterns['units'].search(chunk)
+
+            if _match:
+                result['Units'] = self._get_attribute(_match.group(1), 'linearUnit') or ''
+
+        if result['Project'] is None and b'Project' in chunk:
+
+            _match = self.patterns['project'].search(chunk)
+
+            if _match:
+                result['Project'] = self._get_attribute(_match.group(1), 'name')
+
+        _start = 0
+        _tags = []
+
+        if b'Surface' in chunk:
+            _tags = self.patterns['surface'].finditer(chunk)
+
+        for _match in _tags:
+
+            if result['Surface'] is not None:
+                self._read_surface(result['Surface'], chunk[_start:_match.start()])
+
+            _start = _match.end()
+
+            #surface end tag
+            if _match.group(1):
+
+                if result['Surface'] is not None:
+
+                    result['Surfaces'][result['Surface']['name']] = self._build_surface(
+                        result['Surface']['name'], result['Surface']
+                    )
+
+                result['Surface'] = None
+                continue
+
+            _name = self._get_attribute(_match.group(2), 'name')
+
+            if _name is None:
+                _name = 'Surface ' + str(len(result['Surfaces']))
+
+            result['Surface'] = None
+
+            if names is None or _name in names:
+                result['Surface'] = {'name': _name, 'ids': [], 'points': [], 'faces': []}
+
+        if result['Surface'] is not None:
+            self._read_surface(result['Surface'], chunk[_start:])
+
+    def import_file(self, filepath, names=None):
+        '''
+        Import the TIN surfaces of a LandXML file, returning a dictionary of
+        the project name and the Terrain objects keyed by surface name.
+
+        Points (P) are read as vertex coordinates in file order, as alignment
+        coordinates are.  Faces (F) marked invisible are skipped.
+
+        names - list of the names of the surfaces to import.  If None, all are imported.
+        '''
+
+        self.units = Units.get_context()
+        self.patterns = None
+
+        if names is not None:
+            names = set(names)
+
+        _state = {'Units': None, 'Project': None, 'Surface': None, 'Surfaces': {}}
+        _buffer = b''
+
+        with open(filepath, 'rb') as _file:
+
+            while True:
+
+                _data = _file.read(self.CHUNK_SIZE)
+                _buffer += _data
+
+                #drop comments and CDATA sections, stopping before one left open
+                #at the end of the chunk, so its markup is not read
+                _end = len(_buffer)
+
+                if b'<!' in _buffer:
+
+                    _buffer = _COMMENT.sub(b'', _buffer)
+                    _open = _COMMENT_START.search(_buffer)
+                    _end = _open.start() if _open else len(_buffer)
+
+                #split before the last opening tag, as its element may be incomplete
+                _split = _end
+
+                if _data:
+
+                    _split = _buffer.rfind(b'<', 0, _end + 1)
+
+                    #skip closing tags, comments and a trailing, undetermined tag
+                    while _split >= 0 \
+                        and _buffer[_split + 1:_split + 2] in (b'', b'/', b'!', b'?'):
+
+                        _split = _buffer.rfind(b'<', 0, _split)
+
+                    if _split < 0:
+                        continue
+
+                self._read_chunk(_buffer[:_split], _state, names)
+                _buffer = _buffer[_split:]
+
+                if not _data:
+                    break
+
+        if not self._validate_units(_state['Units']):
+            self.errors.append('Invalid project units')
+            return None
+
+        result = {}
+        result['Project'] = {maps.XML_MAP['name']: _state['Project'] or 'Unknown Project'}
+        result['Surfaces'] = _state['Surfaces']
+
+        return result
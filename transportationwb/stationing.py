@@ -10,7 +10,13 @@ import Draft
 import FreeCAD as App
 
 
-def combineCurves():
+def combineCurves(step=3000, start=0.0, end=None):
+    '''
+    Combine the selected horizontal and vertical curves
+
+    step - sample spacing along the horizontal curve
+    start, end - optional distance window along the horizontal curve
+    '''
 
 
     #get selected horizontal and vertical geometry
@@ -27,7 +33,11 @@ def combineCurves():
 
     #get the length of the curve and set the step interval
     horiz_len=horiz_edge.Length
-    step=3000
+
+    if end is None or end > horiz_len:
+        end=horiz_len
+
+    start=max(start, 0.0)
 
     #initialize point lists
     #ptsh is ... ?
@@ -36,67 +46,24 @@ def combineCurves():
     ptsn=[]
     ptsc=[]
 
-    #divide the length by the number of steps, truncating the integer
-    #then add one for the concluding point for the steps,
-    #plus a point for the end of the edge, if the step point falls short
-    point_count=int(horiz_len/float(step))+1
-
-    if ((point_count - 1) * step) < horiz_len:
-        point_count += 1
-
-    #vertial curve as equidistant points at the step interval...
-    vt_seg_pts=vert_edge.discretize(Number=point_count, First=0.00, Last=horiz_len)
-
-    end_point = vt_seg_pts[point_count - 1]
-
-    print('Start point: ',vt_seg_pts[0])
-    print('End point: ',vt_seg_pts[point_count-1])
-
-#c=FreeCAD.getDocument("stationing").getObject("MyBezierSketch")
-#pts=c.Shape.Edge1.discretize(20)
-
     import numpy as np
 
-    #this pairs coordinates of like axes in three tuples (x_coords,y_coords,z)
-    vt_pt_seg_axes=np.array(vt_seg_pts).swapaxes(0,1)
-
-    #save the x_coords/y_coords coordinate pairs in separate variables
-    x_coords=list(range(0, int(horiz_len) + 1, step))
-
-    #if we added two to the point count, then the step interval
-    #won't quite make it to the end... add the length as the last point
-    if len(x_coords) < point_count:
-        x_coords.append(horiz_len)
-
-    last_pt = len(x_coords)
-    print(x_coords[last_pt - 10:])
-
-    y_coords=vt_pt_seg_axes[1]
-
-    #append the final elevation - see above
-    if (len(y_coords) < point_count):
-        y_coords = np.append(y_coords, end_point.y)
-
-    print(len(x_coords))
-    print(len(y_coords))
-
-    #interpolation...
-    from scipy import interpolate
-    ff = interpolate.interp1d(x_coords, y_coords,kind='cubic',bounds_error=False,fill_value=0)
-
-    ll = int(h.Shape.Length) + 1
-
-    #create a set of x_coords-values evenly spaced between 0 and ll at the specified step interval
-    xnew=np.arange(0,ll,step)
+    #create a set of x_coords-values evenly spaced across the window at the step interval
+    xnew=np.arange(start,end,step)
 
-    last_element = xnew[len(xnew)-1]
+    if not len(xnew) or xnew[-1] != end:
+        xnew = np.append(xnew, end)
 
-    if last_element != h.Shape.Length:
-        xnew = np.append(xnew, h.Shape.Length)
+    #the vertical edge is plotted as (distance, elevation) - sample it densely
+    #and look elevations up by distance, rather than fitting a spline
+    #through points spaced along its own length
+    vt_pts=np.array(vert_edge.discretize(Deflection=0.01))
 
-    #interpolates y_coords values for the specified x_coords values
-    ynew = ff(xnew)   # use interpolation function returned by `interp1d`
+    order=np.argsort(vt_pts[:,0], kind='stable')
+    ynew=np.interp(xnew + vt_pts[order[0],0], vt_pts[order,0], vt_pts[order,1])
 
+    print('Start point: ',vt_pts[0])
+    print('End point: ',vt_pts[-1])
 
         #ynew = np.append(ynew, vert_edge.Curve.parameterAtDistance(horiz_len))
 #	plt.plot(x_coords, y_coords, 'o', xnew, ynew, '+')
@@ -105,7 +72,6 @@ def combineCurves():
     #minimum of point_count, and the number of intervals in xnew
     #anz2=min(point_count,xnew.shape[0])
 
-    print ('point_count: ', point_count)
     print ('xnew.shape[0]', xnew.shape[0])
     #print ("anz2: ", anz2)
 
@@ -113,13 +79,13 @@ def combineCurves():
 
         print(xnew[i], ynew[i])
         #x,y coordinate on horizontal
-        #p=horiz_edge.valueAt(fip+step*(lap-fip)/horiz_len*i)
+        #p=horiz_edge.valueAt(fip+xnew[i]*(lap-fip)/horiz_len)
 
         #tangent at point
-        t=horiz_edge.tangentAt(fip+step*(lap-fip)/horiz_len*i)
+        t=horiz_edge.tangentAt(fip+xnew[i]*(lap-fip)/horiz_len)
 
         #x,y coordinate on horizontal
-        p=horiz_edge.Curve.value(fip+step*(lap-fip)/horiz_len*i)
+        p=horiz_edge.Curve.value(fip+xnew[i]*(lap-fip)/horiz_len)
 
 
         #stationing line interval
@@ -0,0 +1,89 @@
+import math
+
+import numpy
+import FreeCAD as App
+
+from Geometry import Arc, Line
+from Geometry.StationIndex import StationIndex
+from Geometry.VerticalProfile import VerticalProfile
+from Geometry.Alignment3d import Alignment3d
+import unittest
+
+class Test_Alignment3d(unittest.TestCase):
+
+    def setUp(self):
+
+        _line = Line.get_parameters({
+            'Type': 'Line', 'Start': App.Vector(0.0, 0.0, 0.0), 'BearingIn': 0.5, 'Length': 50000.0
+        })
+
+        _line['InternalStation'] = (0.0, 50000.0)
+
+        _arc = Arc.get_parameters({
+            'Type': 'Curve', 'Start': _line['End'], 'BearingIn': 0.5,
+            'Radius': 100000.0, 'Delta': 0.5, 'Direction': 1.0
+        })
+
+        _arc['InternalStation'] = (50000.0, 50000.0 + _arc['Length'])
+
+        self.alignment = Alignment3d(
+            StationIndex([_line, _arc]),
+            VerticalProfile([20000.0, 60000.0], [1000.0, 1800.0], [0.0, 2.0], [2.0, -1.0], [0.0, 30000.0])
+        )
+
+    def test_pieces(self):
+
+        _pieces = self.alignment.get_pieces(1000.0)
+
+        self.assertEqual(len(_pieces), 5, 'Alignment3d.get_pieces() piece count mismatch')
+
+        for _i, (_points, _tangents) in enumerate(_pieces):
+
+            _coords, _ref = self.alignment.get_points(
+                numpy.linspace(*self.alignment.get_breaks()[_i:_i + 2], len(_points))
+            )
+
+            self.assertLess(numpy.abs(_coords - _points).max(), 1e-6,
+                'Alignment3d.get_pieces() coordinate mismatch'
+            )
+
+            self.assertLess(numpy.abs(_ref[1:-1] - _tangents[1:-1]).max(), 1e-9,
+                'Alignment3d.get_pieces() tangent mismatch'
+            )
+
+    def test_tangents(self):
+
+        _distances = numpy.linspace(100.0, 90000.0, 90001)
+        _coords, _tangents = self.alignment.get_points(_distances)
+
+        _slope = numpy.gradient(_coords, _distances, axis=0)
+        _slope /= numpy.linalg.norm(_slope, axis=1)[:, None]
+
+        #exclude the differences straddling the grade break
+        _smooth = numpy.abs(_distances - 20000.0) > 2.0
+        _smooth[[0, -1]] = False
+
+        self.assertLess(numpy.linalg.norm(_slope - _tangents, axis=1)[_smooth].max(), 1e-4,
+            'Alignment3d.get_points() tangents do not follow the coordinates'
+        )
+
+    def test_sample_window(self):
+
+        _distances, _points = self.alignment.sample(1000.0, 30000.0, 70000.0, tolerance=1.0)
+
+        self.assertEqual((_distances[0], _distances[-1]), (30000.0, 70000.0),
+            'Alignment3d.sample() window mismatch'
+        )
+
+        self.assertLessEqual(numpy.diff(_distances).max(), 1000.0,
+            'Alignment3d.sample() exceeds the interval'
+        )
+
+        _chunks = list(self.alignment.iter_samples(1000.0, 30000.0, 70000.0, 1.0, chunk_size=10))
+
+        self.assertGreater(len(_chunks), 1, 'Alignment3d.iter_samples() does not stream')
+
+        self.assertTrue(
+            numpy.array_equal(numpy.concatenate([_c[0] for _c in _chunks]), _distances),
+            'Alignment3d.iter_samples() chunks do not match the sample'
+        )
@@ -0,0 +1,99 @@
+import contextlib
+import io
+import math
+import os
+import tempfile
+
+from xml.etree import ElementTree as etree
+
+from Project.XML.AlignmentImporter import AlignmentImporter
+from Project.XML import LandXml
+import unittest
+
+_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', '..',
+                     'Resources', 'data', 'alignment', 'SugarGroveRd.xml')
+
+class Test_AlignmentImporter(unittest.TestCase):
+
+    def _import(self, names=None):
+
+        #the importer reports its progress on stdout
+        with contextlib.redirect_stdout(io.StringIO()):
+            return AlignmentImporter().import_file(_PATH, names)
+
+    def test_import(self):
+
+        result = self._import()
+
+        self.assertEqual(result['Project']['ID'], 'Sugar Grove Road')
+        self.assertEqual(list(result['Alignments']),
+                         ['Sugar Grove Road', 'Penrose Road West', 'Penrose Road East'])
+
+        _alignment = result['Alignments']['Penrose Road West']
+
+        self.assertEqual(_alignment['meta']['StartStation'], 1000.0)
+        self.assertEqual(len(_alignment['station']), 1)
+        self.assertTrue(all(_g['Type'] == 'Curve' for _g in _alignment['geometry']))
+
+    def test_names(self):
+
+        result = self._import(['Penrose Road East'])
+
+        self.assertEqual(list(result['Alignments']), ['Penrose Road East'])
+        self.assertEqual(result['Alignments']['Penrose Road East'],
+                         self._import()['Alignments']['Penrose Road East'])
+
+    def test_attributes(self):
+
+        _importer = AlignmentImporter()
+
+        result = _importer._parse_data('A', 'Curve', {
+            'rot': 'ccw', 'radius': '100.0', 'dirStart': '90.0', 'staStart': '12.5', 'name': 'C1'
+        })
+
+        self.assertEqual(result['Direction'], -1.0)
+        self.assertAlmostEqual(result['Radius'], 100.0 * _importer.units.scale_factor)
+        self.assertAlmostEqual(result['BearingIn'], math.pi / 2.0)
+        self.assertEqual(result['StartStation'], 12.5)
+        self.assertEqual(result['ID'], 'C1')
+        self.assertEqual((result['Delta'], result['Description']), (0.0, ''))
+
+        self.assertIsNone(_importer._parse_data('A', 'Curve', {'radius': '100.0'}))
+        self.assertEqual(len(_importer.errors), 1)
+
+    def test_writer(self):
+
+        _ns = '{' + LandXml.XML_NAMESPACE[LandXml.XML_VERSION] + '}'
+        _xsi = '{http://www.w3.org/2001/XMLSchema-instance}'
+
+        _root = etree.Element(_ns + 'LandXML', {_xsi + 'schemaLocation': 'a b'})
+        etree.SubElement(_root, _ns + 'Project', name='A & "B"')
+
+        _file, _path = tempfile.mkstemp(suffix='.xml')
+        os.close(_file)
+
+        try:
+            with LandXml.XmlWriter(_path) as _writer:
+
+                _writer.start(_root.tag, _root.attrib)
+                _writer.write(_root[0])
+                _writer.start('Alignments')
+
+                _node = etree.Element('Alignment', name='<1>')
+                etree.SubElement(_node, 'Start').text = '1.0 2.0'
+
+                _writer.write(_node)
+
+            _result = etree.parse(_path).getroot()
+
+        finally:
+            os.remove(_path)
+
+        self.assertEqual(_result.tag, _ns + 'LandXML')
+        self.assertEqual(_result.get(_xsi + 'schemaLocation'), 'a b')
+        self.assertEqual(_result.find(_ns + 'Project').get('name'), 'A & "B"')
+
+        _alignment = _result.find(_ns + 'Alignments/' + _ns + 'Alignment')
+
+        self.assertEqual(_alignment.get('name'), '<1>')
+        self.assertEqual(_alignment.find(_ns + 'Start').text, '1.0 2.0')
@@ -0,0 +1,258 @@
+import contextlib
+import copy
+import io
+import math
+
+from unittest import mock
+
+import numpy
+import FreeCAD as App
+
+from Geometry import Arc, Line, Spiral
+from Project.Support import Units
+from Benchmarks import Synthetic
+from Corridor.Alignment import AlignmentModel as AlignmentModel_
+from Corridor.Alignment.AlignmentModel import AlignmentModel
+import unittest
+
+class Test_AlignmentModel(unittest.TestCase):
+
+    def setUp(self):
+
+        self.data = Synthetic.get_alignment(30, seed=3)
+
+        self.model = AlignmentModel()
+        self.model.set_geometry(copy.deepcopy(self.data))
+
+    def test_adaptive(self):
+
+        #the model reports relaxed tolerances on stdout
+        with contextlib.redirect_stdout(io.StringIO()):
+
+            _points = self.model.discretize(0.01, 'Adaptive')
+            _budget = self.model.discretize(0.01, 'Adaptive', 200)
+
+            #a loop ramp needs two segments at any tolerance, more than the budget allows
+            _tolerance = self.model._get_adaptive_tolerance(
+                [{'Delta': math.radians(270.0), 'Radius': 304800.0}], [], 3.048, 3
+            )
+
+        #vertices lie on the alignment, so the chord error is measured at segment midpoints
+        _error = numpy.abs(
+            self.model.get_station_offsets(0.5 * (_points[:-1] + _points[1:]))[1]
+        ).max()
+
+        self.assertLess(_error, 0.01 + 1e-6, 'Chord tolerance exceeded')
+        self.assertGreater(_error, 0.005, 'Chords are refined beyond the tolerance')
+        self.assertLessEqual(len(_budget), 200, 'Vertex budget exceeded')
+        self.assertLess(len(_budget), len(_points))
+        self.assertTrue(math.isfinite(_tolerance))
+
+    def test_projection(self):
+
+        _index = self.model.get_station_index()
+        _projection = self.model.get_projection_index()
+
+        #points within 50 feet either side of the alignment
+        _rng = numpy.random.RandomState(4)
+        _coords, _bearings = _index.get_positions(_rng.uniform(0.0, _index.total_length, 2000))
+        _offsets = _rng.uniform(-15240.0, 15240.0, 2000)
+
+        _points = _coords[:, 0:2] + numpy.column_stack(
+            [numpy.cos(_bearings), -numpy.sin(_bearings)]) * _offsets[:, None]
+
+        _stations, _result = _projection.project(_points)
+
+        #nearest projections, testing every element
+        _count = len(_index)
+        _brute = [numpy.full(len(_points), numpy.nan) for _i in range(2)] \
+            + [numpy.full(len(_points), numpy.inf)]
+
+        _projection._nearest(
+            _points, numpy.repeat(numpy.arange(len(_points)), _count),
+            numpy.tile(numpy.arange(_count), len(_points)), *_brute
+        )
+
+        self.assertTrue(numpy.allclose(numpy.abs(_result), _brute[2], rtol=0.0, atol=1e-6))
+        self.assertTrue(numpy.allclose(_stations, _brute[0], rtol=0.0, atol=1e-6))
+
+    def _get_edited(self, index, values):
+        '''
+        Return a model solved from the edited definition,
+        with the downstream elements chained to the edited element
+        '''
+
+        _data = copy.deepcopy(self.data)
+        _data['geometry'][index].update(values)
+
+        _sf = Units.scale_factor()
+        _start = _data['meta']['StartStation']
+        _distance = (_data['geometry'][index]['StartStation'] - _start) * _sf
+        _solved = None
+
+        for _geo in _data['geometry'][index:]:
+
+            if _solved:
+
+                _distance += _solved['Length']
+
+                _geo['Start'] = App.Vector(_solved['End'])
+                _geo['BearingIn'] = _solved['BearingOut']
+                _geo['StartStation'] = _start + _distance / _sf
+
+            _solved = {'Line': Line, 'Curve': Arc, 'Spiral': Spiral}[_geo['Type']].get_parameters(
+                dict(_geo)
+            )
+
+        _data['meta']['Length'] = _distance + _solved['Length']
+
+        result = AlignmentModel()
+        result.set_geometry(_data)
+
+        return result
+
+    def _assert_edited(self, expected, index):
+        '''
+        Compare the edited model with the expected model from the edited element onward
+        '''
+
+        _geometry = self.model.geometry['geometry']
+
+        self.assertEqual(len(expected.geometry['geometry']), len(_geometry))
+        self.assertAlmostEqual(
+            expected.geometry['meta']['Length'], self.model.geometry['meta']['Length'], 6
+        )
+
+        for _expected, _result in zip(expected.geometry['geometry'][index:], _geometry[index:]):
+
+            for _k in ['Start', 'End']:
+                self.assertLess((_expected[_k] - _result[_k]).Length, 1e-6)
+
+            for _k in ['BearingIn', 'BearingOut', 'Length', 'StartStation']:
+                self.assertAlmostEqual(_expected[_k], _result[_k], 6)
+
+            self.assertTrue(numpy.allclose(
+                _expected['InternalStation'], _result['InternalStation'], rtol=0.0, atol=1e-6
+            ))
+
+        #the discretized alignment ends at the end of the last element
+        _points = self.model.discretize(10.0, 'Segment')
+
+        self.assertLess(numpy.linalg.norm(_points[-1] - tuple(_geometry[-1]['End'])), 1e-6)
+
+    def test_update_geometry(self):
+
+        _index = [_i for _i, _g in enumerate(self.data['geometry']) if _g['Type'] == 'Curve'][3]
+        _radius = self.data['geometry'][_index]['Radius'] * 1.25
+
+        self.assertTrue(self.model.update_geometry(_index, {'Radius': _radius}))
+
+        #the edit moves the end of the alignment
+        _last = self.model.geometry['geometry'][-1]
+
+        self.assertGreater((_last['Start'] - self.data['geometry'][-1]['Start']).Length, 1000.0)
+
+        self._assert_edited(self._get_edited(_index, {'Radius': _radius}), _index)
+
+    def test_update_first(self):
+
+        _geo = self.data['geometry'][0]
+        self.assertEqual(_geo['Type'], 'Line')
+
+        _values = {'Length': _geo['Length'] * 1.5}
+
+        self.assertTrue(self.model.update_geometry(0, _values), self.model.errors)
+        self._assert_edited(self._get_edited(0, _values), 0)
+
+    def test_update_last(self):
+
+        _index = len(self.data['geometry']) - 1
+        _geo = self.data['geometry'][_index]
+        self.assertEqual(_geo['Type'], 'Spiral')
+
+        _values = {'Length': _geo['Length'] * 0.5}
+
+        self.assertTrue(self.model.update_geometry(_index, _values), self.model.errors)
+        self._assert_edited(self._get_edited(_index, _values), _index)
+
+        #an alignment without a length is still extended by the edit
+        self.model.geometry['meta']['Length'] = None
+
+        self.assertTrue(self.model.update_geometry(_index, {'Length': _geo['Length']}))
+        self.assertIsNone(self.model.geometry['meta']['Length'])
+
+        _end = tuple(self.model.geometry['geometry'][-1]['End'])
+        _points = self.model.discretize(10.0, 'Segment')
+
+        self.assertLess(numpy.linalg.norm(_points[-1] - _end), 1e-6)
+
+    def test_point_cache(self):
+
+        _arcs = len([_g for _g in self.model.geometry['geometry'] if _g['Type'] == 'arc'])
+        _cache = self.model.point_cache
+
+        _points = self.model.discretize(10.0, 'Segment')
+        self.assertEqual((_cache.hits, _cache.misses), (0, _arcs))
+
+        #unchanged curves reuse their cached points
+        _points[:] = 0.0
+        _repeat = self.model.discretize(10.0, 'Segment')
+
+        self.assertEqual((_cache.hits, _cache.misses), (_arcs, _arcs))
+        self.assertTrue(numpy.array_equal(_repeat, self.model.discretize(10.0, 'Segment')))
+
+        #a new interval or method discretizes every curve again
+        self.model.discretize(20.0, 'Segment')
+        self.model.discretize(20.0, 'Interval')
+
+        self.assertEqual(_cache.misses, 3 * _arcs)
+        self.assertEqual(len(_cache), 3 * _arcs)
+
+        for _value in _cache.data.values():
+
+            self.assertFalse(_value.flags.writeable)
+
+            with self.assertRaises(ValueError):
+                _value[0, 0] = 1.0
+
+    def test_build_all(self):
+
+        _alignments = {
+            _n: Synthetic.get_alignment(12, _n, seed=_s) for _s, _n in enumerate(['A', 'B', 'C'])
+        }
+
+        _serial = AlignmentModel_.build_all(copy.deepcopy(_alignments), 10.0, 'Segment', 1)
+
+        #the pool solves the alignments without falling back
+        _out = io.StringIO()
+
+        with mock.patch.object(AlignmentModel_, 'ProcessPoolExecutor',
+                               wraps=AlignmentModel_.ProcessPoolExecutor) as _pool, \
+            contextlib.redirect_stdout(_out):
+
+            _parallel = AlignmentModel_.build_all(copy.deepcopy(_alignments), 10.0, 'Segment', 2)
+
+        self.assertEqual(_pool.call_count, 1)
+        self.assertNotIn('solving serially', _out.getvalue())
+
+        #a pool which cannot start falls back to solving serially
+        _out = io.StringIO()
+
+        with mock.patch.object(AlignmentModel_, 'ProcessPoolExecutor', side_effect=OSError), \
+            contextlib.redirect_stdout(_out):
+
+            _fallback = AlignmentModel_.build_all(copy.deepcopy(_alignments), 10.0, 'Segment', 2)
+
+        self.assertIn('solving serially', _out.getvalue())
+
+        for _result in [_parallel, _fallback]:
+
+            self.assertEqual(list(_result), list(_serial))
+
+            for _k, _model in _result.items():
+
+                self.assertFalse(_model.errors)
+                self.assertTrue(numpy.allclose(
+                    _model.discretize(10.0, 'Segment'), _serial[_k].discretize(10.0, 'Segment'),
+                    rtol=0.0, atol=1e-9
+                ))
@@ -0,0 +1,143 @@
+import math
+
+import numpy
+
+import FreeCAD as App
+
+from Geometry import Arc
+import unittest
+
+class Test_Arc(unittest.TestCase):
+
+    arc = {
+        'Type': 'arc',
+        'Direction': -1.0,
+        'Delta': math.radians(50.3161),
+        'Radius': 204216.0,
+        'BearingIn': math.radians(139.3986),
+        'BearingOut': math.radians(89.0825),
+        'Start': App.Vector(122056.0603640062, -142398.20717496306, 0.0),
+    }
+
+    def _compare_points(self, interval, interval_type):
+
+        _ref = Arc.get_points_reference(self.arc, interval, interval_type)
+        _new = Arc.get_points(self.arc, interval, interval_type)
+
+        self.assertEqual(len(_ref), len(_new),
+            'Arc.get_points() point count mismatch for %s' % interval_type
+        )
+
+        for _r, _n in zip(_ref, _new):
+            self.assertLess(_r.sub(_n).Length, 0.0001,
+                'Arc.get_points() fails parity test for %s' % interval_type
+            )
+
+    def test_get_points_segment(self):
+
+        self._compare_points(10.0, 'Segment')
+
+    def test_get_points_interval(self):
+
+        self._compare_points(10.0, 'Interval')
+
+    def test_get_points_tolerance(self):
+
+        self._compare_points(0.1, 'Tolerance')
+
+    def test_get_points_large_tolerance(self):
+
+        #a tolerance beyond the arc diameter places a single segment
+        self._compare_points(2000.0, 'Tolerance')
+
+        _points = Arc.get_points_batch([self.arc], 2000.0, 'Tolerance')[0]
+
+        self.assertEqual(len(_points), 2)
+        self.assertTrue(numpy.isfinite(_points).all())
+
+    def test_get_points_batch(self):
+
+        _arcs = [self.arc, {**self.arc, 'Direction': 1.0, 'Radius': 30480.0}]
+        _batch = Arc.get_points_batch(_arcs, 10.0, 'Segment')
+
+        self.assertEqual(len(_batch), 2, 'Arc.get_points_batch() arc count mismatch')
+
+        for _arc, _points in zip(_arcs, _batch):
+
+            _ref = Arc.get_points_reference(_arc, 10.0, 'Segment')
+
+            self.assertEqual(len(_ref), len(_points),
+                'Arc.get_points_batch() point count mismatch'
+            )
+
+            self.assertLess(_ref[-1].sub(App.Vector(*_points[-1])).Length, 0.0001,
+                'Arc.get_points_batch() fails end point parity test'
+            )
+
+    def test_get_parameters(self):
+
+        _sf = 304.80
+        _half_delta = self.arc['Delta'] / 2.0
+
+        _arc = {
+            'Type': 'Curve',
+            'Start': self.arc['Start'],
+            'Center': App.Vector(277108.1622932797, -9495.910944558627, 0.0),
+            'End': App.Vector(280378.2141876281, -213685.7280672748, 0.0),
+            'PI': App.Vector(184476.32163324804, -215221.57431973785, 0.0)
+        }
+
+        _comp = {
+            'Direction': -1.0,
+            'Delta': self.arc['Delta'],
+            'Radius': 670.0 * _sf,
+            'Tangent': 670.0 * _sf * math.tan(_half_delta),
+            'Chord': 2.0 * 670.0 * _sf * math.sin(_half_delta),
+            'BearingIn': self.arc['BearingIn'],
+            'BearingOut': self.arc['BearingOut']
+        }
+
+        #exclude each point in turn, solving from the remaining coordinates
+        for _key in ['Start', 'Center', 'End', 'PI']:
+
+            _result = Arc.get_parameters({**_arc, _key: None})
+
+            self.assertIsNotNone(_result, 'Arc.get_parameters() fails without %s' % _key)
+
+            for _k, _v in _comp.items():
+                self.assertAlmostEqual(_result[_k], _v, 4,
+                    'Arc.get_parameters() %s mismatch without %s' % (_k, _key)
+                )
+
+            self.assertLess(_result[_key].sub(_arc[_key]).Length, 0.0001,
+                'Arc.get_parameters() %s coordinate mismatch' % _key
+            )
+
+    def test_get_parameters_batch(self):
+
+        _arcs = [
+            {**self.arc, 'Start': None, 'PI': App.Vector(184476.32163324804, -215221.57431973785, 0.0)},
+            {'Radius': 1000.0, 'Tangent': 500.0, 'Direction': 1.0, 'BearingIn': 0.0},
+            {'Chord': 600.0, 'Tangent': 400.0, 'Direction': -1.0, 'BearingIn': 1.0},
+            {'Radius': 1000.0}
+        ]
+
+        _batch = Arc.get_parameters_batch(_arcs)
+
+        for _arc, _result in zip(_arcs, _batch):
+
+            _scalar = Arc.get_parameters(_arc)
+
+            if _scalar is None:
+                self.assertIsNone(_result, 'Arc.get_parameters_batch() solves invalid arc')
+                continue
+
+            for _k in ['Radius', 'Delta', 'Direction', 'BearingIn', 'BearingOut', 'Length']:
+                self.assertAlmostEqual(_result[_k], _scalar[_k], 6,
+                    'Arc.get_parameters_batch() %s mismatch' % _k
+                )
+
+            for _k in ['Start', 'Center', 'End', 'PI']:
+                self.assertLess(_result[_k].sub(_scalar[_k]).Length, 0.0001,
+                    'Arc.get_parameters_batch() %s mismatch' % _k
+                )
@@ -0,0 +1,75 @@
+import json
+
+import numpy
+import FreeCAD as App
+
+from Geometry import Arc, Line
+from Geometry.StationIndex import StationIndex
+from Geometry.ElementStore import ElementStore
+import unittest
+
+class Test_ElementStore(unittest.TestCase):
+
+    def setUp(self):
+
+        self.elements = []
+        _start, _bearing, _station = App.Vector(1000.0, 2000.0, 0.0), 0.3, 0.0
+
+        for _radius in [None, 300000.0, None, 500000.0]:
+
+            if _radius is None:
+                _element = Line.get_parameters({
+                    'Type': 'Line', 'Start': _start, 'BearingIn': _bearing, 'Length': 200000.0
+                })
+
+            else:
+                _element = Arc.get_parameters({
+                    'Type': 'Curve', 'Start': _start, 'BearingIn': _bearing,
+                    'Radius': _radius, 'Delta': 0.4, 'Direction': 1.0
+                })
+
+            _element['InternalStation'] = (_station, _station + _element['Length'])
+            self.elements.append(_element)
+
+            _start, _bearing = _element['End'], _element['BearingOut']
+            _station += _element['Length']
+
+        self.store = ElementStore(self.elements)
+
+    def test_view(self):
+
+        for _element, _view in zip(self.elements, self.store):
+
+            self.assertEqual(set(_element), set(_view))
+            self.assertEqual(_element['Type'], _view['Type'])
+            self.assertEqual(_element['InternalStation'], _view['InternalStation'])
+            self.assertAlmostEqual((_element['Start'] - _view['Start']).Length, 0.0)
+
+        _view = self.store[1]
+        _view['Radius'] = 250000.0
+        _view['Name'] = 'C1'
+
+        self.assertEqual(self.store.data['Radius'][1], 250000.0)
+        self.assertEqual(self.store[1]['Name'], 'C1')
+
+        del _view['PI']
+
+        self.assertNotIn('PI', self.store[1])
+        self.assertIsNone(self.store[1].get('PI'))
+
+    def test_state(self):
+
+        _store = ElementStore.from_state(json.loads(json.dumps(self.store.to_state())))
+
+        self.assertEqual(self.store.to_list(), _store.to_list())
+
+    def test_station_index(self):
+
+        _columns = StationIndex(self.store)
+        _dicts = StationIndex(self.elements)
+
+        _distances = numpy.linspace(0.0, _dicts.total_length, 101)
+
+        self.assertTrue(numpy.allclose(
+            _columns.get_positions(_distances)[0], _dicts.get_positions(_distances)[0]
+        ))
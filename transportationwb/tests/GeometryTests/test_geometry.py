@@ -5,6 +5,20 @@ def suite():
     suite = unittest.TestSuite()
 
     suite.addTest(unittest.defaultTestLoader.loadTestsFromName('transportationwb.tests.GeometryTests.test_support'))
+    suite.addTest(unittest.defaultTestLoader.loadTestsFromName('transportationwb.tests.GeometryTests.test_arc'))
+    suite.addTest(unittest.defaultTestLoader.loadTestsFromName('transportationwb.tests.GeometryTests.test_spiral'))
+    suite.addTest(unittest.defaultTestLoader.loadTestsFromName('transportationwb.tests.GeometryTests.test_profile'))
+    suite.addTest(unittest.defaultTestLoader.loadTestsFromName('transportationwb.tests.GeometryTests.test_alignment3d'))
+    suite.addTest(unittest.defaultTestLoader.loadTestsFromName('transportationwb.tests.GeometryTests.test_vertical_alignment'))
+    suite.addTest(unittest.defaultTestLoader.loadTestsFromName('transportationwb.tests.GeometryTests.test_sight_distance'))
+    suite.addTest(unittest.defaultTestLoader.loadTestsFromName('transportationwb.tests.GeometryTests.test_superelevation'))
+    suite.addTest(unittest.defaultTestLoader.loadTestsFromName('transportationwb.tests.GeometryTests.test_element_store'))
+    suite.addTest(unittest.defaultTestLoader.loadTestsFromName('transportationwb.tests.GeometryTests.test_alignment_importer'))
+    suite.addTest(unittest.defaultTestLoader.loadTestsFromName('transportationwb.tests.GeometryTests.test_surface_importer'))
+    suite.addTest(unittest.defaultTestLoader.loadTestsFromName('transportationwb.tests.GeometryTests.test_terrain_index'))
+    suite.addTest(unittest.defaultTestLoader.loadTestsFromName('transportationwb.tests.GeometryTests.test_alignment_model'))
+    suite.addTest(unittest.defaultTestLoader.loadTestsFromName('transportationwb.tests.GeometryTests.test_station_table'))
+    suite.addTest(unittest.defaultTestLoader.loadTestsFromName('transportationwb.tests.GeometryTests.test_units'))
 
     return suite
 
@@ -0,0 +1,38 @@
+import numpy
+
+from Geometry.VerticalProfile import VerticalProfile
+import unittest
+
+class Test_VerticalProfile(unittest.TestCase):
+
+    profile = VerticalProfile(
+        [1000.0, 3000.0, 5000.0], [100.0, 140.0, 120.0],
+        [1.0, 2.0, -1.0], [2.0, -1.0, 0.5], [400.0, 800.0, 0.0]
+    )
+
+    def test_evaluate(self):
+
+        _stations = [0.0, 1000.0, 1500.0, 3000.0, 5000.0, 6000.0]
+        _elev, _grade, _k = self.profile.evaluate(_stations)
+
+        _comp = [
+            (90.0, 1.0, numpy.inf), (100.5, 1.5, 400.0), (110.0, 2.0, numpy.inf),
+            (137.0, 0.5, 800.0 / 3.0), (120.0, -1.0, numpy.inf), (125.0, 0.5, numpy.inf)
+        ]
+
+        for _i, (_e, _g, _kv) in enumerate(_comp):
+
+            self.assertAlmostEqual(_elev[_i], _e, 6, 'VerticalProfile elevation mismatch')
+            self.assertAlmostEqual(_grade[_i], _g, 6, 'VerticalProfile grade mismatch')
+            self.assertAlmostEqual(_k[_i], _kv, 6, 'VerticalProfile K-value mismatch')
+
+    def test_continuity(self):
+
+        _stations = numpy.linspace(0.0, 4500.0, 45001)
+        _elev, _grade, _k = self.profile.evaluate(_stations)
+
+        _slope = numpy.gradient(_elev, _stations)[1:-1] * 100.0
+
+        self.assertLess(numpy.abs(_slope - _grade[1:-1]).max(), 1e-4,
+            'VerticalProfile grade does not match elevation slope'
+        )
@@ -0,0 +1,64 @@
+import math
+
+import FreeCAD as App
+
+from Geometry import Arc, Line
+from Geometry.StationIndex import StationIndex
+from Geometry.VerticalProfile import VerticalProfile
+from Geometry.Alignment3d import Alignment3d
+from Geometry import SightDistance
+import unittest
+
+class Test_SightDistance(unittest.TestCase):
+
+    def test_crest_curve(self):
+
+        _line = Line.get_parameters({
+            'Type': 'Line', 'Start': App.Vector(0.0, 0.0, 0.0), 'BearingIn': 0.3, 'Length': 2000000.0
+        })
+
+        _line['InternalStation'] = (0.0, 2000000.0)
+
+        #6% algebraic difference over a 300 m crest curve
+        _alignment = Alignment3d(
+            StationIndex([_line]), VerticalProfile([1000000.0], [50000.0], [3.0], [-3.0], [300000.0])
+        )
+
+        _h1, _h2 = SightDistance.EYE_HEIGHT, SightDistance.STOPPING_OBJECT_HEIGHT
+        _comp = math.sqrt(300000.0 * 200.0 * (math.sqrt(_h1) + math.sqrt(_h2))**2 / 6.0)
+
+        _result = SightDistance.SightDistance(_alignment).get_sight_distances(
+            [1000000.0 - _comp / 2.0], 600000.0, step=100.0
+        )
+
+        self.assertAlmostEqual(_result[0], _comp, delta=100.0,
+            msg='SightDistance crest curve mismatch'
+        )
+
+    def test_horizontal_curve(self):
+
+        _arc = Arc.get_parameters({
+            'Type': 'Curve', 'Start': App.Vector(0.0, 0.0, 0.0), 'BearingIn': 0.0,
+            'Radius': 200000.0, 'Delta': 2.0, 'Direction': 1.0
+        })
+
+        _arc['InternalStation'] = (0.0, _arc['Length'])
+
+        _alignment = Alignment3d(
+            StationIndex([_arc]), VerticalProfile([0.0], [0.0], [0.0], [0.0], [0.0])
+        )
+
+        #middle ordinate M = R (1 - cos(S / 2R))
+        _comp = 2.0 * 200000.0 * math.acos(1.0 - 3000.0 / 200000.0)
+
+        _engine = SightDistance.SightDistance(_alignment, clearance=3000.0)
+
+        _serial = _engine.get_sight_distances([100000.0, 150000.0], 150000.0, step=10.0)
+        _parallel = _engine.get_sight_distances(
+            [100000.0, 150000.0], 150000.0, step=10.0, workers=2, chunk_size=15000
+        )
+
+        for _s, _p in zip(_serial, _parallel):
+
+            self.assertAlmostEqual(_s, _comp, delta=10.0, msg='SightDistance horizontal curve mismatch')
+            self.assertEqual(_s, _p, 'SightDistance parallel chunk mismatch')
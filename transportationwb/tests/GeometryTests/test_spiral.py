@@ -0,0 +1,78 @@
+import math
+
+import numpy
+
+import FreeCAD as App
+
+from Geometry import Spiral
+import unittest
+
+class Test_Spiral(unittest.TestCase):
+
+    spiral = {
+        'Type': 'Spiral',
+        'Direction': 1.0,
+        'Length': 60000.0,
+        'StartRadius': math.inf,
+        'EndRadius': 20000.0,
+        'BearingIn': 0.7,
+        'Start': App.Vector(1000.0, 2000.0, 0.0),
+    }
+
+    def _reference(self, curvature, rate, distance, steps=20000):
+        '''
+        Midpoint-rule integration of the spiral heading
+        '''
+
+        _h = distance / steps
+        _s = (numpy.arange(steps) + 0.5) * _h
+        _angle = curvature * _s + 0.5 * rate * _s * _s
+
+        return numpy.cos(_angle).sum() * _h, numpy.sin(_angle).sum() * _h
+
+    def test_get_local(self):
+
+        _sp = Spiral.get_parameters(self.spiral)
+
+        for _k, _rate in [(_sp['StartCurvature'], _sp['CurvatureRate']), (-2.5e-5, 1.0e-9)]:
+
+            _fwd, _right, _ = Spiral.get_local(_k, _rate, numpy.array([_sp['Length']]))
+            _ref = self._reference(_k, _rate, _sp['Length'])
+
+            self.assertAlmostEqual(_fwd[0], _ref[0], 3, 'Spiral.get_local() forward mismatch')
+            self.assertAlmostEqual(_right[0], _ref[1], 3, 'Spiral.get_local() right mismatch')
+
+    def test_get_parameters(self):
+
+        _sp = Spiral.get_parameters(self.spiral)
+
+        self.assertAlmostEqual(_sp['Delta'], 1.5, 10, 'Spiral.get_parameters() delta mismatch')
+        self.assertAlmostEqual(_sp['BearingOut'], 2.2, 10, 'Spiral.get_parameters() bearing mismatch')
+
+        #a full spiral followed by its reverse returns to the starting curvature
+        _out = Spiral.get_parameters({**self.spiral, 'Start': _sp['End'], 'BearingIn': _sp['BearingOut'],
+                                      'StartRadius': 20000.0, 'EndRadius': math.inf})
+
+        self.assertAlmostEqual(_out['BearingOut'], 3.7, 10, 'Spiral.get_parameters() reverse mismatch')
+
+    def test_get_points_tolerance(self):
+
+        _sp = Spiral.get_parameters(self.spiral)
+        _tolerance = 10.0
+
+        _points = Spiral.get_points(_sp, _tolerance, 'Tolerance', 1.0)
+        _dense, _ = Spiral.get_positions(_sp, numpy.linspace(0.0, _sp['Length'], 20001))
+
+        #distance of each dense point to the nearest polyline segment
+        _a, _b = _points[:-1, 0:2], _points[1:, 0:2]
+        _v = _b - _a
+
+        _error = 0.0
+
+        for _p in _dense[:, 0:2]:
+
+            _t = numpy.clip(((_p - _a) * _v).sum(axis=1) / (_v * _v).sum(axis=1), 0.0, 1.0)
+            _error = max(_error, numpy.hypot(*(_p - _a - _t[:, None] * _v).T).min())
+
+        self.assertLessEqual(_error, _tolerance * 1.001, 'Spiral.get_points() exceeds chord tolerance')
+        self.assertTrue(numpy.allclose(_points[-1], tuple(_sp['End'])), 'Spiral.get_points() end mismatch')
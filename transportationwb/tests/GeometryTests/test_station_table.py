@@ -0,0 +1,32 @@
+import numpy
+
+from Project.Support.StationTable import StationTable
+import unittest
+
+class Test_StationTable(unittest.TestCase):
+
+    def test_forward(self):
+
+        #ranges 1000 - 2000 and 2500 onward
+        _table = StationTable([(0.0, 1000.0), (2000.0, 2500.0)])
+
+        self.assertEqual(_table.to_distance(1500.0), 500.0)
+        self.assertEqual(_table.to_distance(2500.0), 1000.0)
+        self.assertEqual(_table.to_distance(3000.0), 1500.0)
+
+        self.assertEqual(_table.contains([1500.0, 2200.0, 3000.0]).tolist(), [True, False, True])
+        self.assertTrue(numpy.allclose(_table.to_station([500.0, 1500.0]), [1500.0, 3000.0]))
+
+    def test_backward(self):
+
+        #ranges 1000 - 2000 and 500 onward, repeating stations 1000 - 2000
+        _table = StationTable([(0.0, 1000.0), (2000.0, 500.0)])
+
+        self.assertEqual(_table.to_distance(2500.0), 3000.0)
+        self.assertEqual(_table.to_distance(700.0), 1200.0)
+
+        #repeated stations resolve to the later range
+        self.assertEqual(_table.to_distance(1500.0), 2000.0)
+
+        self.assertEqual(_table.contains([2500.0, 1500.0, 400.0]).tolist(), [True, True, False])
+        self.assertTrue(numpy.allclose(_table.to_station([500.0, 3000.0]), [1500.0, 2500.0]))
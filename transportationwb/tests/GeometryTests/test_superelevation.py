@@ -0,0 +1,80 @@
+import numpy
+import FreeCAD as App
+
+from Geometry import Arc, Line
+from Geometry.StationIndex import StationIndex
+from Geometry import Superelevation
+import unittest
+
+class Test_Superelevation(unittest.TestCase):
+
+    def setUp(self):
+
+        _elements = []
+        _start, _bearing, _station = App.Vector(0.0, 0.0, 0.0), 0.5, 0.0
+
+        #tangent, right curve, tangent, left curve, tangent
+        for _curve in [None, (300000.0, 1.0), None, (500000.0, -1.0), None]:
+
+            if _curve is None:
+                _element = Line.get_parameters({
+                    'Type': 'Line', 'Start': _start, 'BearingIn': _bearing, 'Length': 200000.0
+                })
+
+            else:
+                _element = Arc.get_parameters({
+                    'Type': 'Curve', 'Start': _start, 'BearingIn': _bearing,
+                    'Radius': _curve[0], 'Delta': 0.4, 'Direction': _curve[1]
+                })
+
+            _element['InternalStation'] = (_station, _station + _element['Length'])
+            _elements.append(_element)
+
+            _start, _bearing = _element['End'], _element['BearingOut']
+            _station += _element['Length']
+
+        self.index = StationIndex(_elements)
+        self.schedule = Superelevation.get_schedule(self.index, 100.0)
+
+    def test_cross_slopes(self):
+
+        _arcs = [_e for _e in self.index.elements if _e['Type'] == 'arc']
+        _mid = [_a['InternalStation'][0] + _a['Length'] / 2.0 for _a in _arcs]
+
+        _rates = Superelevation.get_design_rates([_a['Radius'] for _a in _arcs], 100.0)
+        _left, _right = self.schedule.get_cross_slopes([0.0] + _mid)
+
+        self.assertAlmostEqual(_left[0], -0.02, 9, 'Normal crown mismatch')
+        self.assertAlmostEqual(_right[0], -0.02, 9, 'Normal crown mismatch')
+
+        #the outside of the right curve is the left lane, and vice versa
+        self.assertAlmostEqual(_left[1], _rates[0], 9, 'Right curve superelevation mismatch')
+        self.assertAlmostEqual(_right[1], -_rates[0], 9, 'Right curve superelevation mismatch')
+        self.assertAlmostEqual(_right[2], _rates[1], 9, 'Left curve superelevation mismatch')
+
+        self.assertIs(Superelevation.get_schedule(self.index, 100.0), self.schedule,
+            'Superelevation schedule not cached'
+        )
+
+    def test_runoff(self):
+
+        _arc = self.index.elements[1]
+        _transition = self.schedule.stations[0]
+
+        #the runoff is the part of the transition beyond the level section,
+        #with two thirds of it on the tangent
+        _rate = self.schedule.rates[0]
+        _runoff = (_transition[1] - _transition[0]) * _rate / (0.02 + _rate)
+
+        self.assertAlmostEqual(
+            _arc['InternalStation'][0] - (_transition[1] - _runoff), 2.0 * _runoff / 3.0, 6,
+            'Superelevation runoff placement mismatch'
+        )
+
+        #the outside lane rotates at a constant rate through the transition
+        _stations = numpy.linspace(_transition[0], _transition[1], 11)
+        _left = self.schedule.get_cross_slopes(_stations)[0]
+
+        self.assertLess(numpy.abs(numpy.diff(_left, 2)).max(), 1e-12,
+            'Superelevation transition is not linear'
+        )
@@ -0,0 +1,76 @@
+import os
+import tempfile
+
+import numpy
+
+from Project.XML.SurfaceImporter import SurfaceImporter
+import unittest
+
+_XML = '''<?xml version="1.0" encoding="utf-8"?>
+<LandXML xmlns="http://www.landxml.org/schema/LandXML-1.2">
+<Project name="Surface Test"/>
+<Units><Imperial linearUnit="foot"/></Units>
+<Surfaces>
+<Surface name="EG"><Definition surfType="TIN">
+<Pnts>
+<P id="10">0.0 0.0 100.0</P>
+<P id="20">10.0 0.0 101.0</P>
+<P id="30">0.0 10.0 102.0</P>
+<P id="40">10.0 10.0 103.0</P>
+<!-- <P id="9">5.0 5.0 99.0</P> -->
+<P id="x1">1.0 1.0 1.0</P>
+</Pnts>
+<Faces>
+<F>10 20 30</F>
+<F>20 40 30</F>
+<F i="1">10 40 20</F>
+<![CDATA[<F>10 20 40</F>]]>
+</Faces>
+</Definition></Surface>
+<Surface name="FG"><Definition surfType="TIN">
+<Pnts><P id="1">0.0 0.0 0.0</P><P id="2">1.0 0.0 0.0</P><P id="3">0.0 1.0 0.0</P></Pnts>
+<Faces><F>1 2 3</F></Faces>
+</Definition></Surface>
+</Surfaces>
+</LandXML>
+'''
+
+class Test_SurfaceImporter(unittest.TestCase):
+
+    def setUp(self):
+
+        _file, self.path = tempfile.mkstemp(suffix='.xml')
+
+        with os.fdopen(_file, 'w') as _f:
+            _f.write(_XML)
+
+    def tearDown(self):
+        os.remove(self.path)
+
+    def test_import(self):
+
+        #chunks smaller than the elements split them at every boundary
+        for _size in [SurfaceImporter.CHUNK_SIZE, 7]:
+
+            _importer = SurfaceImporter()
+            _importer.CHUNK_SIZE = _size
+
+            result = _importer.import_file(self.path)
+
+            self.assertEqual(result['Project']['ID'], 'Surface Test')
+            self.assertEqual(sorted(result['Surfaces']), ['EG', 'FG'])
+
+            _surface = result['Surfaces']['EG']
+
+            self.assertEqual(_surface.vertices.shape, (4, 3))
+            self.assertEqual(_surface.triangles.tolist(), [[0, 1, 2], [1, 3, 2]])
+            self.assertTrue(numpy.allclose(_surface.vertices[3], [3048.0, 3048.0, 31394.4]))
+
+            #the point with an invalid id is skipped and reported
+            self.assertEqual(_importer.errors, ['1 invalid points skipped in surface EG'])
+
+    def test_names(self):
+
+        result = SurfaceImporter().import_file(self.path, ['FG'])
+
+        self.assertEqual(list(result['Surfaces']), ['FG'])
@@ -0,0 +1,74 @@
+import numpy
+
+from Geometry.Terrain import Terrain
+import unittest
+
+class _Alignment(object):
+    '''
+    Straight alignment along the x axis, stationed in feet
+    '''
+
+    def get_station_coordinates(self, stations):
+
+        _x = numpy.asarray(stations, dtype=float) * 304.8
+
+        return numpy.column_stack([_x, numpy.full(len(_x), 500.0), numpy.zeros(len(_x))]), \
+            numpy.full(len(_x), numpy.pi / 2.0)
+
+class Test_TerrainIndex(unittest.TestCase):
+
+    def setUp(self):
+
+        #planar surface over a jittered grid with long, narrow triangles
+        _rng = numpy.random.RandomState(1)
+        _x, _y = numpy.meshgrid(numpy.linspace(0.0, 100000.0, 101), numpy.linspace(0.0, 1000.0, 4))
+
+        _x[:, 1:-1] += _rng.uniform(-200.0, 200.0, _x[:, 1:-1].shape)
+
+        self.plane = lambda _p: 0.05 * _p[:, 0] - 0.2 * _p[:, 1] + 1000.0
+
+        _vertices = numpy.column_stack([_x.ravel(), _y.ravel(), numpy.zeros(_x.size)])
+        _vertices[:, 2] = self.plane(_vertices)
+
+        _grid = numpy.arange(_x.size).reshape(_x.shape)
+        _a, _b = _grid[:-1, :-1].ravel(), _grid[:-1, 1:].ravel()
+        _c, _d = _grid[1:, :-1].ravel(), _grid[1:, 1:].ravel()
+
+        self.terrain = Terrain(_vertices, numpy.concatenate([
+            numpy.column_stack([_a, _b, _d]), numpy.column_stack([_a, _d, _c])
+        ]))
+
+    def test_elevation(self):
+
+        _rng = numpy.random.RandomState(2)
+        _points = numpy.column_stack([
+            _rng.uniform(0.0, 100000.0, 5000), _rng.uniform(0.0, 1000.0, 5000)
+        ])
+
+        #vertices and points off the surface
+        _points = numpy.concatenate([
+            _points, self.terrain.vertices[:, 0:2], [[-1.0, 0.0], [0.0, 1001.0], [numpy.nan, 0.0]]
+        ])
+
+        #small chunks split the points and triangles across several passes
+        for _chunk in [None, 64]:
+
+            self.terrain.index = None
+
+            if _chunk:
+                self.terrain.get_index().CHUNK_SIZE = _chunk
+
+            _result = self.terrain.elevation_at(_points)
+
+            self.assertTrue(numpy.allclose(_result[:-3], self.plane(_points[:-3])))
+            self.assertTrue(numpy.isnan(_result[-3:]).all())
+
+    def test_profile(self):
+
+        _stations = numpy.array([0.0, 100.0, 250.5, 400.0])
+
+        _result = self.terrain.profile_along(_Alignment(), _stations)
+        _expected = 0.05 * _stations * 304.8 - 0.2 * 500.0 + 1000.0
+
+        self.assertTrue(numpy.allclose(_result[:-1], _expected[:-1]))
+        self.assertTrue(numpy.isnan(_result[-1]))
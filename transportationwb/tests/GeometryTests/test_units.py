@@ -0,0 +1,44 @@
+from unittest import mock
+
+import FreeCAD as App
+
+from Benchmarks import Headless
+from Project.Support import Units
+import unittest
+
+class Test_Units(unittest.TestCase):
+
+    def setUp(self):
+
+        self.group = Headless._ParameterGroup(Headless.IMPERIAL_SCHEMA)
+
+        #resolve the units afresh against the stand-in preferences,
+        #restoring the cached context and observer afterwards
+        _patches = [
+            mock.patch.object(App, 'ParamGet', lambda _path: self.group),
+            mock.patch.multiple(Units, _CONTEXT=None, _OBSERVER=None)
+        ]
+
+        for _p in _patches:
+            _p.start()
+            self.addCleanup(_p.stop)
+
+    def test_invalidate(self):
+
+        self.assertEqual(Units.scale_factor(), 304.8)
+        self.assertEqual(self.group.observers, [Units._OBSERVER])
+
+        #the cached context is reused until the schema preference changes
+        _context = Units.get_context()
+        self.group.observers[0].OnChange(self.group, 'Decimals')
+
+        self.assertIs(Units.get_context(), _context)
+
+        self.group.SetInt('UserSchema', 0)
+
+        self.assertEqual(Units.scale_factor(), 1000.0)
+        self.assertTrue(Units.is_metric_doc())
+        self.assertEqual(Units.get_doc_units()[0], 'm')
+
+        #the observer is attached once, not on each re-resolve
+        self.assertEqual(len(self.group.observers), 1)
@@ -0,0 +1,66 @@
+import contextlib
+import io
+
+import numpy
+
+from Corridor.Alignment import VerticalAlignment
+import unittest
+
+class Test_VerticalAlignment(unittest.TestCase):
+
+    #distance, bearing, radius, spiral length
+    geometry = [
+        '1500.0, 30.0, 0.0, 0.0',
+        '2200.0, 75.0, 1200.0, 0.0',
+        '1800.0, 20.0, 900.0, 150.0',
+        '2500.0, 350.0, 2000.0, 300.0',
+        '1000.0, 10.0, 0.0, 0.0',
+        '3000.0, 60.0, 1500.0, 200.0',
+        '2000.0, 110.0, 1500.0, 0.0'
+    ]
+
+    def _compare_points(self, interval, interval_type):
+
+        _ref = VerticalAlignment.discretize_geometry_reference(
+            list(self.geometry), interval, interval_type
+        )
+
+        _new = VerticalAlignment.discretize_geometry(
+            VerticalAlignment.parse_geometry(self.geometry), interval, interval_type
+        )
+
+        self.assertEqual(len(_ref), len(_new),
+            'discretize_geometry() point count mismatch for %s' % interval_type
+        )
+
+        self.assertLess(numpy.abs(numpy.array([tuple(_p) for _p in _ref]) - _new).max(), 0.0001,
+            'discretize_geometry() fails parity test for %s' % interval_type
+        )
+
+    def test_discretize_segment(self):
+
+        self._compare_points(10.0, 'Segment')
+
+    def test_discretize_interval(self):
+
+        self._compare_points(100.0, 'Interval')
+
+    def test_discretize_tolerance(self):
+
+        self._compare_points(1.0, 'Tolerance')
+
+    def test_invalid_spiral(self):
+
+        #spirals longer than the curve leave no central arc
+        _geometry = list(self.geometry)
+        _geometry[2] = '1800.0, 20.0, 900.0, 900.0'
+
+        _out = io.StringIO()
+
+        with contextlib.redirect_stdout(_out):
+            _points = VerticalAlignment.discretize_geometry(
+                VerticalAlignment.parse_geometry(_geometry), 10.0, 'Segment'
+            )
+
+        self.assertIsNone(_points)
+        self.assertIn('Invalid central arc', _out.getvalue())